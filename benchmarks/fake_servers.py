@@ -0,0 +1,283 @@
+"""Local stand-ins for chain REST/RPC servers and the Slack Web API used by the benchmarks
+
+Every chain is served under its own path prefix (http://host:port/<chain_name>), so one server can stand in for many chains.
+"""
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GOV_V1 = "v1"
+GOV_V1BETA1 = "v1beta1"
+
+NEUTRON_SMART_QUERY_PATTERN = re.compile(r"^/cosmwasm/wasm/v1/contract/[^/]+/smart/(?P<query>.+)$")
+
+PROPOSAL_STATUS_VOTING_PERIOD = "PROPOSAL_STATUS_VOTING_PERIOD"
+PROPOSAL_STATUS_PASSED = "PROPOSAL_STATUS_PASSED"
+PROPOSAL_STATUS_DEPOSIT_PERIOD = "PROPOSAL_STATUS_DEPOSIT_PERIOD"
+# seconds the fake neutron proposal module's proposals vote for
+NEUTRON_VOTING_PERIOD = 3 * 86400
+# the gov proposal_status query param values
+PROPOSAL_STATUSES = {"1": PROPOSAL_STATUS_DEPOSIT_PERIOD, "2": PROPOSAL_STATUS_VOTING_PERIOD}
+
+
+class FakeChain:
+
+    """Synthetic governance state of a single chain"""
+
+    def __init__(self, chain_name, gov_version=GOV_V1, proposals=5, active_proposals=2, neutron=False, message_size=0):
+        self.chain_name = chain_name
+        self.gov_version = gov_version
+        self.neutron = neutron
+        self.message_size = message_size
+        self.proposals = []
+        self.lock = threading.Lock()
+        for proposal_id in range(1, proposals + 1):
+            self.add_proposal(proposal_id, active=proposal_id > proposals - active_proposals)
+
+    def add_proposal(self, proposal_id=None, active=True):
+        with self.lock:
+            if proposal_id is None:
+                proposal_id = len(self.proposals) + 1
+            self.proposals.append({
+                "id": proposal_id,
+                "title": f"{self.chain_name} proposal {proposal_id}",
+                "description": f"Synthetic proposal {proposal_id} on {self.chain_name}",
+                "submit_time": time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime()),
+                "status": PROPOSAL_STATUS_VOTING_PERIOD if active else PROPOSAL_STATUS_PASSED,
+            })
+
+    def get_proposals(self, active_only=False, status=None):
+        with self.lock:
+            if active_only:
+                status = PROPOSAL_STATUS_VOTING_PERIOD
+            return [proposal for proposal in self.proposals if status is None or proposal["status"] == status]
+
+    def to_v1(self, proposal):
+        return {
+            "id": str(proposal["id"]),
+            "messages": [{
+                "@type": "/cosmos.gov.v1.MsgExecLegacyContent",
+                "content": {"@type": "/cosmos.gov.v1beta1.TextProposal", "title": proposal["title"], "description": proposal["description"], "code": "A" * self.message_size},
+            }],
+            "status": proposal["status"],
+            "submit_time": proposal["submit_time"],
+            "title": proposal["title"],
+            "summary": proposal["description"],
+        }
+
+    def to_v1beta1(self, proposal):
+        return {
+            "proposal_id": str(proposal["id"]),
+            "content": {"@type": "/cosmos.gov.v1beta1.TextProposal", "title": proposal["title"], "description": proposal["description"]},
+            "status": proposal["status"],
+            "submit_time": proposal["submit_time"],
+        }
+
+    def to_neutron(self, proposal):
+        active = proposal["status"] == PROPOSAL_STATUS_VOTING_PERIOD
+        # open proposals expire a day from now and closed ones expired a day ago, which is what ends reverse_proposals paging
+        expiration = time.time_ns() + (1 if active else -1) * 86400 * 10 ** 9
+        return {
+            "id": proposal["id"],
+            "proposal": {
+                "title": proposal["title"],
+                "description": proposal["description"],
+                "expiration": {"at_time": str(expiration)},
+                "status": "open" if active else "executed",
+            },
+        }
+
+
+class RequestCounters:
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def add(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            counts = self.counts
+            self.counts = {}
+        return counts
+
+
+class FakeServer:
+
+    """Threaded HTTP server, run in the background, that hands requests to a handle(method, path, query, body) function"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.counters = RequestCounters()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.respond("GET", b"")
+
+            def do_POST(self):
+                self.respond("POST", self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            def respond(self, method, body):
+                url = urlparse(self.path)
+                status, headers, payload = server.dispatch(method, url.path, parse_qs(url.query), body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def dispatch(self, method, path, query, body):
+        if self.latency > 0:
+            # +-50% jitter around the configured latency
+            time.sleep(self.latency * (0.5 + self.random.random()))
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            self.counters.add("error")
+            return 500, {}, {"code": 13, "message": "synthetic error"}
+        return self.handle(method, path, query, body)
+
+    def handle(self, method, path, query, body):
+        raise NotImplementedError
+
+
+class FakeCosmosServer(FakeServer):
+
+    """Serves gov v1/v1beta1 proposal lists, /syncing, RPC /status and the neutron single proposal module's smart queries for many chains"""
+
+    def __init__(self, chains, latency=0.0, error_rate=0.0, seed=None):
+        super().__init__(latency, error_rate, seed)
+        self.chains = {chain.chain_name: chain for chain in chains}
+
+    def get_chain_url(self, chain):
+        return f"{self.url}/{chain.chain_name}"
+
+    def handle(self, method, path, query, body):
+        _, chain_name, *rest = path.split("/", 2)
+        chain = self.chains.get(chain_name)
+        if chain is None or len(rest) == 0:
+            return 404, {}, {"code": 5, "message": "not found"}
+        route = "/" + rest[0]
+
+        if route == "/syncing":
+            self.counters.add("syncing")
+            return 200, {}, {"syncing": False}
+        if route == "/status":
+            self.counters.add("status")
+            return 200, {}, {"result": {"sync_info": {"catching_up": False}}}
+        if route == "/cosmos/gov/v1/proposals":
+            self.counters.add("gov_v1")
+            if chain.gov_version != GOV_V1:
+                return 501, {}, {"code": 12, "message": "Not Implemented"}
+            return 200, {}, self.get_proposals_page(chain, query, chain.to_v1)
+        if route == "/cosmos/gov/v1beta1/proposals":
+            self.counters.add("gov_v1beta1")
+            return 200, {}, self.get_proposals_page(chain, query, chain.to_v1beta1)
+
+        match = NEUTRON_SMART_QUERY_PATTERN.match(route)
+        if match is not None and chain.neutron:
+            self.counters.add("neutron_smart_query")
+            return self.get_neutron_query(chain, match.group("query"))
+
+        return 404, {}, {"code": 5, "message": "not found"}
+
+    def get_proposals_page(self, chain, query, serialize):
+        proposals = chain.get_proposals(status=PROPOSAL_STATUSES.get(query.get("proposal_status", [""])[0]))
+        if query.get("pagination.reverse", ["false"])[0] == "true":
+            proposals = list(reversed(proposals))
+
+        offset = int(base64.b64decode(query["pagination.key"][0]).decode("utf-8")) if "pagination.key" in query else 0
+        limit = int(query.get("pagination.limit", ["100"])[0])
+        page = proposals[offset:offset + limit]
+
+        next_key = None
+        if offset + limit < len(proposals):
+            next_key = base64.b64encode(str(offset + limit).encode("utf-8")).decode("utf-8")
+
+        return {"proposals": [serialize(proposal) for proposal in page], "pagination": {"next_key": next_key, "total": str(len(proposals))}}
+
+    def get_neutron_query(self, chain, query_data):
+        query = json.loads(base64.b64decode(query_data))
+        proposals = chain.get_proposals(active_only=False)
+        if "list_proposals" in query:
+            start_after = query["list_proposals"].get("start_after", 0) or 0
+            page = [proposal for proposal in proposals if proposal["id"] > start_after][:query["list_proposals"].get("limit", 30)]
+        elif "reverse_proposals" in query:
+            start_before = query["reverse_proposals"].get("start_before")
+            page = [proposal for proposal in reversed(proposals) if start_before is None or proposal["id"] < start_before][:query["reverse_proposals"].get("limit", 30)]
+        elif "config" in query:
+            return 200, {}, {"data": {"max_voting_period": {"time": NEUTRON_VOTING_PERIOD}}}
+        elif "proposal" in query:
+            for proposal in proposals:
+                if proposal["id"] == query["proposal"]["proposal_id"]:
+                    return 200, {}, {"data": chain.to_neutron(proposal)}
+            return 500, {}, {"code": 2, "message": "proposal not found: query wasm contract failed"}
+        else:
+            return 400, {}, {"code": 3, "message": "unknown smart query"}
+        return 200, {}, {"data": {"proposals": [chain.to_neutron(proposal) for proposal in page]}}
+
+
+class FakeSlackServer(FakeServer):
+
+    """Answers the Slack Web API methods the app uses, optionally rate limiting chat.postMessage with 429s"""
+
+    def __init__(self, channel_ids, latency=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=None):
+        super().__init__(latency, error_rate, seed)
+        self.channel_ids = channel_ids
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def get_api_url(self):
+        return f"{self.url}/api/"
+
+    def handle(self, method, path, query, body):
+        api_method = path.rsplit("/", 1)[-1]
+        self.counters.add(api_method)
+
+        if api_method == "conversations.list":
+            return 200, {}, {"ok": True, "channels": [{"id": channel_id, "is_member": True, "is_archived": False} for channel_id in self.channel_ids]}
+        if api_method == "conversations.history":
+            return 200, {}, {"ok": True, "messages": []}
+        if api_method == "chat.postMessage":
+            if self.rate_limit_rate > 0 and self.random.random() < self.rate_limit_rate:
+                self.counters.add("rate_limited")
+                return 429, {"Retry-After": str(self.retry_after)}, {"ok": False, "error": "ratelimited"}
+            with self.lock:
+                ts = f"{int(time.time())}.{len(self.messages):06d}"
+                self.messages.append(ts)
+            return 200, {}, {"ok": True, "ts": ts}
+
+        return 200, {}, {"ok": False, "error": "unknown_method"}
@@ -0,0 +1,99 @@
+"""Microbenchmark of proposal normalization, the normalized dicts used before NormalizedProposal against NormalizedProposal
+
+Reports the time to normalize and check a proposal's submit time, and the memory retained per normalized proposal.
+
+    python benchmarks/normalized_proposal.py [--proposals N]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from requesting.normalization import normalize_v1_proposal
+
+
+def get_v1_proposal(proposal_id):
+    return {
+        "id": str(proposal_id),
+        "title": f"Proposal {proposal_id}",
+        "summary": "Upgrade the chain to the next major version. " * 20,
+        "submit_time": "2026-10-01T12:34:56.123456789Z",
+        "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+        "messages": [{"@type": "/cosmos.upgrade.v1beta1.MsgSoftwareUpgrade", "content": {}}],
+    }
+
+
+# The dict normalizer and submit time parsing as they were before NormalizedProposal, kept here for comparison
+def normalize_v1_proposal_dict(proposal):
+    title = proposal.get("title", "")
+    description = proposal.get("summary", "")
+
+    first_message = {}
+    if len(proposal["messages"]) > 0:
+        first_message = proposal["messages"][0]
+
+    if title == "" or description == "" and len(proposal["messages"]) > 0:
+        if title == "":
+            title = first_message.get("content", {}).get("title", "")
+        if description == "":
+            description = first_message.get("content", {}).get("description", "")
+    return {
+        "proposal_id": proposal["id"],
+        "title": title,
+        "description": description,
+        "submit_time": proposal["submit_time"],
+        "type": first_message.get("@type", ""),
+        "status": proposal.get("status", ""),
+    }
+
+
+def parse_submit_time_dict(timestamp):
+    return datetime.strptime(timestamp.split(".")[0], "%Y-%m-%dT%H:%M:%S")
+
+
+def run_dict(proposal, threshold):
+    proposal_data = normalize_v1_proposal_dict(proposal)
+    return proposal_data["status"] == "PROPOSAL_STATUS_VOTING_PERIOD" and parse_submit_time_dict(proposal_data["submit_time"]) > threshold
+
+
+def run_slotted(proposal, threshold):
+    proposal_data = normalize_v1_proposal(proposal)
+    return proposal_data.status == "PROPOSAL_STATUS_VOTING_PERIOD" and proposal_data.submit_time > threshold
+
+
+def get_retained_bytes(normalize, proposals):
+    # the submit time is parsed into the result in both cases, so both hold the same information
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = []
+    for proposal in proposals:
+        proposal_data = normalize(proposal)
+        if isinstance(proposal_data, dict):
+            proposal_data["submit_time"] = parse_submit_time_dict(proposal_data["submit_time"])
+        results.append(proposal_data)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return retained / len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proposal normalization microbenchmark")
+    parser.add_argument("--proposals", type=int, default=10000)
+    args = parser.parse_args()
+
+    proposals = [get_v1_proposal(proposal_id) for proposal_id in range(args.proposals)]
+    threshold = datetime(2026, 1, 1)
+
+    for name, run, normalize in [("dict", run_dict, normalize_v1_proposal_dict), ("NormalizedProposal", run_slotted, normalize_v1_proposal)]:
+        seconds = min(timeit.repeat(lambda: [run(proposal, threshold) for proposal in proposals], number=1, repeat=5))
+        retained = get_retained_bytes(normalize, proposals)
+        print(f"{name:>20}: {seconds / args.proposals * 1e6:8.2f} us/proposal, {retained:8.1f} bytes retained/proposal")
+
+
+if __name__ == "__main__":
+    main()
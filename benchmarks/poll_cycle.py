@@ -0,0 +1,290 @@
+"""Benchmark of the poll and delivery cycle against local fake chains, a fake Slack and mongomock or a local Mongo
+
+Runs the same cycle as app.main (poll every chain, resolve proposals and notifications, queue them in the outbox and deliver them)
+for each chain count, and reports per cycle: poll and delivery time, chain and Slack requests, Mongo round trips and memory.
+
+    python benchmarks/poll_cycle.py --chains 10,100,1000 --cycles 3 --latency 0.02
+    python benchmarks/poll_cycle.py --chains 100 --mongo-uri mongodb://localhost:27017 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "src"))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_servers import FakeChain, FakeCosmosServer, FakeSlackServer, GOV_V1, GOV_V1BETA1
+from slack_sdk import WebClient
+
+from app import poll_for_notifications
+from chain_registry import ChainRegistry, HTTPClient
+from log import get_configured_logger
+from mongo import Chain, DedupCache, Notification, Outbox, Proposal, SlackChannel
+from mongo.outbox import OUTBOX_OPEN_STATES
+from notifier import SlackDispatcher
+from requesting import PollScheduler, ProposalPoller
+
+CHANNEL_ID = "CBENCHMARK"
+NEUTRON_CHAIN_NAME = "neutron"
+# the fake servers answer the smart queries of any contract address
+NEUTRON_PROPOSAL_MODULES = [{"address": "neutron1proposalsingle", "prefix": "", "name": "Neutron Single Proposal"}]
+
+
+class MongoCounter:
+
+    """Counts Mongo round trips, through command monitoring for a real Mongo or by wrapping mongomock's collection methods"""
+
+    MONGOMOCK_METHODS = [
+        "find", "find_one", "find_one_and_update", "insert_one", "insert_many", "update_one", "update_many",
+        "bulk_write", "aggregate", "count_documents", "create_index", "delete_one", "delete_many",
+    ]
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def add(self):
+        with self.lock:
+            self.count += 1
+
+    def reset(self):
+        with self.lock:
+            count = self.count
+            self.count = 0
+        return count
+
+    def get_pymongo_listener(self):
+        from pymongo import monitoring
+
+        counter = self
+
+        class Listener(monitoring.CommandListener):
+            def started(self, event):
+                counter.add()
+
+            def succeeded(self, event):
+                pass
+
+            def failed(self, event):
+                pass
+
+        return Listener()
+
+    def patch_mongomock(self):
+        from mongomock.collection import Collection
+
+        for name in self.MONGOMOCK_METHODS:
+            setattr(Collection, name, self.wrap(getattr(Collection, name)))
+
+    def wrap(self, method):
+        counter = self
+
+        # mongomock methods call each other, only the outermost call is a round trip
+        def counted(*args, **kwargs):
+            depth = getattr(counter.local, "depth", 0)
+            if depth == 0:
+                counter.add()
+            counter.local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                counter.local.depth = depth
+
+        return counted
+
+
+def get_database(mongo_uri, counter):
+    if mongo_uri is None:
+        import mongomock
+        return mongomock.MongoClient().cosmos_proposals_benchmark
+
+    from pymongo import MongoClient
+    client = MongoClient(mongo_uri, event_listeners=[counter.get_pymongo_listener()])
+    client.drop_database("cosmos_proposals_benchmark")
+    return client.cosmos_proposals_benchmark
+
+
+def build_chains(args, num_chains):
+    chains = []
+    for i in range(num_chains):
+        if args.neutron and i == 0:
+            chains.append(FakeChain(NEUTRON_CHAIN_NAME, proposals=args.proposals, active_proposals=args.active_proposals, neutron=True))
+            continue
+        gov_version = GOV_V1BETA1 if i < num_chains * args.v1beta1_fraction else GOV_V1
+        chains.append(FakeChain(f"chain{i}", gov_version, args.proposals, args.active_proposals, message_size=args.message_size))
+    return chains
+
+
+def build_registry_zip(location, chains, servers):
+    with zipfile.ZipFile(location, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, chain in enumerate(chains):
+            server = servers[i % len(servers)]
+            chain_url = server.get_chain_url(chain)
+            chain_json = {
+                "chain_name": chain.chain_name,
+                "chain_id": "neutron-1" if chain.neutron else f"{chain.chain_name}-1",
+                "pretty_name": chain.chain_name.capitalize(),
+                "status": "live",
+                "network_type": "mainnet",
+                "apis": {"rest": [{"address": chain_url}], "rpc": [{"address": chain_url}]},
+                "explorers": [],
+            }
+            archive.writestr(f"chain-registry-master/{chain.chain_name}/chain.json", json.dumps(chain_json, indent=2))
+
+
+def get_max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def wait_for_delivery(outbox, timeout):
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if outbox.collection.count_documents({"status": {"$in": OUTBOX_OPEN_STATES}}) == 0:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def run(args, num_chains, logger):
+    counter = MongoCounter()
+    if args.mongo_uri is None:
+        counter.patch_mongomock()
+
+    chains_data = build_chains(args, num_chains)
+    cosmos_servers = [FakeCosmosServer(chains_data, args.latency, args.error_rate, seed=i).start() for i in range(args.hosts)]
+    slack_server = FakeSlackServer([CHANNEL_ID], args.slack_latency, rate_limit_rate=args.slack_rate_limit, seed=0).start()
+
+    workdir = tempfile.mkdtemp(prefix="cosmos-proposals-benchmark-")
+    zip_location = os.path.join(workdir, "chain-registry.zip")
+    build_registry_zip(zip_location, chains_data, cosmos_servers)
+
+    mongo_db = get_database(args.mongo_uri, counter)
+
+    # the registry archive is shared at class level, start every run from this run's archive
+    ChainRegistry.archive = None
+    ChainRegistry.archive_key = None
+    http_client = HTTPClient(max_requests_per_host=args.per_host_requests)
+    chain_names = [chain.chain_name for chain in chains_data]
+    chain_registry = ChainRegistry(zip_location=zip_location, log_level=logging.WARNING, dao_proposal_modules={"neutron-1": NEUTRON_PROPOSAL_MODULES}, init_chains=chain_names, http_client=http_client)
+
+    Proposal(mongo_db).ensure_indexes()
+    Notification(mongo_db).ensure_indexes()
+    outbox = Outbox(mongo_db)
+    outbox.ensure_indexes()
+
+    dedup_cache = DedupCache(mongo_db)
+    channel = SlackChannel(mongo_db, dedup_cache=dedup_cache).find_or_create_channel_by_id(CHANNEL_ID)
+    dedup_cache.load()
+
+    chains = {}
+    for chain_name in chain_names:
+        chain_registry_entry = chain_registry.get_chain(chain_name)
+        chain_object = Chain(mongo_db).find_or_create_chain_by_name(chain_name)
+        chains[chain_name] = {"chain_registry_entry": chain_registry_entry, "chain_object": chain_object}
+    chain_channels = {chain_name: [channel] for chain_name in chain_names}
+
+    poller = ProposalPoller(args.workers, logger)
+    scheduler = PollScheduler(chain_names)
+
+    slack_client = WebClient(token="xoxb-benchmark", base_url=slack_server.get_api_url())
+    dispatcher = SlackDispatcher(
+        slack_client,
+        outbox,
+        lambda row: channel.set_proposal_notified(row["proposal_id"], ts=row["ts"]),
+        logger,
+        channel_post_interval=args.channel_post_interval,
+        claim_interval=0.1
+    )
+    dispatcher.start()
+
+    print(f"\n{num_chains} chains, {args.hosts} hosts, {args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors")
+    print(f"{'cycle':>5} {'poll s':>8} {'deliver s':>9} {'notified':>8} {'chain req':>9} {'slack req':>9} {'db ops':>7} {'rss MB':>7} {'heap MB':>8}")
+
+    counter.reset()
+    results = []
+    for cycle in range(1, args.cycles + 1):
+        # new proposals after the first cycle exercise the incremental path and the notification pipeline
+        if cycle > 1:
+            for chain in chains_data[:int(len(chains_data) * args.new_proposal_fraction)]:
+                chain.add_proposal()
+
+        for server in cosmos_servers + [slack_server]:
+            server.counters.reset()
+        counter.reset()
+
+        start_time = time.time()
+        notifications_needed = asyncio.run(poll_for_notifications(poller, chains, mongo_db, chain_channels, dedup_cache, scheduler, logger))
+        if len(notifications_needed) > 0:
+            outbox.enqueue(notifications_needed)
+            dispatcher.wake()
+        poll_time = time.time() - start_time
+
+        delivered = wait_for_delivery(outbox, args.delivery_timeout)
+        delivery_time = time.time() - start_time - poll_time
+
+        chain_requests = sum(sum(server.counters.reset().values()) for server in cosmos_servers)
+        slack_requests = sum(slack_server.counters.reset().values())
+        db_ops = counter.reset()
+        heap = tracemalloc.get_traced_memory()[0] / 1e6 if tracemalloc.is_tracing() else float("nan")
+
+        results.append((poll_time, delivery_time, chain_requests, db_ops))
+        print(
+            f"{cycle:>5} {poll_time:>8.3f} {delivery_time:>9.3f}{'' if delivered else '+'} {len(notifications_needed):>8} "
+            f"{chain_requests:>9} {slack_requests:>9} {db_ops:>7} {get_max_rss_mb():>7.1f} {heap:>8.1f}"
+        )
+
+    dispatcher.stop()
+    poller.shutdown()
+    http_client.close()
+    for server in cosmos_servers + [slack_server]:
+        server.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll and delivery cycle benchmark")
+    parser.add_argument("--chains", default="10,100", help="comma separated chain counts, one run each")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--proposals", type=int, default=20, help="proposals per chain")
+    parser.add_argument("--active-proposals", type=int, default=2, help="proposals per chain in their voting period")
+    parser.add_argument("--new-proposal-fraction", type=float, default=0.1, help="fraction of chains getting a new proposal every cycle")
+    parser.add_argument("--message-size", type=int, default=0, help="bytes of filler in every v1 proposal message")
+    parser.add_argument("--v1beta1-fraction", type=float, default=0.2, help="fraction of chains that only serve gov v1beta1")
+    parser.add_argument("--neutron", action="store_true", help="serve the first chain as neutron through the cosmwasm smart query")
+    parser.add_argument("--hosts", type=int, default=4, help="number of fake REST/RPC servers the chains are spread over")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of latency per chain request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of chain requests answered with a 500")
+    parser.add_argument("--slack-latency", type=float, default=0.01)
+    parser.add_argument("--slack-rate-limit", type=float, default=0.0, help="fraction of posts answered with a 429")
+    parser.add_argument("--channel-post-interval", type=float, default=0.0, help="seconds between posts to the channel, Slack allows about 1")
+    parser.add_argument("--delivery-timeout", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, default=10, help="proposal workers")
+    parser.add_argument("--per-host-requests", type=int, default=4)
+    parser.add_argument("--mongo-uri", default=None, help="local Mongo to use instead of mongomock, the benchmark database is dropped first")
+    parser.add_argument("--tracemalloc", action="store_true", help="report the traced Python heap, slows everything down")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    logger = get_configured_logger("benchmark", logging.WARNING, "")
+
+    for num_chains in [int(chains) for chains in args.chains.split(",")]:
+        run(args, num_chains, logger)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 import argparse
 from config import Config
-from chain_registry import ChainRegistry, Chain as ChainRegistryChain
-from mongo import get_client as get_mongo_client, get_database as get_mongo_database, SlackChannel, Chain, Proposal
+from chain_registry import ChainRegistry, ChainRegistryRefresher, Chain as ChainRegistryChain, HTTPClient
+from mongo import get_client as get_mongo_client, get_database as get_mongo_database, SlackChannel, Chain, Proposal, Notification, DedupCache, Outbox, ChainLease
 from datetime import datetime, timedelta
 from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
 import time
-from concurrent.futures import ThreadPoolExecutor
-from utils.lists import chunks
+import asyncio
 import os
-from requesting import get_active_proposals, normalize_proposal_response
+import signal
+from requesting import ProposalPoller, PollScheduler, ChainSharder, ProposalSubscriptions, NormalizedProposal, normalize_proposal_response
+from notifier import SlackDispatcher
+from metrics import start_metrics_server
+from metrics.metrics import MAIN_LOOP_SECONDS, CHAINS_POLLED, DISPATCHER_CLAIMED, set_outbox_rows
+from mongo.outbox import OUTBOX_QUEUED_STATES
+from tracing import span, TraceRecorder, SamplingProfiler
 
 from log import get_configured_logger
 
@@ -47,33 +51,68 @@ def main():
 
     logger = get_configured_logger(__name__, config.log_level, "")
 
+    if config.metrics["enabled"]:
+        start_metrics_server(config.metrics["port"], config.metrics["address"])
+        logger.info(f"Serving metrics on {config.metrics['address']}:{config.metrics['port']}")
+
     mongo_client = get_mongo_client(config.mongo_uri)
 
     mongo_db = get_mongo_database(mongo_client)
 
-    chain_registry = ChainRegistry(zip_location=config.chain_registry_zip_location, log_level=config.log_level, rest_overides=config.chain_registry_rest_overides, init_chains=config.chains)
+    http_client = HTTPClient(
+        max_requests_per_host=config.main_loop["per_host_requests"],
+        pool_connections=config.http["pool_connections"],
+        pool_maxsize=config.http["pool_maxsize"],
+        keep_alive=config.http["keep_alive"]
+    )
+
+    chain_registry = ChainRegistry(zip_location=config.chain_registry_zip_location, log_level=config.log_level, rest_overides=config.chain_registry_rest_overides, dao_proposal_modules=config.dao_proposal_modules, init_chains=config.chains, http_client=http_client, scoreboard_options=config.endpoint_scoring, hedging_options=config.hedged_requests, cache_location=config.chain_registry_cache_location)
 
     if config.do_slack:
         slack_client = WebClient(token=config.slack_bot_token, logger=logger)
         
-        configured_channel = None
+        configured_channel_ids = [slack_channel["id"] for slack_channel in config.slack_channels]
+        configured_channels = {}
 
         for result in slack_client.conversations_list(types="public_channel, private_channel"):
             for channel in result["channels"]:
-                if channel["id"] == config.slack_channel_id:
-                    configured_channel = channel
-                    break
+                if channel["id"] in configured_channel_ids:
+                    configured_channels[channel["id"]] = channel
 
-        if configured_channel is None:
-            raise Exception(f"Unable to find configured slack channel {config.slack_channel_id}")
-        
-        if not configured_channel["is_member"]:
-            raise Exception(f"Slack bot is not a member of configured slack channel {config.slack_channel_id}")
-        
-        if configured_channel["is_archived"]:
-            raise Exception(f"Configured slack channel {config.slack_channel_id} is archived")
+        for channel_id in configured_channel_ids:
+            if channel_id not in configured_channels:
+                raise Exception(f"Unable to find configured slack channel {channel_id}")
+
+            if not configured_channels[channel_id]["is_member"]:
+                raise Exception(f"Slack bot is not a member of configured slack channel {channel_id}")
+
+            if configured_channels[channel_id]["is_archived"]:
+                raise Exception(f"Configured slack channel {channel_id} is archived")
+
+    try:
+        Proposal(mongo_db).ensure_indexes()
+    except Exception as err:
+        logger.error(f"Unable to create proposal indexes, duplicate proposals may need to be removed: {err}")
+
+    Notification(mongo_db).ensure_indexes()
+
+    outbox = Outbox(mongo_db)
+    outbox.ensure_indexes()
+
+    dedup_cache = DedupCache(mongo_db)
 
-    channel = SlackChannel(mongo_db).find_or_create_channel_by_id(config.slack_channel_id)
+    channels = {}
+    for slack_channel in config.slack_channels:
+        channels[slack_channel["id"]] = SlackChannel(mongo_db, dedup_cache=dedup_cache).find_or_create_channel_by_id(slack_channel["id"])
+
+    # Channels subscribed to each chain, a chain's proposals are fetched once and fanned out to all of them
+    chain_channels = {}
+    for slack_channel in config.slack_channels:
+        for chain in slack_channel["chains"]:
+            chain_channels.setdefault(chain, []).append(channels[slack_channel["id"]])
+
+    # loaded after the channels so any legacy notification map has been migrated into the notifications collection
+    logger.info(f"Loaded {dedup_cache.load()} notified proposals into the dedup cache")
 
     chains = {}
     for chain in config.chains:
@@ -83,154 +122,317 @@ def main():
             logger.error(f"Unable to find chain {chain} in chain registry")
             continue
         chain_object = Chain(mongo_db).find_or_create_chain_by_name(chain)
+        chain_registry_entry.load_endpoint_gov_versions(chain_object.get_gov_api_endpoint_versions())
         chains[chain] = {
             "chain_registry_entry": chain_registry_entry,
             "chain_object": chain_object
         }
 
+    poller = ProposalPoller(config.main_loop["proposal_workers"], logger)
+
+    # With sharding, chains are added to the scheduler as this replica acquires their leases
+    sharder = None
+    if config.sharding["enabled"]:
+        chain_lease = ChainLease(mongo_db)
+        chain_lease.ensure_indexes()
+        sharder = ChainSharder(chain_lease, chains.keys(), config.sharding, log_level=config.log_level)
+        sharder.heartbeat()
+        sharder.start()
+
+    scheduler = PollScheduler(chains.keys() if sharder is None else [], config.poll_scheduling, config.poll_scheduling_chains)
+
+    # With subscriptions, reported proposals are fetched as soon as their events arrive and subscribed chains are only polled to
+    # reconcile, with sharding only the chains this replica holds are subscribed
+    subscriptions = None
+    if config.subscriptions["enabled"]:
+        subscriptions = ProposalSubscriptions(config.subscriptions, log_level=config.log_level)
+        for chain in scheduler.schedules.keys():
+            subscriptions.add_chain(chain, chains[chain]["chain_registry_entry"])
+
+    # Rows left in the outbox can belong to a channel that was removed from the config since, it is still recorded as notified there
+    def on_notification_delivered(row):
+        if row["channel_id"] not in channels:
+            logger.warning(f"Notification delivered to channel {row['channel_id']} which is no longer configured")
+            channels[row["channel_id"]] = SlackChannel(mongo_db, dedup_cache=dedup_cache).find_or_create_channel_by_id(row["channel_id"])
+        channels[row["channel_id"]].set_proposal_notified(row["proposal_id"], ts=row["ts"])
+
+    # Delivery picks up rows left in the outbox by a previous run straight away, without waiting for a poll
+    dispatcher = SlackDispatcher(
+        slack_client if config.do_slack else None,
+        outbox,
+        on_notification_delivered,
+        logger,
+        do_slack=config.do_slack,
+        workers=config.slack_dispatch["workers"],
+        channel_post_interval=config.slack_dispatch["channel_post_interval"],
+        batch_size=config.slack_dispatch["batch_size"],
+        lease_time=config.slack_dispatch["lease_time"],
+        claim_interval=config.slack_dispatch["claim_interval"]
+    )
+    dispatcher.start()
+    DISPATCHER_CLAIMED.set_function(dispatcher.get_claimed_count)
+
+    refresher = None
+    if config.chain_registry_refresh_interval > 0:
+        refresher = ChainRegistryRefresher(chain_registry, chains.keys(), config.chain_registry_refresh_interval, log_level=config.log_level)
+        refresher.start()
+
+    recorder = TraceRecorder(config.tracing["directory"], logger, always=config.tracing["enabled"], max_files=config.tracing["max_files"])
+    profiler = SamplingProfiler(config.profiling["directory"], logger, interval=config.profiling["sample_interval"])
+    profiler.request(config.profiling["cycles"])
+
+    # kill -USR1 profiles and kill -USR2 traces the next cycles of a running process
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.request(config.profiling["signal_cycles"]))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: recorder.request(config.tracing["signal_cycles"]))
+
     # main loop, does the following:
-    # - check for new proposals
+    # - check for new proposals on the chains that are due
     # - checks if those proposals have already had notifications sent for them
     # - sends notifications for proposals that have not had notifications sent for them
     logger.info("Starting main loop")
-    while True:
-        loop_start_time = time.time()
-        notifications_needed = []
-
-        # The active proposals data requests are done in chunks and threaded to speed up the process
-        # The number of threads is set in the config
-        # This is better optimized since the active proposal data requests are IO heavy and not CPU heavy
-        for chunk in chunks(list(chains.items()), config.main_loop["proposal_workers"]):
-            logger.info(f"Requesting active proposals for chain chunk {list(map(lambda chain: chain[0], chunk))}")
-            with ThreadPoolExecutor(max_workers=config.main_loop["proposal_workers"]) as executor:
-                executions = []
-                for chain in chunk:
-                    logger.debug(f"Submitting active proposals job for chain {chain[0]}")
-                    executions.append(executor.submit(get_active_proposals, chain[0], chain[1]["chain_registry_entry"], chain[1]["chain_object"], logger))
-                responses = [execution.result() for execution in executions]
-
-            for response in responses:
-                if response["error"] is not None:
-                    logger.error(f"Unable to get active proposals for chain {response['chain_name']}")
-                    logger.error(f"Error: {response['error']}")
-                    continue
-
-                active_proposals = response["active_proposals"]
-                chain_name = response["chain_name"]
-
-                chain_registry_entry = response["chain_registry_entry"]
-                chain_object = response["chain_object"]
-
-                if "proposals" not in active_proposals:
-                    logger.error(f"Active proposals response for chain {chain_name} does not contain a proposals key, cannot process")
-                    continue
-
-                for proposal in active_proposals["proposals"]:
-
-                    proposal_data = normalize_proposal_response(chain_registry_entry, proposal, response["request_method"])
-
-                    try:
-                        if proposal_data["status"] != "PROPOSAL_STATUS_VOTING_PERIOD":
-                            logger.info(f"Found non-active proposal {proposal_data['proposal_id']} on chain {chain_name}, skipping")
-                            continue
-                    except Exception as err:
-                        logger.info(f"Unable to pre-check proposal status {proposal_data['proposal_id']} on chain {chain_name}, skipping")
-                        continue
-
-                    try:
-                        if parse_submit_time(proposal_data["submit_time"]) < datetime.utcnow() - timedelta(days=PROPOSAL_SUBMITTIME_DAY_THRESHOLD):
-                            logger.info(f"Proposal {proposal_data['proposal_id']} submit time {proposal_data['submit_time']} on chain {chain_name} is older than {PROPOSAL_SUBMITTIME_DAY_THRESHOLD} days, skipping")
-                            continue
-                    except Exception as err:
-                        logger.error(f"Error parsing submit time for proposal {proposal_data['proposal_id']} on chain {chain_name}: {err}")
-
-                    logger.info(f"Found active proposal {proposal_data['proposal_id']} on chain {chain_name}")
-
-                    proposal_object = Proposal(mongo_db).find_or_create_proposal_by_chain_and_id(chain_object._id, proposal_data["proposal_id"])
-                    submit_time = proposal_object.get_or_set_proposal_submit_time(datetime.strptime(proposal_data["submit_time"].split(".")[0], "%Y-%m-%dT%H:%M:%S"))
-
-                    logger.info(f"Proposal {proposal_data['proposal_id']} submit time is {submit_time}")
-                    
-                    if not channel.is_proposal_notified(proposal_object._id):
-                        logger.info(f"Proposal {proposal_data['proposal_id']} is new, sending notification")
-                        text, blocks = get_new_proposal_slack_notification(chain_registry_entry, proposal_data)
-                        logger.debug(f"Text: {text}")
-                        logger.debug(f"Blocks: {blocks}")
-
-                        first_reply_text, first_reply_blocks = get_new_proposal_slack_first_reply(chain_registry_entry, proposal_data)
-
-                        logger.debug(f"First reply text: {first_reply_text}")
-                        logger.debug(f"First reply blocks: {first_reply_blocks}")
-
-                        notifications_needed.append({
-                            "proposal_id": proposal_data["proposal_id"],
-                            "proposal_object": proposal_object,
-                            "text": text,
-                            "blocks": blocks,
-                            "first_reply_text": first_reply_text,
-                            "first_reply_blocks": first_reply_blocks,
-                            "chain_registry_entry": chain_registry_entry,
-                            "chain_object": chain_object,
-                            "chain_name": chain_name
-                        })
-                        
-                    else:
-                        logger.info(f"Proposal {proposal_data['proposal_id']} has already been notified, skipping")
-
-        if len(notifications_needed) == 0:
-            logger.info("No new proposal notifications needed")
-        else:
-            for notification in notifications_needed:
-                chain_name = notification["chain_registry_entry"].pretty_name
-                chain_id = notification["chain_registry_entry"].chain_id
-                logger.info(f"Sending notification for proposal {notification['proposal_id']} on chain {chain_name} ({chain_id})")
-
-                resp = None
-                try:
-                    if config.do_slack:
-                        resp = slack_client.chat_postMessage(
-                            channel=config.slack_channel_id,
-                            text=notification["text"],
-                            blocks=notification["blocks"],
-                            unfurl_links=False,
-                        )
-                except SlackApiError as e:
-                    logger.error(f"Error sending Slack notification: {e.response['error']}")
-                else:
-                    if config.do_slack and resp is not None and resp["ok"] and len(notification["first_reply_blocks"]) != 0:
-                        try:
-                            slack_client.chat_postMessage(
-                                channel=config.slack_channel_id,
-                                text=notification["first_reply_text"],
-                                blocks=notification["first_reply_blocks"],
-                                unfurl_links=False,
-                                thread_ts=resp["ts"]
-                            )
-                        except SlackApiError as e:
-                            logger.error(f"Error sending Slack first reply notification: {e.response['error']}")
-
-                    channel.set_proposal_notified(notification["proposal_object"]._id)
-                    logger.info(f"Proposal {notification['proposal_id']} notified")
-                    time.sleep(10)
-
-        loop_end_time = time.time()
-        loop_time = loop_end_time - loop_start_time
-
-        logger.info(f"Main loop finished in {round(loop_time, 2)} seconds, sleeping for {config.main_loop['sleep_time']} seconds")
-
-        time.sleep(config.main_loop["sleep_time"])
-
-def get_new_proposal_slack_notification(chain_registry_entry: ChainRegistryChain, proposal):
+    try:
+        cycle = 0
+        while True:
+            cycle += 1
+            recorder.start_cycle(cycle)
+            profiler.start_cycle()
+            loop_start_time = time.time()
+
+            # Chains updated by the registry refresher are swapped in between cycles, never while a poll is running
+            if refresher is not None:
+                for chain, chain_registry_entry in refresher.get_updates().items():
+                    logger.info(f"Using updated chain registry entry for chain {chain}")
+                    chains[chain] = {**chains[chain], "chain_registry_entry": chain_registry_entry}
+                    if subscriptions is not None:
+                        subscriptions.update_chain(chain, chain_registry_entry)
+
+            if sharder is not None:
+                apply_chain_ownership(sharder, chains, scheduler, subscriptions, mongo_db, dedup_cache, logger)
+
+            proposal_ids = {}
+            if subscriptions is not None:
+                apply_subscription_changes(subscriptions, scheduler, config.subscriptions["reconciliation_interval"], logger)
+                proposal_ids = subscriptions.get_events()
+
+            due_chains = {chain: chains[chain] for chain in scheduler.get_due_chains()}
+
+            # A due chain's full poll covers the proposals reported for it, the other reported chains only fetch those proposals
+            proposal_ids = {chain: ids for chain, ids in proposal_ids.items() if chain in chains and chain not in due_chains}
+            polled_chains = {**due_chains, **{chain: chains[chain] for chain in proposal_ids}}
+
+            # The chains are requested concurrently, limited globally by the number of proposal workers and per host by the chain registry HTTP client
+            # Each chain's response is processed as soon as it arrives, so a slow chain only delays itself
+            with span("main_loop.poll", chains=len(due_chains), fetches=len(proposal_ids)):
+                notifications_needed = asyncio.run(
+                    poll_for_notifications(poller, polled_chains, mongo_db, chain_channels, dedup_cache, scheduler, logger, proposal_ids=proposal_ids)
+                )
+
+            if len(notifications_needed) == 0:
+                logger.info("No new proposal notifications needed")
+            else:
+                with span("main_loop.enqueue", notifications=len(notifications_needed)):
+                    queued = outbox.enqueue(notifications_needed)
+                dispatcher.wake()
+                logger.info(f"Queued {queued} new proposal notifications in the outbox, {dispatcher.get_claimed_count()} being delivered")
+
+            loop_end_time = time.time()
+            loop_time = loop_end_time - loop_start_time
+            MAIN_LOOP_SECONDS.observe(loop_time)
+            CHAINS_POLLED.inc(len(due_chains))
+
+            try:
+                set_outbox_rows(outbox.get_status_counts(OUTBOX_QUEUED_STATES), OUTBOX_QUEUED_STATES)
+            except Exception as err:
+                logger.error(f"Unable to count outbox notifications: {err}")
+
+            sleep_time = scheduler.get_sleep_time()
+            if sharder is not None:
+                # chains acquired by the sharder are picked up on the next loop
+                sleep_time = min(sleep_time, config.sharding["heartbeat_interval"])
+            logger.info(
+                f"Main loop polled {len(due_chains)} chains and fetched reported proposals on {len(proposal_ids)} chains in {round(loop_time, 2)} seconds, "
+                f"sleeping for up to {round(sleep_time, 2)} seconds"
+            )
+            # cumulative, also exported as metrics
+            logger.debug(f"HTTP connection stats: {http_client.get_stats()}")
+
+            if subscriptions is not None:
+                # cut short by the next reported proposal
+                subscriptions.wait(sleep_time)
+            else:
+                time.sleep(sleep_time)
+
+            # the sleep is part of the cycle, notifications queued by it are delivered then
+            recorder.finish_cycle()
+            profiler.finish_cycle()
+    finally:
+        # the poll workers are left to finish their requests, nothing waits for their answers any more
+        poller.shutdown()
+
+def apply_chain_ownership(sharder: ChainSharder, chains, scheduler: PollScheduler, subscriptions: ProposalSubscriptions, mongo_db, dedup_cache: DedupCache, logger):
+    gained, lost = sharder.get_changes()
+
+    for chain in lost:
+        logger.info(f"Chain {chain} is no longer polled by this replica")
+        scheduler.remove_chain(chain)
+        if subscriptions is not None:
+            subscriptions.remove_chain(chain)
+
+    for chain in gained:
+        logger.info(f"Chain {chain} is now polled by this replica")
+        # the previous owner moved the chain's sync state on, start from the stored state rather than this replica's copy
+        chain_object = Chain(mongo_db).find_or_create_chain_by_name(chain)
+        chains[chain]["chain_registry_entry"].load_endpoint_gov_versions(chain_object.get_gov_api_endpoint_versions())
+        chains[chain] = {**chains[chain], "chain_object": chain_object}
+        scheduler.add_chain(chain)
+        if subscriptions is not None:
+            subscriptions.add_chain(chain, chains[chain]["chain_registry_entry"])
+
+    if len(gained) > 0:
+        # pick up the notifications the previous owners sent
+        dedup_cache.load()
+
+def apply_subscription_changes(subscriptions: ProposalSubscriptions, scheduler: PollScheduler, reconciliation_interval, logger):
+    connected, disconnected = subscriptions.get_changes()
+
+    for chain in connected:
+        logger.info(f"Chain {chain} proposals are reported by its event subscription, polling it every {reconciliation_interval} seconds")
+        scheduler.set_reconciliation_interval(chain, reconciliation_interval)
+
+    for chain in disconnected:
+        logger.info(f"Chain {chain} event subscription dropped, polling it on its own interval until it reconnects")
+        scheduler.set_reconciliation_interval(chain, None)
+
+async def poll_for_notifications(poller: ProposalPoller, chains, mongo_db, chain_channels, dedup_cache: DedupCache, scheduler: PollScheduler, logger, proposal_ids={}):
+    notifications_needed = []
+    full_resync_intervals = {chain: scheduler.get_chain_option(chain, "full_resync_interval") for chain in chains if chain in scheduler.schedules}
+    async for response in poller.poll(chains, proposal_ids, full_resync_intervals):
+        # targeted fetches leave the chain's poll schedule alone
+        if not response["targeted"]:
+            chain_object = response["chain_object"]
+            scheduler.record_poll(
+                response["chain_name"],
+                response["error"],
+                chain_object.get_proposal_sequence(),
+                response["poll_time"],
+                open_proposals=chain_object.get_open_proposal_count(),
+            )
+        with span("main_loop.process_response", chain=response["chain_name"]):
+            notifications_needed += get_response_notifications(response, mongo_db, chain_channels.get(response["chain_name"], []), dedup_cache, logger)
+    return notifications_needed
+
+def get_response_notifications(response, mongo_db, channels, dedup_cache: DedupCache, logger):
+    notifications_needed = []
+
+    if response["error"] is not None:
+        logger.error(f"Unable to get active proposals for chain {response['chain_name']}")
+        logger.error(f"Error: {response['error']}")
+        return notifications_needed
+
+    active_proposals = response["active_proposals"]
+    chain_name = response["chain_name"]
+
+    chain_registry_entry = response["chain_registry_entry"]
+    chain_object = response["chain_object"]
+
+    if "proposals" not in active_proposals:
+        logger.error(f"Active proposals response for chain {chain_name} does not contain a proposals key, cannot process")
+        return notifications_needed
+
+    found_proposals = []
+    for proposal in active_proposals["proposals"]:
+
+        try:
+            proposal_data = normalize_proposal_response(chain_registry_entry, proposal, response["request_method"])
+        except Exception as err:
+            logger.info(f"Unable to normalize proposal on chain {chain_name}, skipping: {err}")
+            continue
+
+        if proposal_data.status != "PROPOSAL_STATUS_VOTING_PERIOD":
+            logger.info(f"Found non-active proposal {proposal_data.proposal_id} on chain {chain_name}, skipping")
+            continue
+
+        if proposal_data.submit_time is None:
+            logger.error(f"Error parsing submit time for proposal {proposal_data.proposal_id} on chain {chain_name}")
+            continue
+
+        if proposal_data.submit_time < datetime.utcnow() - timedelta(days=PROPOSAL_SUBMITTIME_DAY_THRESHOLD):
+            logger.info(f"Proposal {proposal_data.proposal_id} submit time {proposal_data.submit_time} on chain {chain_name} is older than {PROPOSAL_SUBMITTIME_DAY_THRESHOLD} days, skipping")
+            continue
+
+        logger.info(f"Found active proposal {proposal_data.proposal_id} on chain {chain_name}")
+        found_proposals.append(proposal_data)
+
+    # Proposals seen on the chain's last poll come from the dedup cache, the rest are resolved against the database in one query and one bulk write
+    seen_proposals = dedup_cache.get_seen_proposals(chain_object._id)
+    unseen_proposals = [
+        (chain_object._id, proposal_data.proposal_id, proposal_data.submit_time)
+        for proposal_data in found_proposals
+        if proposal_data.proposal_id not in seen_proposals
+    ]
+
+    proposal_objects = {(chain_object._id, proposal_id): proposal_object for proposal_id, proposal_object in seen_proposals.items()}
+    if len(unseen_proposals) > 0:
+        proposal_objects.update(Proposal(mongo_db).bulk_find_or_create_proposals(unseen_proposals))
+
+    # Incremental polls only return new proposals, so the ones seen before are kept until the next full poll
+    current_proposals = {
+        proposal_data.proposal_id: proposal_objects[(chain_object._id, proposal_data.proposal_id)]
+        for proposal_data in found_proposals
+    }
+    if not response.get("full_sync", True):
+        current_proposals = {**seen_proposals, **current_proposals}
+    dedup_cache.set_seen_proposals(chain_object._id, current_proposals)
+
+    for proposal_data in found_proposals:
+        proposal_object = proposal_objects[(chain_object._id, proposal_data.proposal_id)]
+        submit_time = proposal_object.get_proposal_submit_time()
+
+        logger.info(f"Proposal {proposal_data.proposal_id} submit time is {submit_time}")
+
+        unnotified_channels = [channel for channel in channels if not channel.is_proposal_notified(proposal_object._id)]
+        if len(unnotified_channels) == 0:
+            logger.info(f"Proposal {proposal_data.proposal_id} has already been notified, skipping")
+            continue
+
+        logger.info(f"Proposal {proposal_data.proposal_id} is new, sending notification to {len(unnotified_channels)} channels")
+
+        # The messages are the same for every channel, so they are only built once
+        text, blocks = get_new_proposal_slack_notification(chain_registry_entry, proposal_data)
+        logger.debug(f"Text: {text}")
+        logger.debug(f"Blocks: {blocks}")
+
+        first_reply_text, first_reply_blocks = get_new_proposal_slack_first_reply(chain_registry_entry, proposal_data)
+
+        logger.debug(f"First reply text: {first_reply_text}")
+        logger.debug(f"First reply blocks: {first_reply_blocks}")
+
+        for channel in unnotified_channels:
+            notifications_needed.append({
+                "channel_id": channel.channel_id,
+                "proposal_id": proposal_data.proposal_id,
+                "proposal_object": proposal_object,
+                "text": text,
+                "blocks": blocks,
+                "first_reply_text": first_reply_text,
+                "first_reply_blocks": first_reply_blocks,
+                "chain_name": chain_name
+            })
+
+    return notifications_needed
+
+def get_new_proposal_slack_notification(chain_registry_entry: ChainRegistryChain, proposal: NormalizedProposal):
 
     chain_name = chain_registry_entry.pretty_name
     chain_id = chain_registry_entry.chain_id
 
     try:
-        title = proposal['title']
+        title = proposal.title
         if title == "":
             raise
     except:
-        title = f"No title (Type is {proposal['type']})"
+        title = f"No title (Type is {proposal.type})"
 
     blocks = [
         {
@@ -247,16 +449,16 @@ def get_new_proposal_slack_notification(chain_registry_entry: ChainRegistryChain
 			"type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"#{proposal['proposal_id']}. {title}"
+                "text": f"#{proposal.proposal_id}. {title}"
             }
         }
     ]
 
-    text = f"New proposal on {chain_name} ({chain_id}): #{proposal['proposal_id']}. {title}"
+    text = f"New proposal on {chain_name} ({chain_id}): #{proposal.proposal_id}. {title}"
 
     return text, blocks
 
-def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain, proposal):
+def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain, proposal: NormalizedProposal):
 
     mintscan_chain_explorer = chain_registry_entry.get_explorer(explorer_name="mintscan")
 
@@ -264,7 +466,7 @@ def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain,
     explorer_url = ""
     try:
         if chain_registry_entry.chain_id == "neutron-1":
-            explorer_url = f"https://governance.neutron.org/proposals/{proposal['proposal_id']}"
+            explorer_url = f"https://governance.neutron.org/proposals/{proposal.proposal_id}"
             explorer_link = {
                 "type": "section",
                 "text": {
@@ -273,7 +475,7 @@ def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain,
                 }
             }
         elif chain_registry_entry.chain_id == "kaiyo-1":
-            explorer_url = f"https://blue.kujira.network/govern/{proposal['proposal_id']}"
+            explorer_url = f"https://blue.kujira.network/govern/{proposal.proposal_id}"
             explorer_link = {
                 "type": "section",
                 "text": {
@@ -283,7 +485,7 @@ def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain,
             }
         elif chain_registry_entry.chain_id == "pirin-1" or chain_registry_entry.chain_id == "columbus-5":
             ping_pub_chain_explorer = chain_registry_entry.get_explorer(explorer_name="ping.pub")
-            explorer_url = f"{ping_pub_chain_explorer['url']}/gov/{proposal['proposal_id']}"
+            explorer_url = f"{ping_pub_chain_explorer['url']}/gov/{proposal.proposal_id}"
             explorer_link = {
                 "type": "section",
                 "text": {
@@ -292,7 +494,7 @@ def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain,
                 }
             }
         elif mintscan_chain_explorer is not None:
-            explorer_url = f"{mintscan_chain_explorer['url']}/proposals/{proposal['proposal_id']}"
+            explorer_url = f"{mintscan_chain_explorer['url']}/proposals/{proposal.proposal_id}"
             explorer_link = {
                 "type": "section",
                 "text": {
@@ -306,7 +508,7 @@ def get_new_proposal_slack_first_reply(chain_registry_entry: ChainRegistryChain,
 
     description = ""
     try:
-        description = proposal['description']
+        description = proposal.description
 
         if len(description) > 300:
             description = description[:300].strip() + "..."
@@ -365,9 +567,5 @@ def parse_description_to_blocks(description: str):
 
     return description_blocks
 
-def parse_submit_time(timestamp):
-    # remove the milliseconds from the timestamp, cosmos timestamps dont have a standard number of milliseconds which makes them hard to parse in Python
-    return datetime.strptime(timestamp.split(".")[0], "%Y-%m-%dT%H:%M:%S")
-
 if __name__ == '__main__':
     main()
\ No newline at end of file
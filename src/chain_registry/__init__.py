@@ -1,2 +1,4 @@
 from .chain_registry import ChainRegistry
-from .chain import Chain
\ No newline at end of file
+from .chain import Chain
+from .http import HTTPClient
+from .refresher import ChainRegistryRefresher
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+
+CACHE_VERSION = 1
+
+class ChainRegistryCache:
+
+    """On-disk cache of the filtered chain.json entries of a registry archive
+
+    The cache is keyed by the archive's hash or ETag plus the filter that selected the entries,
+    so warm restarts against the same archive skip reading the zip entirely.
+    """
+
+    def __init__(self, location):
+        self.location = location
+
+    def read(self, filter_key):
+        if self.location is None or not os.path.exists(self.location):
+            return None
+        try:
+            with open(self.location, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except Exception:
+            return None
+        if cache.get("version") != CACHE_VERSION or cache.get("filter_key") != filter_key:
+            return None
+        return cache
+
+    def get_entries(self, archive_key, filter_key):
+        cache = self.read(filter_key)
+        if cache is None or cache["archive_key"] != archive_key:
+            return None
+        return [(entry["chain_path"], entry["raw"].encode("utf-8")) for entry in cache["entries"]]
+
+    def get_archive_key(self, filter_key):
+        cache = self.read(filter_key)
+        if cache is None:
+            return None
+        return cache["archive_key"]
+
+    def write(self, archive_key, filter_key, entries):
+        if self.location is None:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "archive_key": archive_key,
+            "filter_key": filter_key,
+            "entries": [{"chain_path": chain_path, "raw": raw.decode("utf-8")} for chain_path, raw in entries],
+        }
+        # write to a temporary file first so a crash never leaves a half written cache behind
+        directory = os.path.dirname(os.path.abspath(self.location))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, delete=False) as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(f.name, self.location)
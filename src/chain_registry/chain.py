@@ -1,11 +1,99 @@
 
+import base64
 import requests
 import os
-from concurrent.futures import ThreadPoolExecutor
-import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from log import get_configured_logger
+from tracing import span, traced
+from metrics.metrics import ENDPOINT_REQUESTS, ENDPOINT_REQUEST_SECONDS, HEALTH_CHECK_SECONDS, RESULT_SUCCESS, RESULT_FAILURE
 from logging import INFO
+from .http import HTTPClient
+from .scoreboard import EndpointScoreboard
+from .streaming import parse_proposals_stream, MissingProposalsError
+from .protobuf import (
+    encode_proposals_request, decode_proposals_response, encode_proposal_request, decode_proposal_response, decode_v1_proposal, decode_v1beta1_proposal,
+    ProtobufDecodeError, PROPOSAL_STATUS_UNSPECIFIED, PROPOSAL_STATUS_DEPOSIT_PERIOD, PROPOSAL_STATUS_VOTING_PERIOD
+)
+
+GOV_V1 = "v1"
+GOV_V1BETA1 = "v1beta1"
+
+API_REST = "rest"
+API_RPC = "rpc"
+
+# Statuses of a route the endpoint does not implement, an API version mismatch that says nothing about the endpoint's health
+API_VERSION_MISMATCH_STATUS_CODES = [501]
+
+GOV_PROPOSALS_PATHS = {
+    GOV_V1: "/cosmos/gov/v1/proposals",
+    GOV_V1BETA1: "/cosmos/gov/v1beta1/proposals",
+}
+
+# gRPC query paths of the proposal queries, sent through the RPC servers' abci_query
+GOV_QUERY_PATHS = {
+    GOV_V1: "/cosmos.gov.v1.Query/Proposals",
+    GOV_V1BETA1: "/cosmos.gov.v1beta1.Query/Proposals",
+}
+
+GOV_PROPOSAL_QUERY_PATHS = {
+    GOV_V1: "/cosmos.gov.v1.Query/Proposal",
+    GOV_V1BETA1: "/cosmos.gov.v1beta1.Query/Proposal",
+}
+
+PROTOBUF_PROPOSAL_DECODERS = {
+    GOV_V1: decode_v1_proposal,
+    GOV_V1BETA1: decode_v1beta1_proposal,
+}
+
+# ABCI error the SDK answers a query path the chain's app does not register with, the RPC equivalent of a 501
+ABCI_UNKNOWN_REQUEST_CODESPACE = "sdk"
+ABCI_UNKNOWN_REQUEST_CODE = 6
+
+GOV_PROPOSAL_ID_KEYS = {
+    GOV_V1: "id",
+    GOV_V1BETA1: "proposal_id",
+}
+
+# The only proposal fields kept from a proposals response, everything the normalizers in requesting.normalization read.
+# Proposal messages can be megabytes of wasm code or upgrade plans, so responses are streamed and the rest is never built.
+GOV_PROPOSAL_FIELDS = {
+    GOV_V1: {
+        "id",
+        "title",
+        "summary",
+        "submit_time",
+        "status",
+        "messages.item.@type",
+        "messages.item.content.title",
+        "messages.item.content.description",
+    },
+    GOV_V1BETA1: {
+        "proposal_id",
+        "content.title",
+        "content.description",
+        "content.@type",
+        "submit_time",
+        "status",
+    },
+}
+
+DEFAULT_HEDGING_OPTIONS = {
+    "enabled": False,
+    # maximum number of requests in flight at once for a single proposal request
+    "fanout": 2,
+    # seconds to wait for an answer before hedging to the next endpoint, None uses the observed p95 latency of the chain
+    "delay": None,
+}
+
+# hedge delay used until enough latency samples have been seen to estimate a p95
+DEFAULT_HEDGE_DELAY = 1.0
+
+# page size for incremental proposal requests, the gov module's default. Incremental polls start below the oldest proposal
+# still in its deposit period, so a page this size covers the proposals of a whole deposit period in a single request
+INCREMENTAL_PAGE_LIMIT = 100
 
 # TODO: to package this properly, we need to pass this as a param instead
 num_workers = int(os.environ.get("NUM_WORKERS", 10))
@@ -14,10 +102,17 @@ requests.packages.urllib3.disable_warnings(
     requests.packages.urllib3.exceptions.InsecureRequestWarning
 )
 
+class GovVersionNotImplemented(Exception):
+    pass
+
 class Chain():
-    def __init__(self, chain_data, log_level=INFO, default_explorer="mintscan", rest_overides=[]):
+    def __init__(self, chain_data, log_level=INFO, default_explorer="mintscan", rest_overides=[], dao_proposal_modules=[], http_client=None, scoreboard_options={}, hedging_options={}):
         self.chain_data = chain_data
 
+        if http_client is None:
+            http_client = HTTPClient()
+        self.http_client = http_client
+
         self.chain_id = chain_data["chain_id"]
         self.logger = get_configured_logger(__name__ + f" ({self.chain_id})", log_level, "")
 
@@ -28,6 +123,14 @@ class Chain():
         self.pretty_name = ""
 
         self.rest_overides = rest_overides
+        # DAO DAO proposal module contracts the chain's proposals are requested from instead of the gov module
+        self.dao_proposal_modules = dao_proposal_modules
+
+        # Endpoint scoreboards live as long as the chain, so endpoint history carries over between polls
+        self.rest_scoreboard = EndpointScoreboard(self.rest_servers, scoreboard_options)
+        self.rpc_scoreboard = EndpointScoreboard(self.rpc_servers, scoreboard_options)
+
+        self.hedging_options = {**DEFAULT_HEDGING_OPTIONS, **hedging_options}
 
         if "pretty_name" in chain_data:
             self.pretty_name = chain_data["pretty_name"]
@@ -51,13 +154,94 @@ class Chain():
     
     def get_healthy_rpc_servers(self):
         return self._execute_rpc_health_check(self.get_rpc_servers())
+
+    def get_ranked_rest_servers(self):
+        self._refresh_scoreboard_if_stale(self.rest_scoreboard, self._execute_rest_health_check, self.get_rest_servers())
+        return self.rest_scoreboard.get_ranked_endpoints(self.get_rest_servers())
+
+    def get_ranked_rpc_servers(self):
+        self._refresh_scoreboard_if_stale(self.rpc_scoreboard, self._execute_rpc_health_check, self.get_rpc_servers())
+        return self.rpc_scoreboard.get_ranked_endpoints(self.get_rpc_servers())
+
+    def _refresh_scoreboard_if_stale(self, scoreboard, health_check, servers):
+        # Health checks run in the background so they never sit in front of a proposal request,
+        # until the first refresh finishes endpoints are ranked by the results of live requests alone
+        if scoreboard.is_stale() and scoreboard.start_refresh():
+            self.logger.debug("Refreshing endpoint scoreboard for chain %s", self.chain_id)
+            threading.Thread(target=self._run_scoreboard_refresh, args=(scoreboard, health_check, servers), daemon=True).start()
+
+    def _run_scoreboard_refresh(self, scoreboard, health_check, servers):
+        try:
+            health_check(servers)
+        except Exception as err:
+            self.logger.debug("Endpoint scoreboard refresh failed for chain %s: %s", self.chain_id, err)
+        finally:
+            scoreboard.finish_refresh()
+
+    def get_endpoint_gov_versions(self):
+        return self.rest_scoreboard.get_gov_versions()
+
+    def load_endpoint_gov_versions(self, gov_versions):
+        self.rest_scoreboard.load_gov_versions(gov_versions)
+
+    def inherit_state(self, old_chain):
+        # Keep endpoint scores and gov API versions across a registry refresh so known endpoints are not re-probed
+        self.rest_scoreboard.inherit(old_chain.rest_scoreboard)
+        self.rpc_scoreboard.inherit(old_chain.rpc_scoreboard)
+
+    def get_gov_version_reprobe_time(self):
+        return self.rest_scoreboard.options["gov_version_reprobe_time"]
+
+    def request_rest(self, endpoint, path, parse=None, **kwargs):
+        return self._request(self.rest_scoreboard, API_REST, endpoint, path, parse, **kwargs)
+
+    def request_rpc(self, endpoint, path, parse=None, **kwargs):
+        return self._request(self.rpc_scoreboard, API_RPC, endpoint, path, parse, **kwargs)
+
+    # Without parse the response is returned as it is. With it, parse is run on a successful response and its result is returned,
+    # the response is closed afterwards. The endpoint is only scored as healthy once the response passed parse, so endpoints that
+    # answer quickly with errors or bodies that can not be read fall behind the ones that answer properly.
+    def _request(self, scoreboard, api, endpoint, path, parse=None, **kwargs):
+        start_time = time.time()
+        response = None
+        try:
+            with span("chain.request", chain_id=self.chain_id, api=api, endpoint=endpoint, path=path) as request_span:
+                response = self.http_client.get(f"{endpoint}{path}", **kwargs)
+                request_span.set("status_code", response.status_code)
+            request_time = time.time() - start_time
+            ENDPOINT_REQUEST_SECONDS.labels(self.chain_id, api, endpoint).observe(request_time)
+
+            result = response
+            if parse is not None:
+                try:
+                    response.raise_for_status()
+                    result = parse(response)
+                finally:
+                    response.close()
+        except GovVersionNotImplemented:
+            raise
+        except Exception:
+            if response is None or response.status_code not in API_VERSION_MISMATCH_STATUS_CODES:
+                scoreboard.record_failure(endpoint)
+                ENDPOINT_REQUESTS.labels(self.chain_id, api, endpoint, RESULT_FAILURE).inc()
+            raise
+
+        if response.status_code in API_VERSION_MISMATCH_STATUS_CODES:
+            return result
+        if not response.ok:
+            scoreboard.record_failure(endpoint)
+            ENDPOINT_REQUESTS.labels(self.chain_id, api, endpoint, RESULT_FAILURE).inc()
+        else:
+            scoreboard.record_success(endpoint, request_time)
+            ENDPOINT_REQUESTS.labels(self.chain_id, api, endpoint, RESULT_SUCCESS).inc()
+        return result
     
     def _execute_rest_health_check(self, servers):
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
             healthy_endpoints = [
                 server
                 for server, is_healthy in executor.map(
-                    lambda server: (server, self._is_rest_endpoint_healthy(server)), servers
+                    lambda server: self._run_health_check(API_REST, self._is_rest_endpoint_healthy, server), servers
                 )
                 if is_healthy
             ]
@@ -68,39 +252,57 @@ class Chain():
             healthy_endpoints = [
                 server
                 for server, is_healthy in executor.map(
-                    lambda server: (server, self._is_rpc_endpoint_healthy(server)), servers
+                    lambda server: self._run_health_check(API_RPC, self._is_rpc_endpoint_healthy, server), servers
                 )
                 if is_healthy
             ]
         return healthy_endpoints
 
+    def _run_health_check(self, api, health_check, endpoint):
+        start_time = time.time()
+        with span("chain.health_check", chain_id=self.chain_id, api=api, endpoint=endpoint) as health_check_span:
+            is_healthy = health_check(endpoint)
+            health_check_span.set("healthy", is_healthy)
+        HEALTH_CHECK_SECONDS.labels(api, RESULT_SUCCESS if is_healthy else RESULT_FAILURE).observe(time.time() - start_time)
+        return endpoint, is_healthy
+
     def _is_rest_endpoint_healthy(self, endpoint):
+        start_time = time.time()
         try:
-            response = requests.get(f"{endpoint}/syncing", timeout=3, verify=False)
+            response = self.http_client.get(f"{endpoint}/syncing", timeout=3, verify=False)
             if response.status_code == 200:
                 # never use chains that are still syncing
                 if response.json()["syncing"]:
                     self.logger.debug("Chain %s endpoint %s is still syncing from /syncing request", self.chain_id, endpoint)
+                    self.rest_scoreboard.record_health_check(endpoint, True, True, time.time() - start_time)
                     return False
                 self.logger.debug("Chain %s endpoint %s is healthy from /syncing request", self.chain_id, endpoint)
+                self.rest_scoreboard.record_health_check(endpoint, True, False, time.time() - start_time)
                 return True
         except Exception as err:
             self.logger.debug("Chain %s endpoint %s is unhealthy from error", self.chain_id, endpoint)
+            self.rest_scoreboard.record_health_check(endpoint, False, None)
             return False
+        self.rest_scoreboard.record_health_check(endpoint, False, None)
         return False
 
     def _is_rpc_endpoint_healthy(self, endpoint):
+        start_time = time.time()
         try:
-            response = requests.get(f"{endpoint}/status", timeout=3, verify=False)
+            response = self.http_client.get(f"{endpoint}/status", timeout=3, verify=False)
             if response.status_code == 200:
                 if response.json()["result"]["sync_info"]["catching_up"]:
                     self.logger.debug("Chain %s endpoint %s is still syncing from /status request", self.chain_id, endpoint)
+                    self.rpc_scoreboard.record_health_check(endpoint, True, True, time.time() - start_time)
                     return False
                 self.logger.debug("Chain %s endpoint %s is healthy from /node_info request", self.chain_id, endpoint)
+                self.rpc_scoreboard.record_health_check(endpoint, True, False, time.time() - start_time)
                 return True
         except:
             self.logger.debug("Chain %s endpoint %s is unhealthy from error", self.chain_id, endpoint)
+            self.rpc_scoreboard.record_health_check(endpoint, False, None)
             return False
+        self.rpc_scoreboard.record_health_check(endpoint, False, None)
         return False
 
     def get_explorer(self, explorer_name=None):
@@ -112,86 +314,315 @@ class Chain():
                 return explorer
         return None
     
-    def get_active_proposals_v1(self):
-        resp = None
-        endpoints = []
-        if len(self.rest_overides) == 0:
-            endpoints = self.get_rest_servers()
-            random.shuffle(endpoints)
-        else:
+    # min_proposal_id switches to an incremental request that returns the proposals with a higher ID whatever their status,
+    # without it the voting and deposit period proposals are returned
+    @traced("chain.get_active_proposals_v1", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_active_proposals_v1(self, min_proposal_id=None):
+        endpoints = self._get_proposal_rest_endpoints(GOV_V1)
+        self.logger.debug("Attempting proposal request for chain %s with %d endpoints", self.chain_id, len(endpoints))
+        return self._request_proposals(endpoints, lambda endpoint: self._request_proposals_v1(endpoint, min_proposal_id))
+
+    @traced("chain.get_active_proposals_v1beta1", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_active_proposals_v1beta1(self, min_proposal_id=None):
+        healthy_endpoints = self._get_proposal_rest_endpoints(GOV_V1BETA1)
+        self.logger.debug("Attempting proposal request for chain %s with %d healthy endpoints", self.chain_id, len(healthy_endpoints))
+        return self._request_proposals(healthy_endpoints, lambda endpoint: self._request_proposals_v1beta1(endpoint, min_proposal_id))
+
+    # Targeted fetches of the given proposals by ID whatever their status, for proposals reported by a subscription.
+    # They return the same shape as the proposal list requests, and fall back between gov versions and APIs the same way.
+    @traced("chain.get_proposals_v1", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_proposals_v1(self, proposal_ids):
+        endpoints = self._get_proposal_rest_endpoints(GOV_V1)
+        return self._request_proposals(endpoints, lambda endpoint: self._request_proposals_v1(endpoint, proposal_ids=proposal_ids))
+
+    @traced("chain.get_proposals_v1beta1", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_proposals_v1beta1(self, proposal_ids):
+        endpoints = self._get_proposal_rest_endpoints(GOV_V1BETA1)
+        return self._request_proposals(endpoints, lambda endpoint: self._request_proposals_v1beta1(endpoint, proposal_ids=proposal_ids))
+
+    def _get_proposal_rest_endpoints(self, gov_version):
+        if len(self.rest_overides) > 0:
             self.logger.debug("Rest endpoints are overriden for chain %s with values %s", self.chain_id, self.rest_overides)
-            endpoints = self.rest_overides
+            return self.rest_overides
 
-        self.logger.debug("Attempting proposal request for chain %s with %d endpoints", self.chain_id, len(endpoints))
-        for endpoint in endpoints:
-            self.logger.debug("Attempting proposal request for chain %s at %s", self.chain_id, endpoint)
-            response = None
+        endpoints = self.get_ranked_rest_servers()
+        if gov_version == GOV_V1:
+            # skip endpoints that recently told us they do not implement gov v1
+            endpoints = [endpoint for endpoint in endpoints if self.rest_scoreboard.get_gov_version(endpoint) != GOV_V1BETA1]
+        return endpoints
+
+    def _request_proposals_v1(self, endpoint, min_proposal_id=None, proposal_ids=None):
+        try:
+            data = self._request_gov(endpoint, GOV_V1, min_proposal_id, proposal_ids)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.reason == "Not Implemented":
+                self.logger.debug("V1 Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
+                self.rest_scoreboard.set_gov_version(endpoint, GOV_V1BETA1)
+                raise GovVersionNotImplemented(f"{self.chain_id}: Error getting active proposals at v1 endpoint, endpoint not implemented")
+            raise
+
+        self.rest_scoreboard.set_gov_version(endpoint, GOV_V1)
+        return data
+
+    def _request_proposals_v1beta1(self, endpoint, min_proposal_id=None, proposal_ids=None):
+        return self._request_gov(endpoint, GOV_V1BETA1, min_proposal_id, proposal_ids)
+
+    # The RPC fetchers send the same gov queries as protobuf through abci_query, ranked by the RPC scoreboard.
+    # They work on chains whose REST servers are down or rate limited, and the protobuf answer is much smaller than the REST JSON.
+    @traced("chain.get_active_proposals_v1_rpc", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_active_proposals_v1_rpc(self, min_proposal_id=None):
+        endpoints = [endpoint for endpoint in self.get_ranked_rpc_servers() if self.rpc_scoreboard.get_gov_version(endpoint) != GOV_V1BETA1]
+        self.logger.debug("Attempting RPC proposal request for chain %s with %d endpoints", self.chain_id, len(endpoints))
+        return self._request_proposals(endpoints, lambda endpoint: self._request_proposals_v1_rpc(endpoint, min_proposal_id), self.rpc_scoreboard)
+
+    @traced("chain.get_active_proposals_v1beta1_rpc", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_active_proposals_v1beta1_rpc(self, min_proposal_id=None):
+        endpoints = self.get_ranked_rpc_servers()
+        self.logger.debug("Attempting RPC proposal request for chain %s with %d endpoints", self.chain_id, len(endpoints))
+        return self._request_proposals(endpoints, lambda endpoint: self._request_gov(endpoint, GOV_V1BETA1, min_proposal_id, rpc=True), self.rpc_scoreboard)
+
+    @traced("chain.get_proposals_v1_rpc", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_proposals_v1_rpc(self, proposal_ids):
+        endpoints = [endpoint for endpoint in self.get_ranked_rpc_servers() if self.rpc_scoreboard.get_gov_version(endpoint) != GOV_V1BETA1]
+        return self._request_proposals(endpoints, lambda endpoint: self._request_proposals_v1_rpc(endpoint, proposal_ids=proposal_ids), self.rpc_scoreboard)
+
+    @traced("chain.get_proposals_v1beta1_rpc", lambda self, *args, **kwargs: {"chain_id": self.chain_id})
+    def get_proposals_v1beta1_rpc(self, proposal_ids):
+        return self._request_proposals(
+            self.get_ranked_rpc_servers(), lambda endpoint: self._request_gov(endpoint, GOV_V1BETA1, proposal_ids=proposal_ids, rpc=True), self.rpc_scoreboard
+        )
+
+    def _request_proposals_v1_rpc(self, endpoint, min_proposal_id=None, proposal_ids=None):
+        try:
+            data = self._request_gov(endpoint, GOV_V1, min_proposal_id, proposal_ids, rpc=True)
+        except GovVersionNotImplemented:
+            self.rpc_scoreboard.set_gov_version(endpoint, GOV_V1BETA1)
+            raise
+
+        self.rpc_scoreboard.set_gov_version(endpoint, GOV_V1)
+        return data
+
+    # Requests the given proposals one by one when proposal_ids is set, otherwise the active proposals page by page
+    def _request_gov(self, endpoint, gov_version, min_proposal_id=None, proposal_ids=None, rpc=False):
+        if proposal_ids is None:
+            return self._request_proposal_pages(endpoint, gov_version, min_proposal_id, self._request_proposals_page_rpc if rpc else None)
+
+        request_proposal = self._request_proposal_rpc if rpc else self._request_proposal
+        proposals = []
+        for proposal_id in proposal_ids:
+            proposals += request_proposal(endpoint, gov_version, proposal_id)["proposals"]
+        return {"proposals": proposals}
+
+    # Takes the same pagination params as the REST request and returns the same shape as the streamed REST response
+    def _request_proposals_page_rpc(self, endpoint, gov_version, params):
+        request_data = encode_proposals_request(
+            params.get("proposal_status", PROPOSAL_STATUS_UNSPECIFIED),
+            key=params.get("pagination.key"),
+            limit=params.get("pagination.limit"),
+            reverse=params.get("pagination.reverse") == "true"
+        )
+        return self._request_abci_query(
+            endpoint, gov_version, GOV_QUERY_PATHS[gov_version], request_data,
+            lambda value: decode_proposals_response(value, PROTOBUF_PROPOSAL_DECODERS[gov_version]), "proposals response"
+        )
+
+    def _request_proposal_rpc(self, endpoint, gov_version, proposal_id):
+        return self._request_abci_query(
+            endpoint, gov_version, GOV_PROPOSAL_QUERY_PATHS[gov_version], encode_proposal_request(proposal_id),
+            lambda value: decode_proposal_response(value, PROTOBUF_PROPOSAL_DECODERS[gov_version]), "proposal response"
+        )
+
+    # Returns the query's protobuf encoded answer decoded with decode, an answer that can not be decoded counts against the endpoint
+    def _request_abci_query(self, endpoint, gov_version, query_path, request_data, decode, response_name):
+        self.logger.debug("Attempting RPC proposal request for chain %s at %s", self.chain_id, endpoint)
+
+        def parse(response):
             try:
-                response = requests.get(
-                    f"{endpoint}/cosmos/gov/v1/proposals?proposal_status=2",
-                    verify=False,
-                    timeout=10
-                )
-                response.raise_for_status()
-            except Exception as e:
-                if response is not None and response.reason == "Not Implemented":
-                    self.logger.debug("V1 Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
-                    raise Exception(f"{self.chain_id}: Error getting active proposals at v1 endpoint, endpoint not implemented")
-                self.logger.debug("Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
-                continue
-            
-            resp = response
-            break
+                abci_response = response.json()["result"]["response"]
+            except Exception:
+                raise Exception(f"{self.chain_id}: ABCI query succeeded but response is not a valid abci_query result")
 
-        if resp is None:
-            raise Exception(f"{self.chain_id}: Error getting active proposals after trying all endpoints")
-        self.logger.info("Proposal request succeeded for chain %s with endpoint %s", self.chain_id, endpoint)
+            code = abci_response.get("code", 0)
+            if code != 0:
+                if code == ABCI_UNKNOWN_REQUEST_CODE and abci_response.get("codespace") == ABCI_UNKNOWN_REQUEST_CODESPACE:
+                    raise GovVersionNotImplemented(f"{self.chain_id}: Error getting active proposals with {gov_version} ABCI query, query path not registered")
+                raise Exception(f"{self.chain_id}: ABCI query failed with code {code}: {abci_response.get('log', '')}")
 
-        # Some chains seem to be returning 200 responses with error codes in the JSON, attempt to handle those chains
-        if resp.status_code == 200:
             try:
-                resp.json()
-            except:
-                raise Exception(f"{self.chain_id}: Proposal request succeeded but response is not valid json")
+                value = base64.b64decode(abci_response.get("value") or "")
+            except ValueError:
+                raise Exception(f"{self.chain_id}: ABCI query succeeded but response value is not valid base64")
+            try:
+                return decode(value)
+            except ProtobufDecodeError:
+                raise Exception(f"{self.chain_id}: ABCI query succeeded but response is not a valid {response_name}")
+
+        return self.request_rpc(
+            endpoint,
+            "/abci_query",
+            parse,
+            params={"path": f'"{query_path}"', "data": "0x" + request_data.hex()},
+            verify=False,
+            timeout=10
+        )
+
+    def _request_proposals_page(self, endpoint, gov_version, params):
+        return self._request_proposals_stream(endpoint, gov_version, GOV_PROPOSALS_PATHS[gov_version], params)
+
+    def _request_proposal(self, endpoint, gov_version, proposal_id):
+        return self._request_proposals_stream(endpoint, gov_version, f"{GOV_PROPOSALS_PATHS[gov_version]}/{int(proposal_id)}", {}, single=True)
+
+    def _request_proposals_stream(self, endpoint, gov_version, path, params, single=False):
+        self.logger.debug("Attempting proposal request for chain %s at %s", self.chain_id, endpoint)
+
+        def parse(response):
+            # Parsed straight off the socket in a single pass, only the fields the normalizers need are kept
+            response.raw.decode_content = True
             try:
-                resp.json()["proposals"]
-            except:
+                return parse_proposals_stream(response.raw, GOV_PROPOSAL_FIELDS[gov_version], single=single)
+            # Some chains seem to be returning 200 responses with error codes in the JSON, attempt to handle those chains
+            except MissingProposalsError:
                 raise Exception(f"{self.chain_id}: Proposal request succeeded but response does not have a proposals key")
-        return resp.json()
+            except Exception:
+                raise Exception(f"{self.chain_id}: Proposal request succeeded but response is not valid json")
 
-    def get_active_proposals_v1beta1(self):
-        resp = None
+        return self.request_rest(
+            endpoint,
+            path,
+            parse,
+            params=params,
+            verify=False,
+            timeout=10,
+            stream=True
+        )
 
-        if len(self.rest_overides) == 0:
-            healthy_endpoints = self.get_healthy_rest_servers()
-            random.shuffle(healthy_endpoints)
-        else:
-            self.logger.debug("Rest endpoints are overriden for chain %s with values %s", self.chain_id, self.rest_overides)
-            healthy_endpoints = self.rest_overides
+    # Without a min_proposal_id the voting period and deposit period proposals are returned, the deposit period ones tell the
+    # caller which proposals can still enter voting.
+    # With one, proposals of every status are requested newest first and paging stops at the first proposal at or below
+    # min_proposal_id, endpoints that ignore pagination.reverse are paged through completely instead.
+    # request_page requests a single page, REST by default.
+    def _request_proposal_pages(self, endpoint, gov_version, min_proposal_id=None, request_page=None):
+        if request_page is None:
+            request_page = self._request_proposals_page
 
-        self.logger.debug("Attempting proposal request for chain %s with %d healthy endpoints", self.chain_id, len(healthy_endpoints))
-        for endpoint in healthy_endpoints:
-            self.logger.debug("Attempting proposal request for chain %s at %s", self.chain_id, endpoint)
+        if min_proposal_id is None:
+            proposals = self._request_status_pages(endpoint, gov_version, PROPOSAL_STATUS_VOTING_PERIOD, request_page)
+            proposals += self._request_status_pages(endpoint, gov_version, PROPOSAL_STATUS_DEPOSIT_PERIOD, request_page)
+            return {"proposals": proposals}
+
+        id_key = GOV_PROPOSAL_ID_KEYS[gov_version]
+
+        proposals = []
+        params = {"pagination.reverse": "true", "pagination.limit": INCREMENTAL_PAGE_LIMIT}
+        reverse_honored = True
+        while True:
+            data = request_page(endpoint, gov_version, params)
+            page = data["proposals"]
+            page_ids = [int(proposal[id_key]) for proposal in page]
+
+            if len(page_ids) > 1 and page_ids[0] < page_ids[-1]:
+                reverse_honored = False
+
+            proposals += [proposal for proposal, proposal_id in zip(page, page_ids) if proposal_id > min_proposal_id]
+
+            next_key = (data.get("pagination") or {}).get("next_key")
+            if next_key is None or len(page_ids) == 0 or (reverse_honored and min(page_ids) <= min_proposal_id):
+                break
+            params["pagination.key"] = next_key
+
+        self.logger.debug("Incremental proposal request for chain %s found %d proposals newer than %s", self.chain_id, len(proposals), min_proposal_id)
+        return {"proposals": proposals}
+
+    # Every proposal with the given status, following next_key until the last page
+    def _request_status_pages(self, endpoint, gov_version, proposal_status, request_page):
+        proposals = []
+        params = {"proposal_status": proposal_status}
+        while True:
+            data = request_page(endpoint, gov_version, params)
+            proposals += data["proposals"]
+
+            next_key = (data.get("pagination") or {}).get("next_key")
+            # endpoints that ignore the key would hand out the same page forever
+            if next_key is None or len(data["proposals"]) == 0 or next_key == params.get("pagination.key"):
+                return proposals
+            params = {"proposal_status": proposal_status, "pagination.key": next_key}
+
+    # Requests proposals from the endpoints in order and returns the first valid response.
+    # An endpoint reporting the gov version as not implemented stops the attempt for every endpoint.
+    # scoreboard is the one of the API the endpoints belong to, the REST scoreboard by default
+    def _request_proposals(self, endpoints, request_fn, scoreboard=None):
+        if self.hedging_options["enabled"] and len(endpoints) > 1:
+            return self._request_proposals_hedged(endpoints, request_fn, scoreboard)
+
+        for endpoint in endpoints:
             try:
-                response = requests.get(
-                    f"{endpoint}/cosmos/gov/v1beta1/proposals?proposal_status=2",
-                    verify=False,
-                    timeout=10
-                )
+                data = request_fn(endpoint)
+            except GovVersionNotImplemented:
+                raise
             except Exception as e:
                 self.logger.debug("Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
                 continue
-            if response.status_code == 200:
-                resp = response
-                break
-            else:
-                try:
-                    response.raise_for_status()
-                except Exception as e:
-                    self.logger.debug("Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
-                    resp = None
-
-        if resp is None:
-            raise Exception(f"{self.chain_id}: Error getting active proposals after trying all healthy endpoints")
-        self.logger.info("Proposal request succeeded for chain %s with endpoint %s", self.chain_id, endpoint)
-        return resp.json()
\ No newline at end of file
+
+            self.logger.info("Proposal request succeeded for chain %s with endpoint %s", self.chain_id, endpoint)
+            return data
+
+        raise Exception(f"{self.chain_id}: Error getting active proposals after trying all endpoints")
+
+    # Hedged mode sends the request to the best endpoint, and each time the hedge delay passes without an answer
+    # (or an in-flight request fails) sends it to the next endpoint, up to the fan-out width in flight at once.
+    # The first valid response wins and the remaining requests are cancelled or left to finish unread.
+    def _request_proposals_hedged(self, endpoints, request_fn, scoreboard=None):
+        fanout = max(self.hedging_options["fanout"], 1)
+        hedge_delay = self.get_hedge_delay(scoreboard)
+
+        executor = ThreadPoolExecutor(max_workers=fanout)
+        futures = {}
+        pending = set()
+        remaining = list(endpoints)
+
+        def send_next():
+            endpoint = remaining.pop(0)
+            future = executor.submit(request_fn, endpoint)
+            futures[future] = endpoint
+            pending.add(future)
+
+        try:
+            send_next()
+            while len(pending) > 0:
+                can_hedge = len(remaining) > 0 and len(pending) < fanout
+                done, _ = wait(pending, timeout=hedge_delay if can_hedge else None, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    pending.discard(future)
+                    endpoint = futures[future]
+                    try:
+                        data = future.result()
+                    except GovVersionNotImplemented:
+                        raise
+                    except Exception as e:
+                        self.logger.debug("Proposal request failed for chain %s at %s: %s", self.chain_id, endpoint, e)
+                        continue
+
+                    self.logger.info("Proposal request succeeded for chain %s with endpoint %s", self.chain_id, endpoint)
+                    return data
+
+                # either the hedge delay passed or a request failed, send to the next endpoint(s) to keep the fan-out full
+                while len(remaining) > 0 and len(pending) < fanout:
+                    self.logger.debug("Hedging proposal request for chain %s to %s", self.chain_id, remaining[0])
+                    send_next()
+                    if len(done) == 0:
+                        break
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        raise Exception(f"{self.chain_id}: Error getting active proposals after trying all endpoints")
+
+    # Hedges on the observed latency of the API being requested, the REST one by default
+    def get_hedge_delay(self, scoreboard=None):
+        if self.hedging_options["delay"] is not None:
+            return self.hedging_options["delay"]
+        if scoreboard is None:
+            scoreboard = self.rest_scoreboard
+        return scoreboard.get_latency_percentile(0.95, default=DEFAULT_HEDGE_DELAY)
@@ -1,34 +1,60 @@
 import requests
-from fs.zipfs import ZipFS
+import fnmatch
+import hashlib
 import io
 import json
-from .chain import Chain
+import os
+import threading
+import zipfile
+from .cache import ChainRegistryCache
+from .entry import ChainRegistryEntry
+from .http import HTTPClient
 from logging import INFO
 from log import get_configured_logger
 
 # This is a list of chain registry paths that the code is not prepared to handle
 CHAIN_REGISTRY_PATH_DENYLIST = ["*template*", "_non-cosmos"]
 
+NETWORK_TYPE_PRIORITY = {"mainnet": 0, "testnet": 1, "devnet": 2}
+
 class ChainRegistry:
 
     archive = None
+    archive_key = None
 
-    def __init__(self, zip_url="https://github.com/cosmos/chain-registry/archive/refs/heads/master.zip", zip_location=None, log_level=INFO, rest_overides={}, init_chains="*"):
+    def __init__(self, zip_url="https://github.com/cosmos/chain-registry/archive/refs/heads/master.zip", zip_location=None, log_level=INFO, rest_overides={}, dao_proposal_modules={}, init_chains="*", http_client=None, scoreboard_options={}, hedging_options={}, cache_location=None):
         self.zip_url = zip_url
         self.loaded = False
         self.archive_contents = None
         self.zip_location = zip_location
+        self.cache = ChainRegistryCache(cache_location)
+        # set by load when the on-disk cache matches the archive, extract then skips the zip
+        self.cached_entries = None
+
+        # used by refresh to check whether the archive changed
+        self.zip_mtime = None
+        self.last_modified = None
+        self._refresh_lock = threading.Lock()
+
         self.log_level = log_level
         self.logger = get_configured_logger(__name__, self.log_level, "")
 
         self.init_chains = init_chains
 
         self.rest_overides = rest_overides
+        self.dao_proposal_modules = dao_proposal_modules
+
+        # All chains share a single pooled HTTP client so connections and per-host limits are shared across chains served by the same provider
+        if http_client is None:
+            http_client = HTTPClient()
+        self.http_client = http_client
 
-        self.mainnets = {}
-        self.testnets = {}
-        self.devnets = {}
-        self.unknown = {}
+        self.scoreboard_options = scoreboard_options
+        self.hedging_options = hedging_options
+
+        # Entries keyed by both registry path and chain ID, see build_index
+        self.index = {}
+        self.entries = []
 
         self.logger.info("Loading chain registry")
         self.load()
@@ -37,6 +63,10 @@ class ChainRegistry:
         self.extract()
         self.logger.info("Chain registry extracted")
 
+    def get_filter_key(self):
+        init_chains = self.init_chains if self.init_chains == "*" else sorted(self.init_chains)
+        return json.dumps({"init_chains": init_chains, "denylist": CHAIN_REGISTRY_PATH_DENYLIST})
+
     def load(self):
 
         if ChainRegistry.archive is not None:
@@ -44,103 +74,263 @@ class ChainRegistry:
             self.loaded = True
             return
 
+        filter_key = self.get_filter_key()
+
         if self.zip_location:
             self.logger.debug("Loading chain registry from local zip file")
-            ChainRegistry.archive = open(self.zip_location, "rb")
+            self.zip_mtime = os.path.getmtime(self.zip_location)
+            archive_key = get_file_hash(self.zip_location)
+            self.cached_entries = self.cache.get_entries(archive_key, filter_key)
+            if self.cached_entries is not None:
+                self.logger.debug("Using cached chain registry entries")
+            else:
+                ChainRegistry.archive = open(self.zip_location, "rb")
+            ChainRegistry.archive_key = archive_key
             self.loaded = True
             return
 
         self.logger.debug("Loading chain registry from url")
-        resp = requests.get(self.zip_url, stream=True)
+
+        # Only ask for a conditional response when the cache holds entries for this filter, a 304 is useless otherwise
+        headers = {}
+        cached_etag = self.cache.get_archive_key(filter_key)
+        if cached_etag is not None:
+            headers["If-None-Match"] = cached_etag
+
+        resp = requests.get(self.zip_url, headers=headers, stream=True)
+
+        if resp.status_code == 304:
+            self.logger.debug("Chain registry not modified, using cached chain registry entries")
+            self.cached_entries = self.cache.get_entries(cached_etag, filter_key)
+            ChainRegistry.archive_key = cached_etag
+            self.loaded = True
+            return
 
         if resp.status_code != 200:
             raise Exception(f"Unable to load chain registry from url {self.zip_url}")
         
         self.loaded = True
         ChainRegistry.archive = io.BytesIO(resp.content)
+        ChainRegistry.archive_key = resp.headers.get("ETag", hashlib.sha256(resp.content).hexdigest())
+        self.last_modified = resp.headers.get("Last-Modified", None)
         self.logger.debug("Chain registry loaded")
 
+    def refresh(self, chain_names=[]):
+        """Re-reads the registry if the archive changed and swaps in the new entries
+
+        Returns the Chains for chain_names whose REST servers, RPC servers or explorers changed, keyed by name.
+        An unchanged archive costs one conditional request (or one stat of the local zip) and no parsing.
+        """
+        with self._refresh_lock:
+            archive = self.fetch_changed_archive()
+            if archive is None:
+                self.logger.debug("Chain registry unchanged")
+                return {}
+
+            archive, archive_key = archive
+            old_archive = ChainRegistry.archive
+            ChainRegistry.archive = archive
+            ChainRegistry.archive_key = archive_key
+            if old_archive is not None:
+                old_archive.close()
+
+            new_entries = self.read_archive_entries()
+            self.cache.write(archive_key, self.get_filter_key(), [(entry.chain_path, entry.raw) for entry in new_entries])
+
+            old_index = self.index
+            entries = []
+            for entry in new_entries:
+                old_entry = old_index.get(entry.chain_path)
+                # keep the existing entry, and the Chain built from it, when nothing the poller uses changed
+                if old_entry is not None and old_entry.chain_path == entry.chain_path and (
+                    old_entry.raw == entry.raw or old_entry.get_refresh_fields() == entry.get_refresh_fields()
+                ):
+                    entries.append(old_entry)
+                    continue
+                entries.append(entry)
+
+            index = self.build_index(entries)
+
+            # swap both at once, readers see either the old or the new registry
+            self.entries, self.index = entries, index
+
+            changed = {}
+            for chain_name in chain_names:
+                old_entry = old_index.get(chain_name)
+                new_entry = index.get(chain_name)
+                if new_entry is None or new_entry is old_entry:
+                    continue
+                try:
+                    new_chain = new_entry.get_chain()
+                except Exception as err:
+                    self.logger.error(f"Unable to refresh chain {chain_name}: {err}")
+                    continue
+                if old_entry is not None and old_entry.is_loaded():
+                    new_chain.inherit_state(old_entry.get_chain())
+                changed[chain_name] = new_chain
+
+            self.logger.info(f"Chain registry refreshed, {len(changed)} configured chains changed")
+            return changed
+
+    def fetch_changed_archive(self):
+        # Returns (archive, archive_key) when the archive changed since it was last loaded, None otherwise
+        if self.zip_location:
+            mtime = os.path.getmtime(self.zip_location)
+            if mtime == self.zip_mtime:
+                return None
+            self.zip_mtime = mtime
+            archive_key = get_file_hash(self.zip_location)
+            if archive_key == ChainRegistry.archive_key:
+                return None
+            return open(self.zip_location, "rb"), archive_key
+
+        headers = {}
+        if ChainRegistry.archive_key is not None:
+            headers["If-None-Match"] = ChainRegistry.archive_key
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        resp = requests.get(self.zip_url, headers=headers, stream=True)
+
+        if resp.status_code == 304:
+            return None
+
+        if resp.status_code != 200:
+            raise Exception(f"Unable to refresh chain registry from url {self.zip_url}")
+
+        self.last_modified = resp.headers.get("Last-Modified", None)
+        archive_key = resp.headers.get("ETag", hashlib.sha256(resp.content).hexdigest())
+        if archive_key == ChainRegistry.archive_key:
+            return None
+        return io.BytesIO(resp.content), archive_key
+
     def extract(self):
         self.logger.debug("Extracting chain registry")
         if not self.loaded:
             self.load()
 
-        self.archive = ZipFS(ChainRegistry.archive)
-
-        mainnets = {}
-        testnets = {}
-        devnets = {}
-        unknown = {}
-        for path in self.archive.walk.files(filter=['chain.json'], exclude_dirs=CHAIN_REGISTRY_PATH_DENYLIST):
-            chain = json.load(self.archive.openbin(path))
-            chain_path = path.split("/")[-2]
-            if self.init_chains != "*" and chain_path not in self.init_chains and chain["chain_id"] not in self.init_chains:
-                self.logger.debug(f"Skipping chain {chain_path} as it is not in init_chains")
-                continue
-
-            rest_overides = []
-
-            if chain_path in self.rest_overides:
-                rest_overides = self.rest_overides[chain_path]
-            elif chain["chain_id"] in self.rest_overides:
-                rest_overides = self.rest_overides[chain["chain_id"]]
-
-            # can chains have other statuses that are okay?
-            if chain["status"] not in ["live"]:
-                continue
-            try:
-                new_chain = Chain(chain, self.log_level, rest_overides=rest_overides)
-                if chain["network_type"] == "mainnet":
-                    mainnets[chain_path] = new_chain
-                elif chain["network_type"] == "testnet":
-                    testnets[chain_path] = new_chain
-                elif chain["network_type"] == "devnet":
-                    devnets[chain_path] = new_chain
-                else:
-                    unknown[chain_path] = new_chain
-            except:
-                self.logger.error(f"Unable to extract chain information for {chain_path}")
-                continue
-
-        self.mainnets = mainnets
-        self.testnets = testnets
-        self.devnets = devnets
-        self.unknown = unknown
+        if self.cached_entries is not None:
+            entries = []
+            for chain_path, raw in self.cached_entries:
+                try:
+                    entries.append(ChainRegistryEntry(chain_path, raw, self.log_level, self.rest_overides, self.dao_proposal_modules, self.get_chain_options()))
+                except:
+                    self.logger.error(f"Unable to extract chain information for {chain_path}")
+                    continue
+        else:
+            entries = self.read_archive_entries()
+            self.cache.write(ChainRegistry.archive_key, self.get_filter_key(), [(entry.chain_path, entry.raw) for entry in entries])
+
+        self.entries = entries
+        self.index = self.build_index(entries)
 
         self.logger.debug("Chain registry extracted")
 
+    def read_archive_entries(self):
+        # Paths are filtered from the zip central directory, only the chain.json files that can be used are decompressed
+        ChainRegistry.archive.seek(0)
+        with zipfile.ZipFile(ChainRegistry.archive) as archive:
+            chain_paths = {}
+            for name in archive.namelist():
+                parts = name.split("/")
+                if parts[-1] != "chain.json" or len(parts) < 2:
+                    continue
+                if any(fnmatch.fnmatch(part, pattern) for part in parts[:-1] for pattern in CHAIN_REGISTRY_PATH_DENYLIST):
+                    continue
+                chain_paths[name] = parts[-2]
+
+            if self.init_chains == "*":
+                candidates = list(chain_paths.keys())
+            else:
+                candidates = [name for name, chain_path in chain_paths.items() if chain_path in self.init_chains]
+                # init_chains may also name chains by chain ID, those can only be found by reading the remaining files
+                if len(set(self.init_chains) - set(chain_paths.values())) > 0:
+                    candidates = list(chain_paths.keys())
+
+            # the entries are built once here and used as they are, only their raw chain.json is cached
+            entries = []
+            for name in candidates:
+                chain_path = chain_paths[name]
+                raw = archive.read(name)
+                try:
+                    entry = ChainRegistryEntry(chain_path, raw, self.log_level, self.rest_overides, self.dao_proposal_modules, self.get_chain_options())
+                except:
+                    self.logger.error(f"Unable to extract chain information for {chain_path}")
+                    continue
+
+                if self.init_chains != "*" and chain_path not in self.init_chains and entry.chain_id not in self.init_chains:
+                    self.logger.debug(f"Skipping chain {chain_path} as it is not in init_chains")
+                    continue
+
+                # can chains have other statuses that are okay?
+                if entry.status not in ["live"]:
+                    continue
+
+                entries.append(entry)
+
+        return entries
+
+    def get_chain_options(self):
+        return {
+            "http_client": self.http_client,
+            "scoreboard_options": self.scoreboard_options,
+            "hedging_options": self.hedging_options,
+        }
+
+    @staticmethod
+    def build_index(entries):
+        # Registry paths take precedence over chain IDs, and chain IDs shared by several entries resolve to mainnets first
+        index = {}
+        for entry in entries:
+            index[entry.chain_path] = entry
+        for entry in sorted(entries, key=lambda entry: NETWORK_TYPE_PRIORITY.get(entry.network_type, len(NETWORK_TYPE_PRIORITY))):
+            index.setdefault(entry.chain_id, entry)
+        return index
+
     def get_chain(self, chain):
-        chain_entry = self.get_chain_by_registry_name(chain)
+        chain_entry = self.index.get(chain)
         if chain_entry is not None:
-            return chain_entry
-        else:
-            chain_entry = self.search_for_chain_by_chain_id(chain)
-            if chain_entry is not None:
-                return chain_entry
-            raise Exception(f"Chain {chain} not found in registry")
+            return chain_entry.get_chain()
+        raise Exception(f"Chain {chain} not found in registry")
 
     def get_chain_by_registry_name(self, chain):
-        if chain in self.mainnets:
-            return self.mainnets[chain]
-        elif chain in self.testnets:
-            return self.testnets[chain]
-        elif chain in self.devnets:
-            return self.devnets[chain]
-        elif chain in self.unknown:
-            return self.unknown[chain]
+        chain_entry = self.index.get(chain)
+        if chain_entry is not None and chain_entry.chain_path == chain:
+            return chain_entry.get_chain()
         return None
 
     def search_for_chain_by_chain_id(self, chain):
-        for chain_entry in self.mainnets.values():
-            if chain_entry.chain_id == chain:
-                return chain_entry
-        for chain_entry in self.testnets.values():
-            if chain_entry.chain_id == chain:
-                return chain_entry
-        for chain_entry in self.devnets.values():
-            if chain_entry.chain_id == chain:
-                return chain_entry
-        for chain_entry in self.unknown.values():
+        chain_entry = self.index.get(chain)
+        if chain_entry is not None and chain_entry.chain_id == chain:
+            return chain_entry.get_chain()
+        # the chain ID is shadowed by another entry's registry path
+        for chain_entry in self.entries:
             if chain_entry.chain_id == chain:
-                return chain_entry
+                return chain_entry.get_chain()
         return None
+
+    def get_chains_by_network_type(self, network_type):
+        return {entry.chain_path: entry.get_chain() for entry in self.entries if entry.network_type == network_type}
+
+    @property
+    def mainnets(self):
+        return self.get_chains_by_network_type("mainnet")
+
+    @property
+    def testnets(self):
+        return self.get_chains_by_network_type("testnet")
+
+    @property
+    def devnets(self):
+        return self.get_chains_by_network_type("devnet")
+
+    @property
+    def unknown(self):
+        return {entry.chain_path: entry.get_chain() for entry in self.entries if entry.network_type not in NETWORK_TYPE_PRIORITY}
+
+def get_file_hash(location):
+    sha256 = hashlib.sha256()
+    with open(location, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
@@ -0,0 +1,96 @@
+import json
+import re
+import threading
+from .chain import Chain
+
+# Top level chain.json fields needed to index and filter an entry, read without parsing the whole document
+INDEX_FIELDS = ["chain_id", "status", "network_type"]
+# JSON strings, with the colon that follows object keys, and brackets. Brackets inside strings are consumed with the string,
+# so counting the brackets gives the nesting depth of every key
+INDEX_TOKEN_PATTERN = re.compile(rb'"((?:[^"\\]|\\.)*)"(\s*:)?|[{}\[\]]')
+
+def get_raw_refresh_fields(raw):
+    # The parts of a chain.json the poller depends on, a refresh only swaps in a new Chain when these change
+    chain_data = json.loads(raw)
+    apis = chain_data.get("apis", {})
+    return {
+        "rest": apis.get("rest", []),
+        "rpc": apis.get("rpc", []),
+        "explorers": chain_data.get("explorers", []),
+    }
+
+class ChainRegistryEntry:
+
+    """A chain.json from the registry, only parsed and built into a Chain the first time it is requested"""
+
+    def __init__(self, chain_path, raw, log_level, rest_overides, dao_proposal_modules, chain_options):
+        self.chain_path = chain_path
+        self.raw = raw
+        self.log_level = log_level
+        self.rest_overides = rest_overides
+        self.dao_proposal_modules = dao_proposal_modules
+        self.chain_options = chain_options
+
+        self._chain = None
+        self._lock = threading.Lock()
+
+        fields = self._read_index_fields()
+        self.chain_id = fields["chain_id"]
+        self.status = fields["status"]
+        self.network_type = fields["network_type"]
+
+    def _read_index_fields(self):
+        # The fields are read from the top level object only, keys of the same name in nested objects are skipped.
+        # Scanning stops once all of them are found, they are near the start of a chain.json
+        fields = {}
+        depth = 0
+        field = None
+        for match in INDEX_TOKEN_PATTERN.finditer(self.raw):
+            token = match.group(0)
+            if token in (b"{", b"["):
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+            elif field is not None and match.group(2) is None:
+                fields[field] = json.loads(token)
+                if len(fields) == len(INDEX_FIELDS):
+                    return fields
+            elif depth == 1 and match.group(2) is not None:
+                key = json.loads(match.group(1).join([b'"', b'"']))
+                if key in INDEX_FIELDS and key not in fields:
+                    field = key
+                    continue
+            field = None
+
+        # fall back to a full parse for entries the scan does not cover, such as fields that are missing or not strings
+        chain_data = json.loads(self.raw)
+        return {field: chain_data.get(field) for field in INDEX_FIELDS}
+
+    def get_refresh_fields(self):
+        return get_raw_refresh_fields(self.raw)
+
+    def get_rest_overides(self):
+        if self.chain_path in self.rest_overides:
+            return self.rest_overides[self.chain_path]
+        elif self.chain_id in self.rest_overides:
+            return self.rest_overides[self.chain_id]
+        return []
+
+    def get_dao_proposal_modules(self):
+        if self.chain_path in self.dao_proposal_modules:
+            return self.dao_proposal_modules[self.chain_path]
+        elif self.chain_id in self.dao_proposal_modules:
+            return self.dao_proposal_modules[self.chain_id]
+        return []
+
+    def get_chain(self):
+        with self._lock:
+            if self._chain is None:
+                try:
+                    self._chain = Chain(json.loads(self.raw), self.log_level, rest_overides=self.get_rest_overides(), dao_proposal_modules=self.get_dao_proposal_modules(), **self.chain_options)
+                except Exception as err:
+                    raise Exception(f"Unable to extract chain information for {self.chain_path}: {err}")
+            return self._chain
+
+    def is_loaded(self):
+        return self._chain is not None
@@ -0,0 +1,135 @@
+import threading
+import weakref
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from metrics.metrics import HTTP_REQUESTS, HTTP_NEW_CONNECTIONS
+
+DEFAULT_MAX_REQUESTS_PER_HOST = 4
+DEFAULT_POOL_CONNECTIONS = 200
+DEFAULT_POOL_MAXSIZE = 10
+
+class ConnectionCounters:
+
+    """Thread-safe counters for requests sent and connections opened by the HTTP client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def add_request(self):
+        HTTP_REQUESTS.inc()
+        with self._lock:
+            self.requests += 1
+
+    def add_new_connection(self):
+        HTTP_NEW_CONNECTIONS.inc()
+        with self._lock:
+            self.new_connections += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+def _counting_pool_class(pool_class, connection_class, counters):
+    # Connections are counted on connect rather than on creation, since pools reconnect dropped connections in place
+    class CountingConnection(connection_class):
+        def connect(self):
+            counters.add_new_connection()
+            return super().connect()
+
+    class CountingConnectionPool(pool_class):
+        ConnectionCls = CountingConnection
+
+    return CountingConnectionPool
+
+class CountingHTTPAdapter(HTTPAdapter):
+
+    """HTTPAdapter whose connection pools report every newly opened connection to the given counters"""
+
+    def __init__(self, counters, **kwargs):
+        self.counters = counters
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, HTTPConnection, self.counters),
+            "https": _counting_pool_class(HTTPSConnectionPool, HTTPSConnection, self.counters),
+        }
+
+class HTTPClient:
+
+    """Shared HTTP client for chain REST/RPC traffic
+
+    Requests go through a single pooled session that keeps connections to each host alive between polls,
+    and the number of in-flight requests per host is limited. Streamed responses count as in flight until they are closed.
+    """
+
+    def __init__(self, max_requests_per_host=DEFAULT_MAX_REQUESTS_PER_HOST, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, keep_alive=True):
+        self.max_requests_per_host = max_requests_per_host
+        self.keep_alive = keep_alive
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+        self.counters = ConnectionCounters()
+
+        # pool_connections is the number of hosts to keep a pool for, pool_maxsize is the number of idle connections kept per host
+        adapter = CountingHTTPAdapter(self.counters, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def _get_host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self._host_semaphores[host]
+
+    def get(self, url, **kwargs):
+        semaphore = self._get_host_semaphore(url)
+        if not kwargs.get("stream", False):
+            # the body is read before session.get returns
+            with semaphore:
+                self.counters.add_request()
+                return self.session.get(url, **kwargs)
+
+        # A streamed body is read after get returns, so the host's slot is held until the response is closed.
+        # Responses that are never closed give it back when they are garbage collected.
+        semaphore.acquire()
+        try:
+            self.counters.add_request()
+            response = self.session.get(url, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        release = weakref.finalize(response, semaphore.release)
+        close = response.close
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        return response
+
+    def get_stats(self):
+        return self.counters.get_stats()
+
+    def close(self):
+        self.session.close()
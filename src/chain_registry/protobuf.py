@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+# Just enough of the protobuf wire format for the gov Proposals queries over ABCI. Only the fields the normalizers in
+# requesting.normalization read are decoded, everything else is skipped without being built.
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+PROPOSAL_STATUS_UNSPECIFIED = 0
+PROPOSAL_STATUS_DEPOSIT_PERIOD = 1
+PROPOSAL_STATUS_VOTING_PERIOD = 2
+
+PROPOSAL_STATUSES = {
+    0: "PROPOSAL_STATUS_UNSPECIFIED",
+    1: "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+    2: "PROPOSAL_STATUS_VOTING_PERIOD",
+    3: "PROPOSAL_STATUS_PASSED",
+    4: "PROPOSAL_STATUS_REJECTED",
+    5: "PROPOSAL_STATUS_FAILED",
+}
+
+# gov v1 wraps legacy v1beta1 proposal content in this message, its content is decoded like a v1beta1 proposal's
+MSG_EXEC_LEGACY_CONTENT_TYPE = "/cosmos.gov.v1.MsgExecLegacyContent"
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+
+class ProtobufDecodeError(Exception):
+    pass
+
+def encode_varint(value):
+    # negative int64 values are sent as their 64 bit two's complement
+    if value < 0:
+        value += 1 << 64
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value == 0:
+            encoded.append(byte)
+            return bytes(encoded)
+        encoded.append(byte | 0x80)
+
+def decode_varint(data, pos):
+    # Returns the varint starting at pos and the position after it
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ProtobufDecodeError("truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 70:
+            raise ProtobufDecodeError("varint is longer than 10 bytes")
+
+def to_int64(value):
+    if value >= 1 << 63:
+        value -= 1 << 64
+    return value
+
+def encode_varint_field(field_number, value):
+    return encode_varint(field_number << 3 | WIRE_VARINT) + encode_varint(value)
+
+def encode_bytes_field(field_number, value):
+    return encode_varint(field_number << 3 | WIRE_LENGTH_DELIMITED) + encode_varint(len(value)) + value
+
+def iter_fields(data):
+    # Yields (field_number, wire_type, value) for every field of a message. Varints are ints, everything else a memoryview
+    # into data, so skipped fields are never copied.
+    data = memoryview(data)
+    pos = 0
+    while pos < len(data):
+        key, pos = decode_varint(data, pos)
+        field_number = key >> 3
+        wire_type = key & 0x07
+
+        if wire_type == WIRE_VARINT:
+            value, pos = decode_varint(data, pos)
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            length, pos = decode_varint(data, pos)
+            if pos + length > len(data):
+                raise ProtobufDecodeError(f"field {field_number} runs past the end of the message")
+            value = data[pos:pos + length]
+            pos += length
+        elif wire_type == WIRE_FIXED64:
+            value = data[pos:pos + 8]
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            value = data[pos:pos + 4]
+            pos += 4
+        else:
+            raise ProtobufDecodeError(f"unsupported wire type {wire_type} for field {field_number}")
+
+        if pos > len(data):
+            raise ProtobufDecodeError(f"field {field_number} runs past the end of the message")
+        yield field_number, wire_type, value
+
+def decode_string(value):
+    return bytes(value).decode("utf-8", errors="replace")
+
+def decode_timestamp(data):
+    # google.protobuf.Timestamp as the RFC 3339 string the REST API returns, to seconds precision
+    seconds = 0
+    for field_number, wire_type, value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_VARINT:
+            seconds = to_int64(value)
+    return (UNIX_EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def decode_any(data):
+    type_url = ""
+    value = b""
+    for field_number, wire_type, field_value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+            type_url = decode_string(field_value)
+        elif field_number == 2 and wire_type == WIRE_LENGTH_DELIMITED:
+            value = field_value
+    return type_url, value
+
+def decode_legacy_content(data):
+    # Every legacy proposal content type has title as field 1 and description as field 2
+    type_url, value = decode_any(data)
+    content = {"@type": type_url}
+    for field_number, wire_type, field_value in iter_fields(value):
+        if field_number == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+            content["title"] = decode_string(field_value)
+        elif field_number == 2 and wire_type == WIRE_LENGTH_DELIMITED:
+            content["description"] = decode_string(field_value)
+    return content
+
+def decode_v1_message(data):
+    type_url, value = decode_any(data)
+    message = {"@type": type_url}
+    if type_url == MSG_EXEC_LEGACY_CONTENT_TYPE:
+        for field_number, wire_type, field_value in iter_fields(value):
+            if field_number == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+                message["content"] = decode_legacy_content(field_value)
+    return message
+
+def decode_v1_proposal(data):
+    # cosmos.gov.v1.Proposal, in the shape of a REST v1 proposal reduced to the normalized fields, with only the first message
+    proposal = {"id": "0", "messages": [], "status": PROPOSAL_STATUSES[0], "submit_time": None, "title": "", "summary": ""}
+    for field_number, wire_type, value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_VARINT:
+            proposal["id"] = str(value)
+        elif field_number == 2 and wire_type == WIRE_LENGTH_DELIMITED:
+            if len(proposal["messages"]) == 0:
+                proposal["messages"].append(decode_v1_message(value))
+        elif field_number == 3 and wire_type == WIRE_VARINT:
+            proposal["status"] = PROPOSAL_STATUSES.get(value, PROPOSAL_STATUSES[0])
+        elif field_number == 5 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposal["submit_time"] = decode_timestamp(value)
+        elif field_number == 11 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposal["title"] = decode_string(value)
+        elif field_number == 12 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposal["summary"] = decode_string(value)
+    return proposal
+
+def decode_v1beta1_proposal(data):
+    # cosmos.gov.v1beta1.Proposal, in the shape of a REST v1beta1 proposal reduced to the normalized fields
+    proposal = {"proposal_id": "0", "content": {}, "status": PROPOSAL_STATUSES[0], "submit_time": None}
+    for field_number, wire_type, value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_VARINT:
+            proposal["proposal_id"] = str(value)
+        elif field_number == 2 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposal["content"] = decode_legacy_content(value)
+        elif field_number == 3 and wire_type == WIRE_VARINT:
+            proposal["status"] = PROPOSAL_STATUSES.get(value, PROPOSAL_STATUSES[0])
+        elif field_number == 5 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposal["submit_time"] = decode_timestamp(value)
+    return proposal
+
+def encode_proposals_request(proposal_status, key=None, limit=None, reverse=False):
+    # QueryProposalsRequest, the same message for gov v1 and v1beta1: proposal_status = 1, pagination = 4
+    # PageRequest: key = 1, limit = 3, reverse = 5
+    pagination = b""
+    if key is not None:
+        pagination += encode_bytes_field(1, key)
+    if limit is not None:
+        pagination += encode_varint_field(3, int(limit))
+    if reverse:
+        pagination += encode_varint_field(5, 1)
+
+    # PROPOSAL_STATUS_UNSPECIFIED is the field's default and requests proposals of every status
+    request = b""
+    if proposal_status != PROPOSAL_STATUS_UNSPECIFIED:
+        request += encode_varint_field(1, proposal_status)
+    if len(pagination) > 0:
+        request += encode_bytes_field(4, pagination)
+    return request
+
+def decode_proposals_response(data, decode_proposal):
+    # QueryProposalsResponse: proposals = 1, pagination = 2 with next_key = 1
+    proposals = []
+    next_key = None
+    for field_number, wire_type, value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposals.append(decode_proposal(value))
+        elif field_number == 2 and wire_type == WIRE_LENGTH_DELIMITED:
+            for page_field_number, page_wire_type, page_value in iter_fields(value):
+                if page_field_number == 1 and page_wire_type == WIRE_LENGTH_DELIMITED and len(page_value) > 0:
+                    next_key = bytes(page_value)
+    return {"proposals": proposals, "pagination": {"next_key": next_key}}
+
+def encode_proposal_request(proposal_id):
+    # QueryProposalRequest, the same message for gov v1 and v1beta1: proposal_id = 1
+    return encode_varint_field(1, int(proposal_id))
+
+def decode_proposal_response(data, decode_proposal):
+    # QueryProposalResponse: proposal = 1, returned as a one item proposals list
+    proposals = []
+    for field_number, wire_type, value in iter_fields(data):
+        if field_number == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+            proposals = [decode_proposal(value)]
+    return {"proposals": proposals}
@@ -0,0 +1,43 @@
+import threading
+from logging import INFO
+from log import get_configured_logger
+
+class ChainRegistryRefresher(threading.Thread):
+
+    """Daemon thread that periodically refreshes a ChainRegistry
+
+    Updated Chains are held until the main loop collects them with get_updates, so chains are only swapped between polling cycles.
+    """
+
+    def __init__(self, chain_registry, chain_names, interval, log_level=INFO):
+        super().__init__(daemon=True)
+        self.chain_registry = chain_registry
+        self.chain_names = list(chain_names)
+        self.interval = interval
+        self.logger = get_configured_logger(__name__, log_level, "")
+
+        self.updates = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                updates = self.chain_registry.refresh(self.chain_names)
+            except Exception as err:
+                self.logger.error(f"Unable to refresh chain registry: {err}")
+                continue
+
+            if len(updates) > 0:
+                self.logger.info(f"Chain registry refresh updated chains {', '.join(updates.keys())}")
+                with self._lock:
+                    self.updates.update(updates)
+
+    def get_updates(self):
+        with self._lock:
+            updates = self.updates
+            self.updates = {}
+        return updates
+
+    def stop(self):
+        self._stop_event.set()
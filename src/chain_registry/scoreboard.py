@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+from collections import deque
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+DEFAULT_SCOREBOARD_OPTIONS = {
+    # seconds before the health check results are considered stale and refreshed in the background
+    "health_check_ttl": 600.0,
+    # weight of the newest sample in the latency and success rate moving averages
+    "ewma_alpha": 0.3,
+    # consecutive failures before an endpoint's circuit is opened
+    "failure_threshold": 3,
+    # seconds an open circuit waits before letting a single trial request through
+    "circuit_open_time": 300.0,
+    # seconds a remembered gov API version is trusted before the newest version is probed again
+    "gov_version_reprobe_time": 86400.0,
+}
+
+# Latency assumed for endpoints that have not answered a request yet, keeps them ahead of slow known endpoints
+UNKNOWN_LATENCY = 1.0
+
+# Number of recent successful request latencies kept across all endpoints for percentile estimates
+LATENCY_SAMPLE_SIZE = 100
+# Minimum number of samples before a percentile estimate is trusted
+MIN_LATENCY_SAMPLES = 5
+
+class EndpointScore:
+
+    """Health and performance record for a single endpoint"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.latency_ewma = None
+        self.success_rate = 1.0
+        self.syncing = None
+        self.last_checked_at = None
+        self.consecutive_failures = 0
+        self.circuit_state = CIRCUIT_CLOSED
+        self.circuit_opened_at = None
+        self.gov_version = None
+        self.gov_version_checked_at = None
+
+    def get_score(self):
+        # lower is better
+        latency = self.latency_ewma if self.latency_ewma is not None else UNKNOWN_LATENCY
+        return latency / max(self.success_rate, 0.05)
+
+    def to_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "latency_ewma": self.latency_ewma,
+            "success_rate": self.success_rate,
+            "syncing": self.syncing,
+            "last_checked_at": self.last_checked_at,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_state": self.circuit_state,
+            "gov_version": self.gov_version,
+        }
+
+class EndpointScoreboard:
+
+    """Long-lived scoreboard of a chain's endpoints
+
+    Tracks an EWMA of latency and success rate, the last reported sync status and a circuit breaker per endpoint,
+    and ranks endpoints so requests go to the best one first.
+    """
+
+    def __init__(self, endpoints, options={}):
+        self.options = {**DEFAULT_SCOREBOARD_OPTIONS, **options}
+        self.scores = {endpoint: EndpointScore(endpoint) for endpoint in endpoints}
+        self.last_refreshed_at = None
+        self.refreshing = False
+        self.latency_samples = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self._lock = threading.Lock()
+
+    def _get_score(self, endpoint):
+        if endpoint not in self.scores:
+            self.scores[endpoint] = EndpointScore(endpoint)
+        return self.scores[endpoint]
+
+    def _update_averages(self, score, success, latency=None):
+        alpha = self.options["ewma_alpha"]
+        score.success_rate = (1 - alpha) * score.success_rate + alpha * (1.0 if success else 0.0)
+        if latency is not None:
+            if score.latency_ewma is None:
+                score.latency_ewma = latency
+            else:
+                score.latency_ewma = (1 - alpha) * score.latency_ewma + alpha * latency
+
+    def record_success(self, endpoint, latency):
+        with self._lock:
+            score = self._get_score(endpoint)
+            self._update_averages(score, True, latency)
+            if latency is not None:
+                self.latency_samples.append(latency)
+            score.consecutive_failures = 0
+            score.circuit_state = CIRCUIT_CLOSED
+            score.circuit_opened_at = None
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            score = self._get_score(endpoint)
+            self._update_averages(score, False)
+            score.consecutive_failures += 1
+            # a failed trial request re-opens the circuit straight away
+            if score.circuit_state == CIRCUIT_HALF_OPEN or score.consecutive_failures >= self.options["failure_threshold"]:
+                score.circuit_state = CIRCUIT_OPEN
+                score.circuit_opened_at = time.time()
+
+    def record_health_check(self, endpoint, healthy, syncing, latency=None):
+        # A health check only probes a status route, an endpoint that answers it can still fail the proposal requests.
+        # Passing one updates the sync status and gives endpoints without requests yet a latency to be ranked by, but only
+        # requests count as successes that close the circuit
+        with self._lock:
+            score = self._get_score(endpoint)
+            score.last_checked_at = time.time()
+            score.syncing = syncing
+            if healthy and score.latency_ewma is None:
+                score.latency_ewma = latency
+
+        if not healthy:
+            self.record_failure(endpoint)
+
+    def is_available(self, endpoint):
+        with self._lock:
+            score = self._get_score(endpoint)
+            # never use endpoints that are still syncing
+            if score.syncing:
+                return False
+            if score.circuit_state != CIRCUIT_CLOSED:
+                if time.time() - score.circuit_opened_at < self.options["circuit_open_time"]:
+                    return False
+                # let the endpoint back into one ranking as a trial, then wait again until its result closes the circuit
+                score.circuit_state = CIRCUIT_HALF_OPEN
+                score.circuit_opened_at = time.time()
+            return True
+
+    def get_ranked_endpoints(self, endpoints=None):
+        if endpoints is None:
+            endpoints = list(self.scores.keys())
+
+        available = [endpoint for endpoint in endpoints if self.is_available(endpoint)]
+
+        # Never go dark: if no endpoint is available, fall back to trying all endpoints in score order
+        if len(available) == 0:
+            available = list(endpoints)
+
+        with self._lock:
+            # random tiebreak spreads load across endpoints that have no history yet
+            return sorted(available, key=lambda endpoint: (self._get_score(endpoint).get_score(), random.random()))
+
+    def set_gov_version(self, endpoint, gov_version, checked_at=None):
+        with self._lock:
+            score = self._get_score(endpoint)
+            score.gov_version = gov_version
+            score.gov_version_checked_at = checked_at if checked_at is not None else time.time()
+
+    def get_gov_version(self, endpoint):
+        # Returns None once the remembered version is due for a re-probe
+        with self._lock:
+            score = self._get_score(endpoint)
+            if score.gov_version is None or time.time() - score.gov_version_checked_at > self.options["gov_version_reprobe_time"]:
+                return None
+            return score.gov_version
+
+    def get_gov_versions(self):
+        with self._lock:
+            return [
+                {"endpoint": score.endpoint, "gov_version": score.gov_version, "checked_at": score.gov_version_checked_at}
+                for score in self.scores.values()
+                if score.gov_version is not None
+            ]
+
+    def load_gov_versions(self, gov_versions):
+        for gov_version in gov_versions:
+            self.set_gov_version(gov_version["endpoint"], gov_version["gov_version"], gov_version["checked_at"])
+
+    def inherit(self, other):
+        # Carries over the history of endpoints that are still listed, used when a registry refresh rebuilds the chain
+        with other._lock:
+            scores = {endpoint: score for endpoint, score in other.scores.items() if endpoint in self.scores}
+            latency_samples = list(other.latency_samples)
+            last_refreshed_at = other.last_refreshed_at
+        with self._lock:
+            self.scores.update(scores)
+            self.latency_samples.extend(latency_samples)
+            self.last_refreshed_at = last_refreshed_at
+
+    def get_latency_percentile(self, percentile, default=None):
+        with self._lock:
+            if len(self.latency_samples) < MIN_LATENCY_SAMPLES:
+                return default
+            samples = sorted(self.latency_samples)
+        return samples[min(int(len(samples) * percentile), len(samples) - 1)]
+
+    def is_stale(self):
+        return self.last_refreshed_at is None or time.time() - self.last_refreshed_at > self.options["health_check_ttl"]
+
+    def start_refresh(self):
+        # Returns False if a refresh is already running, so only one caller runs the health checks
+        with self._lock:
+            if self.refreshing:
+                return False
+            self.refreshing = True
+            return True
+
+    def finish_refresh(self):
+        with self._lock:
+            self.refreshing = False
+            self.last_refreshed_at = time.time()
+
+    def get_stats(self):
+        with self._lock:
+            return [score.to_dict() for score in self.scores.values()]
@@ -0,0 +1,72 @@
+import ijson
+
+SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+FIRST_MESSAGE_PREFIX = "messages.item."
+
+class MissingProposalsError(Exception):
+    pass
+
+def set_path(obj, path, value):
+    keys = path.split(".")
+    for key in keys[:-1]:
+        obj = obj.setdefault(key, {})
+    obj[keys[-1]] = value
+
+def parse_proposals_stream(stream, fields, single=False):
+    """Parses a gov proposals list response from a file-like stream without loading the whole document
+
+    Only the proposal fields in fields are kept, given as dotted paths relative to a proposal. Paths under messages.item. are
+    read from the first message only, which is kept as a one item messages list. The result has the same shape as the response,
+    reduced to those fields and pagination.next_key. Raises MissingProposalsError if the response has no proposals list.
+    With single set the stream is a single proposal response ({"proposal": {...}}), returned as a one item proposals list.
+    """
+    # objects leading to a kept field are created even when empty, so the result keeps the response's shape
+    parents = {".".join(field.split(".")[:i]) for field in fields for i in range(1, field.count(".") + 1)}
+
+    data = {"pagination": {}}
+    proposals = None
+    proposal = None
+    message_index = -1
+
+    item_prefix = "proposal" if single else "proposals.item"
+    field_prefix = item_prefix + "."
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "proposals" and event == "start_array" and not single:
+            proposals = []
+        elif prefix == item_prefix:
+            if event == "start_map":
+                if single:
+                    proposals = []
+                proposal = {}
+                message_index = -1
+            elif event == "end_map":
+                proposals.append(proposal)
+                proposal = None
+        elif prefix == field_prefix + "messages" and event == "start_array":
+            proposal["messages"] = []
+        elif prefix == field_prefix + "messages.item" and event == "start_map":
+            message_index += 1
+            if message_index == 0:
+                proposal["messages"].append({})
+        elif prefix == "pagination.next_key" and event in SCALAR_EVENTS:
+            data["pagination"]["next_key"] = value
+        elif proposal is not None and prefix.startswith(field_prefix):
+            path = prefix[len(field_prefix):]
+            if event == "start_map" and path in parents and not path.startswith(FIRST_MESSAGE_PREFIX):
+                set_path(proposal, path, {})
+                continue
+            if event not in SCALAR_EVENTS or path not in fields:
+                continue
+            if path.startswith(FIRST_MESSAGE_PREFIX):
+                if message_index == 0:
+                    set_path(proposal["messages"][0], path[len(FIRST_MESSAGE_PREFIX):], value)
+            else:
+                set_path(proposal, path, value)
+
+    if proposals is None:
+        raise MissingProposalsError("response does not have a proposals list")
+
+    data["proposals"] = proposals
+    return data
@@ -32,15 +32,72 @@ class Config:
         if "chain_registry_zip_location" in self.config:
             self.chain_registry_zip_location = self.config["chain_registry_zip_location"]
 
+        # Parsed chain registry entries are cached here between restarts when set
+        self.chain_registry_cache_location = None
+        if "chain_registry_cache_location" in self.config:
+            self.chain_registry_cache_location = self.config["chain_registry_cache_location"]
+
+        # Seconds between background checks for an updated chain registry, 0 disables the refresh
+        self.chain_registry_refresh_interval = 3600.0
+        if "chain_registry_refresh_interval" in self.config:
+            self.chain_registry_refresh_interval = float(self.config["chain_registry_refresh_interval"])
+
         self.chain_registry_rest_overides = {}
         
         if "chain_registry_rest_overides" in self.config:
             self.chain_registry_rest_overides = self.config["chain_registry_rest_overides"]
 
+        # DAO DAO proposal module contracts polled instead of the gov module, by registry path or chain ID. A module's proposal IDs
+        # are shown with its prefix, the module without a prefix keeps the plain IDs its proposals were stored with.
+        self.dao_proposal_modules = {
+            "neutron-1": [
+                {
+                    "address": "neutron1436kxs0w2es6xlqpp9rd35e3d0cjnw4sv8j3a7483sgks29jqwgshlt6zh",
+                    "prefix": "",
+                    "name": "Neutron Single Proposal"
+                }
+            ]
+        }
+
+        if "dao_proposal_modules" in self.config:
+            for chain, modules in self.config["dao_proposal_modules"].items():
+                self.dao_proposal_modules[chain] = []
+                for module in modules:
+                    if "address" not in module:
+                        raise Exception(f"DAO proposal module for chain {chain} in config is missing an address")
+                    if module.get("prefix", "")[-1:].isdigit():
+                        raise Exception(f"DAO proposal module prefix for chain {chain} in config can not end with a digit")
+                    self.dao_proposal_modules[chain].append({
+                        "address": module["address"],
+                        "prefix": module.get("prefix", ""),
+                        "name": module.get("name", "DAO Proposal")
+                    })
+
+                prefixes = [module["prefix"] for module in self.dao_proposal_modules[chain]]
+                if len(prefixes) != len(set(prefixes)):
+                    raise Exception(f"DAO proposal modules for chain {chain} in config must have distinct prefixes")
 
+
+        # Channels to notify, each with the chains it is subscribed to. Without a slack_channels config the
+        # SLACK_CHANNEL_ID channel is subscribed to every configured chain
         self.slack_channel_id = os.environ.get("SLACK_CHANNEL_ID", None)
-        if self.slack_channel_id is None:
-            raise Exception("SLACK_CHANNEL_ID environment variable not set")
+        self.slack_channels = []
+
+        if "slack_channels" in self.config:
+            for slack_channel in self.config["slack_channels"]:
+                if "id" not in slack_channel:
+                    raise Exception("Slack channel in config is missing an id")
+                self.slack_channels.append({
+                    "id": slack_channel["id"],
+                    "chains": slack_channel.get("chains", self.chains)
+                })
+        elif self.slack_channel_id is not None:
+            self.slack_channels.append({"id": self.slack_channel_id, "chains": self.chains})
+        else:
+            raise Exception("SLACK_CHANNEL_ID environment variable not set and no slack_channels configured")
+
+        # Every chain is polled once no matter how many channels are subscribed to it
+        self.chains = list(dict.fromkeys(self.chains + [chain for slack_channel in self.slack_channels for chain in slack_channel["chains"]]))
         
         self.slack_bot_token = os.environ.get("SLACK_BOT_TOKEN", None)
 
@@ -66,7 +123,8 @@ class Config:
 
         self.main_loop = {
             "sleep_time": 60.0,
-            "proposal_workers": 10
+            "proposal_workers": 10,
+            "per_host_requests": 4
         }
 
         if "main_loop" in self.config:
@@ -74,6 +132,170 @@ class Config:
                 self.main_loop["sleep_time"] = float(self.config["main_loop"]["sleep_time"])
             if "proposal_workers" in self.config["main_loop"]:
                 self.main_loop["proposal_workers"] = int(self.config["main_loop"]["proposal_workers"])
+            if "per_host_requests" in self.config["main_loop"]:
+                self.main_loop["per_host_requests"] = int(self.config["main_loop"]["per_host_requests"])
+
+        # Hedged proposal requests across a chain's REST endpoints, delay defaults to the chain's observed p95 latency when not set
+        self.hedged_requests = {
+            "enabled": False,
+            "fanout": 2,
+            "delay": None
+        }
+
+        if "hedged_requests" in self.config:
+            if "enabled" in self.config["hedged_requests"]:
+                self.hedged_requests["enabled"] = bool(self.config["hedged_requests"]["enabled"])
+            if "fanout" in self.config["hedged_requests"]:
+                self.hedged_requests["fanout"] = int(self.config["hedged_requests"]["fanout"])
+            if "delay" in self.config["hedged_requests"] and self.config["hedged_requests"]["delay"] is not None:
+                self.hedged_requests["delay"] = float(self.config["hedged_requests"]["delay"])
+
+        # Connection pooling for chain REST/RPC traffic
+        self.http = {
+            "pool_connections": 200,
+            "pool_maxsize": 10,
+            "keep_alive": True
+        }
+
+        if "http" in self.config:
+            if "pool_connections" in self.config["http"]:
+                self.http["pool_connections"] = int(self.config["http"]["pool_connections"])
+            if "pool_maxsize" in self.config["http"]:
+                self.http["pool_maxsize"] = int(self.config["http"]["pool_maxsize"])
+            if "keep_alive" in self.config["http"]:
+                self.http["keep_alive"] = bool(self.config["http"]["keep_alive"])
+
+        # Per chain poll intervals and full resync intervals, see requesting.scheduler for the defaults. The main loop sleep_time
+        # is the interval a chain starts out with before its proposal history is known
+        self.poll_scheduling = {
+            "initial_interval": self.main_loop["sleep_time"]
+        }
+        self.poll_scheduling_chains = {}
+
+        if "poll_scheduling" in self.config:
+            for key in ["min_interval", "max_interval", "error_backoff_max", "full_resync_interval"]:
+                if key in self.config["poll_scheduling"]:
+                    self.poll_scheduling[key] = float(self.config["poll_scheduling"][key])
+            if "chains" in self.config["poll_scheduling"]:
+                for chain, chain_options in self.config["poll_scheduling"]["chains"].items():
+                    self.poll_scheduling_chains[chain] = {
+                        key: float(chain_options[key]) for key in ["min_interval", "max_interval", "error_backoff_max", "full_resync_interval"]
+                        if key in chain_options
+                    }
+
+        # Slack delivery from the outbox, runs on its own worker threads so polling never waits on notifications
+        self.slack_dispatch = {
+            "workers": 2,
+            "channel_post_interval": 1.0,
+            "batch_size": 50,
+            "lease_time": 300.0,
+            "claim_interval": 5.0
+        }
+
+        if "slack_dispatch" in self.config:
+            if "workers" in self.config["slack_dispatch"]:
+                self.slack_dispatch["workers"] = int(self.config["slack_dispatch"]["workers"])
+            if "channel_post_interval" in self.config["slack_dispatch"]:
+                self.slack_dispatch["channel_post_interval"] = float(self.config["slack_dispatch"]["channel_post_interval"])
+            if "batch_size" in self.config["slack_dispatch"]:
+                self.slack_dispatch["batch_size"] = int(self.config["slack_dispatch"]["batch_size"])
+            if "lease_time" in self.config["slack_dispatch"]:
+                self.slack_dispatch["lease_time"] = float(self.config["slack_dispatch"]["lease_time"])
+            if "claim_interval" in self.config["slack_dispatch"]:
+                self.slack_dispatch["claim_interval"] = float(self.config["slack_dispatch"]["claim_interval"])
+
+        # Splits the chains between replicas of the poller sharing one database, each chain is polled by the replica holding its lease
+        self.sharding = {
+            "enabled": False,
+            "lease_time": 60.0,
+            "heartbeat_interval": 15.0
+        }
+
+        if "sharding" in self.config:
+            if "enabled" in self.config["sharding"]:
+                self.sharding["enabled"] = bool(self.config["sharding"]["enabled"])
+            if "lease_time" in self.config["sharding"]:
+                self.sharding["lease_time"] = float(self.config["sharding"]["lease_time"])
+            if "heartbeat_interval" in self.config["sharding"]:
+                self.sharding["heartbeat_interval"] = float(self.config["sharding"]["heartbeat_interval"])
+
+        if self.sharding["heartbeat_interval"] >= self.sharding["lease_time"]:
+            raise Exception("Sharding heartbeat_interval must be shorter than lease_time")
+
+        # Proposal event subscriptions over the chains' RPC websockets, subscribed chains are only polled every reconciliation_interval
+        self.subscriptions = {
+            "enabled": False,
+            "reconciliation_interval": 3600.0,
+            "connect_timeout": 10.0,
+            "idle_timeout": 90.0,
+            "reconnect_delay": 1.0,
+            "max_reconnect_delay": 300.0
+        }
+
+        if "subscriptions" in self.config:
+            if "enabled" in self.config["subscriptions"]:
+                self.subscriptions["enabled"] = bool(self.config["subscriptions"]["enabled"])
+            for key in ["reconciliation_interval", "connect_timeout", "idle_timeout", "reconnect_delay", "max_reconnect_delay"]:
+                if key in self.config["subscriptions"]:
+                    self.subscriptions[key] = float(self.config["subscriptions"][key])
+
+        # Chrome trace files of main loop cycles, of every cycle when enabled and of the next signal_cycles cycles after a SIGUSR2
+        self.tracing = {
+            "enabled": False,
+            "directory": "./traces",
+            "max_files": 50,
+            "signal_cycles": 1
+        }
+
+        if "tracing" in self.config:
+            if "enabled" in self.config["tracing"]:
+                self.tracing["enabled"] = bool(self.config["tracing"]["enabled"])
+            if "directory" in self.config["tracing"]:
+                self.tracing["directory"] = self.config["tracing"]["directory"]
+            for key in ["max_files", "signal_cycles"]:
+                if key in self.config["tracing"]:
+                    self.tracing[key] = int(self.config["tracing"][key])
+
+        # Sampling profiles of the first cycles cycles after startup, and of the next signal_cycles cycles after a SIGUSR1
+        self.profiling = {
+            "directory": "./profiles",
+            "cycles": 0,
+            "signal_cycles": 5,
+            "sample_interval": 0.005
+        }
+
+        if "profiling" in self.config:
+            if "directory" in self.config["profiling"]:
+                self.profiling["directory"] = self.config["profiling"]["directory"]
+            for key in ["cycles", "signal_cycles"]:
+                if key in self.config["profiling"]:
+                    self.profiling[key] = int(self.config["profiling"][key])
+            if "sample_interval" in self.config["profiling"]:
+                self.profiling["sample_interval"] = float(self.config["profiling"]["sample_interval"])
+
+        # Prometheus metrics served at http://<address>:<port>/metrics when enabled
+        self.metrics = {
+            "enabled": False,
+            "port": 8000,
+            "address": "0.0.0.0"
+        }
+
+        if "metrics" in self.config:
+            if "enabled" in self.config["metrics"]:
+                self.metrics["enabled"] = bool(self.config["metrics"]["enabled"])
+            if "port" in self.config["metrics"]:
+                self.metrics["port"] = int(self.config["metrics"]["port"])
+            if "address" in self.config["metrics"]:
+                self.metrics["address"] = self.config["metrics"]["address"]
+
+        # Endpoint scoreboard tuning, see chain_registry.scoreboard for the defaults
+        self.endpoint_scoring = {}
+        if "endpoint_scoring" in self.config:
+            for key in ["health_check_ttl", "ewma_alpha", "circuit_open_time", "gov_version_reprobe_time"]:
+                if key in self.config["endpoint_scoring"]:
+                    self.endpoint_scoring[key] = float(self.config["endpoint_scoring"][key])
+            if "failure_threshold" in self.config["endpoint_scoring"]:
+                self.endpoint_scoring["failure_threshold"] = int(self.config["endpoint_scoring"]["failure_threshold"])
 
     def load_config(self):
         with open(self.config_file) as f:
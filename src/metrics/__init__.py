@@ -0,0 +1 @@
+from .metrics import start_metrics_server, MongoCommandListener
@@ -0,0 +1,103 @@
+import threading
+from prometheus_client import Counter, Gauge, Histogram, Summary, start_http_server
+from pymongo import monitoring
+
+# Chain polls range from a single cached page to several endpoints timing out in a row
+POLL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# Health checks time out after 3 seconds
+HEALTH_CHECK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+RESULT_SUCCESS = "success"
+RESULT_FAILURE = "failure"
+
+MAIN_LOOP_SECONDS = Histogram(
+    "cosmos_proposals_main_loop_seconds", "Time spent polling the due chains and queueing their notifications per main loop", buckets=POLL_BUCKETS
+)
+CHAINS_POLLED = Counter("cosmos_proposals_chains_polled_total", "Chains polled by the main loop")
+
+CHAIN_POLL_SECONDS = Histogram(
+    "cosmos_proposals_chain_poll_seconds", "Time to fetch a chain's active proposals, across all endpoints and API versions tried",
+    ["chain", "result"], buckets=POLL_BUCKETS
+)
+GOV_REQUESTS = Counter(
+    "cosmos_proposals_gov_requests_total", "Active proposal requests per chain and API version (REST or RPC v1 and v1beta1, or custom)",
+    ["chain", "api_version", "result"]
+)
+ENDPOINT_REQUESTS = Counter(
+    "cosmos_proposals_endpoint_requests_total", "Requests to a chain's REST and RPC endpoints", ["chain_id", "api", "endpoint", "result"]
+)
+# A summary only keeps a count and sum per endpoint, enough for average latency without a bucket set for every endpoint
+ENDPOINT_REQUEST_SECONDS = Summary(
+    "cosmos_proposals_endpoint_request_seconds", "Time to first byte of requests to a chain's REST and RPC endpoints", ["chain_id", "api", "endpoint"]
+)
+# Requests sent and connections opened by the pooled HTTP client, requests less new connections went out on a kept-alive one
+HTTP_REQUESTS = Counter("cosmos_proposals_http_requests_total", "Requests sent by the pooled HTTP client")
+HTTP_NEW_CONNECTIONS = Counter("cosmos_proposals_http_new_connections_total", "Connections opened by the pooled HTTP client")
+HEALTH_CHECK_SECONDS = Histogram(
+    "cosmos_proposals_health_check_seconds", "Endpoint health check durations", ["api", "result"], buckets=HEALTH_CHECK_BUCKETS
+)
+
+SUBSCRIPTION_CONNECTED = Gauge(
+    "cosmos_proposals_subscription_connected", "1 while the chain's proposal event subscription is connected", ["chain"]
+)
+SUBSCRIPTION_RECONNECTS = Counter(
+    "cosmos_proposals_subscription_reconnects_total", "Proposal event subscriptions that dropped or failed to connect", ["chain"]
+)
+SUBSCRIPTION_EVENTS = Counter(
+    "cosmos_proposals_subscription_events_total", "Proposals reported by a chain's event subscription", ["chain"]
+)
+PROPOSAL_FETCH_SECONDS = Histogram(
+    "cosmos_proposals_proposal_fetch_seconds", "Time to fetch the proposals reported by a chain's event subscription",
+    ["chain", "result"], buckets=POLL_BUCKETS
+)
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "cosmos_proposals_mongo_command_seconds", "Mongo command round trips", ["command", "collection", "result"], buckets=MONGO_BUCKETS
+)
+
+SLACK_REQUEST_SECONDS = Histogram("cosmos_proposals_slack_request_seconds", "Slack Web API call durations", ["method", "result"])
+SLACK_RATE_LIMITED = Counter("cosmos_proposals_slack_rate_limited_total", "Slack Web API calls answered with a 429", ["method", "channel_id"])
+
+OUTBOX_ROWS = Gauge("cosmos_proposals_outbox_rows", "Notifications in the outbox by status", ["status"])
+DISPATCHER_CLAIMED = Gauge("cosmos_proposals_dispatcher_claimed", "Notifications claimed by this process's dispatcher and not yet finished")
+
+
+def start_metrics_server(port, address="0.0.0.0"):
+    # Serves /metrics from a daemon thread
+    start_http_server(port, addr=address)
+
+
+def set_outbox_rows(status_counts, statuses):
+    for status in statuses:
+        OUTBOX_ROWS.labels(status).set(status_counts.get(status, 0))
+
+
+class MongoCommandListener(monitoring.CommandListener):
+
+    """Times every Mongo command sent by a client, register with MongoClient(event_listeners=[...])"""
+
+    def __init__(self):
+        # collection names by request, the completion events only carry the command name
+        self.collections = {}
+        self.lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore carries the cursor ID under the command name and the collection separately
+            collection = event.command.get("collection", "")
+        with self.lock:
+            self.collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        self._observe(event, RESULT_SUCCESS)
+
+    def failed(self, event):
+        self._observe(event, RESULT_FAILURE)
+
+    def _observe(self, event, result):
+        with self.lock:
+            collection = self.collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection, result).observe(event.duration_micros / 1e6)
+
@@ -1,4 +1,8 @@
 from .client import get_client, get_database
 from .slack_channel import SlackChannel
 from .chain import Chain
-from .proposal import Proposal
\ No newline at end of file
+from .proposal import Proposal
+from .notification import Notification
+from .dedup_cache import DedupCache
+from .outbox import Outbox
+from .lease import ChainLease
@@ -9,6 +9,130 @@ class ChainObject:
         self.created_at = doc["created_at"]
         self.updated_at = doc["updated_at"]
 
+        # The gov API request method that last worked for the chain, and the versions each endpoint answered with
+        if "gov_api_version" in doc:
+            self.gov_api_version = doc["gov_api_version"]
+            self.gov_api_version_checked_at = doc["gov_api_version_checked_at"]
+        else:
+            self.gov_api_version = None
+            self.gov_api_version_checked_at = None
+
+        if "gov_api_endpoint_versions" in doc:
+            self.gov_api_endpoint_versions = doc["gov_api_endpoint_versions"]
+        else:
+            self.gov_api_endpoint_versions = []
+
+        # High-water mark of proposal IDs seen on the chain and the last seen active set, used by incremental polls
+        if "last_proposal_id" in doc:
+            self.last_proposal_id = doc["last_proposal_id"]
+        else:
+            self.last_proposal_id = None
+
+        if "active_proposal_ids" in doc:
+            self.active_proposal_ids = doc["active_proposal_ids"]
+        else:
+            self.active_proposal_ids = []
+
+        # Proposals last seen in their deposit period, they can still enter voting so incremental polls start below them
+        if "deposit_proposal_ids" in doc:
+            self.deposit_proposal_ids = doc["deposit_proposal_ids"]
+        else:
+            self.deposit_proposal_ids = []
+
+        # High-water marks of chains polled through DAO proposal modules, one per module keyed by the module's proposal ID prefix.
+        # Stored as a list since the unprefixed module's empty prefix can not be a field name.
+        if "module_proposal_ids" in doc:
+            self.module_proposal_ids = {mark["prefix"]: mark["proposal_id"] for mark in doc["module_proposal_ids"]}
+        else:
+            self.module_proposal_ids = {}
+
+        if "last_full_sync_at" in doc:
+            self.last_full_sync_at = doc["last_full_sync_at"]
+        else:
+            self.last_full_sync_at = None
+
+    def get_gov_api_version(self):
+        return self.gov_api_version
+
+    def get_gov_api_endpoint_versions(self):
+        return self.gov_api_endpoint_versions
+
+    def is_gov_api_version_stale(self, reprobe_seconds):
+        if self.gov_api_version_checked_at is None:
+            return True
+        return (datetime.utcnow() - self.gov_api_version_checked_at).total_seconds() > reprobe_seconds
+
+    def set_gov_api_version(self, gov_api_version, endpoint_versions):
+        time_now = datetime.utcnow()
+        self.collection.update_one({"_id": self._id}, {"$set": {
+            "updated_at": time_now,
+            "gov_api_version": gov_api_version,
+            "gov_api_version_checked_at": time_now,
+            "gov_api_endpoint_versions": endpoint_versions
+        }})
+        self.gov_api_version = gov_api_version
+        self.gov_api_version_checked_at = time_now
+        self.gov_api_endpoint_versions = endpoint_versions
+
+    def get_last_proposal_id(self):
+        return self.last_proposal_id
+
+    def get_active_proposal_ids(self):
+        return self.active_proposal_ids
+
+    def get_deposit_proposal_ids(self):
+        return self.deposit_proposal_ids
+
+    def get_module_proposal_ids(self):
+        return self.module_proposal_ids
+
+    # Grows with every new proposal on the chain, the scheduler only compares it to its previous value
+    def get_proposal_sequence(self):
+        if len(self.module_proposal_ids) > 0:
+            return sum(self.module_proposal_ids.values())
+        return self.last_proposal_id
+
+    def get_open_proposal_count(self):
+        # proposals in their voting or deposit period as of the last poll
+        return len(self.active_proposal_ids) + len(self.deposit_proposal_ids)
+
+    def is_full_sync_due(self, resync_seconds):
+        if self.last_full_sync_at is None:
+            return True
+        return (datetime.utcnow() - self.last_full_sync_at).total_seconds() > resync_seconds
+
+    def set_sync_state(self, last_proposal_id, active_proposal_ids, full_sync, deposit_proposal_ids=None):
+        time_now = datetime.utcnow()
+        if deposit_proposal_ids is None:
+            deposit_proposal_ids = self.deposit_proposal_ids
+        update = {
+            "updated_at": time_now,
+            "last_proposal_id": last_proposal_id,
+            "active_proposal_ids": active_proposal_ids,
+            "deposit_proposal_ids": deposit_proposal_ids
+        }
+        if full_sync:
+            update["last_full_sync_at"] = time_now
+            self.last_full_sync_at = time_now
+        self.collection.update_one({"_id": self._id}, {"$set": update})
+        self.last_proposal_id = last_proposal_id
+        self.active_proposal_ids = active_proposal_ids
+        self.deposit_proposal_ids = deposit_proposal_ids
+
+    def set_module_sync_state(self, module_proposal_ids, active_proposal_ids, full_sync):
+        time_now = datetime.utcnow()
+        update = {
+            "updated_at": time_now,
+            "module_proposal_ids": [{"prefix": prefix, "proposal_id": proposal_id} for prefix, proposal_id in sorted(module_proposal_ids.items())],
+            "active_proposal_ids": active_proposal_ids
+        }
+        if full_sync:
+            update["last_full_sync_at"] = time_now
+            self.last_full_sync_at = time_now
+        self.collection.update_one({"_id": self._id}, {"$set": update})
+        self.module_proposal_ids = module_proposal_ids
+        self.active_proposal_ids = active_proposal_ids
+
 class Chain:
     def __init__(self, mongo_db):
         self.collection = mongo_db.chains
@@ -32,4 +156,3 @@ class Chain:
             return self.get_chain_by_name(chain_name)
         else:
             return chain
-        
\ No newline at end of file
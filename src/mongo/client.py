@@ -1,7 +1,10 @@
 from pymongo import MongoClient
+from metrics import MongoCommandListener
+from tracing import TracingCommandListener
 
 def get_client(uri):
-    return MongoClient(uri)
+    # every command is timed into the Mongo metrics, and into the trace while one is recorded
+    return MongoClient(uri, event_listeners=[MongoCommandListener(), TracingCommandListener()])
 
 def get_database(client):
     return client.cosmos_proposals
\ No newline at end of file
@@ -0,0 +1,111 @@
+import hashlib
+import math
+import threading
+from .notification import Notification
+
+DEFAULT_BLOOM_CAPACITY = 100000
+DEFAULT_BLOOM_ERROR_RATE = 0.01
+
+class BloomFilter:
+
+    """Fixed size bloom filter over string keys"""
+
+    def __init__(self, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _get_indexes(self, key):
+        # double hashing: two 64 bit halves of one digest generate every index
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        for index in self._get_indexes(key):
+            self.bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._get_indexes(key))
+
+    def is_full(self):
+        return self.count > self.capacity
+
+class DedupCache:
+
+    """In-memory dedup layer in front of the proposals and notifications collections
+
+    Notified (channel, proposal) pairs are loaded once into a bloom filter. A miss means the proposal was definitely not notified,
+    a hit is confirmed once against the database and then remembered, so checks for known proposals need no round trips.
+    The proposals seen on each chain's last poll are kept so they do not have to be looked up again.
+    """
+
+    def __init__(self, mongo_db, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self.notification = Notification(mongo_db)
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.notified_filter = BloomFilter(capacity, error_rate)
+        self.notified = set()
+        self.seen = {}
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(channel_id, proposal_id):
+        return f"{channel_id}:{proposal_id}"
+
+    def load(self):
+        capacity = self.capacity
+        while True:
+            notified_filter = BloomFilter(capacity, self.error_rate)
+            for doc in self.notification.collection.find({}, projection={"_id": 0, "channel_id": 1, "proposal_id": 1}):
+                notified_filter.add(self._get_key(doc["channel_id"], doc["proposal_id"]))
+            # keep the false positive rate at the configured level as history grows
+            if not notified_filter.is_full():
+                break
+            capacity *= 2
+
+        with self._lock:
+            self.capacity = capacity
+            self.notified_filter = notified_filter
+        return notified_filter.count
+
+    def is_proposal_notified(self, channel_id, proposal_id):
+        key = self._get_key(channel_id, proposal_id)
+        with self._lock:
+            if key in self.notified:
+                return True
+            if key not in self.notified_filter:
+                return False
+
+        # bloom filter hit, confirm against the database once
+        if self.notification.is_proposal_notified(channel_id, proposal_id):
+            with self._lock:
+                self.notified.add(key)
+            return True
+        return False
+
+    def set_proposal_notified(self, channel_id, proposal_id, ts=None):
+        inserted = self.notification.set_proposal_notified(channel_id, proposal_id, ts=ts)
+        key = self._get_key(channel_id, proposal_id)
+        with self._lock:
+            self.notified.add(key)
+            self.notified_filter.add(key)
+        if self.notified_filter.is_full():
+            self.load()
+        return inserted
+
+    def get_seen_proposals(self, chain_id):
+        with self._lock:
+            return self.seen.get(chain_id, {})
+
+    def set_seen_proposals(self, chain_id, proposals):
+        # replaced on every poll so the cache only holds the chain's currently active proposals
+        with self._lock:
+            self.seen[chain_id] = proposals
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+class ChainLease:
+
+    """Chain ownership leases shared by poller replicas, one document per chain keyed by chain name
+
+    A chain is polled only by the replica holding its lease. Leases expire unless renewed, so a dead replica's chains become free
+    once its leases run out. Live replicas are tracked through heartbeat documents with the same expiry.
+    """
+
+    def __init__(self, mongo_db):
+        self.collection = mongo_db.chain_leases
+        self.replicas = mongo_db.poller_replicas
+
+    def ensure_indexes(self):
+        # dead replicas are also filtered out by expiry on read, the TTL index only keeps the collection small
+        self.replicas.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+    def heartbeat(self, owner, lease_time):
+        time_now = datetime.utcnow()
+        self.replicas.update_one(
+            {"_id": owner},
+            {"$set": {"heartbeat_at": time_now, "expires_at": time_now + timedelta(seconds=lease_time)}, "$setOnInsert": {"started_at": time_now}},
+            upsert=True
+        )
+
+    def get_live_replicas(self):
+        return [doc["_id"] for doc in self.replicas.find({"expires_at": {"$gt": datetime.utcnow()}}, projection={"_id": 1})]
+
+    def remove_replica(self, owner):
+        self.replicas.delete_one({"_id": owner})
+
+    def acquire(self, owner, chain_name, lease_time):
+        # Takes the chain's lease if it is free, expired or already ours, returns False if another replica holds it
+        time_now = datetime.utcnow()
+        try:
+            self.collection.update_one(
+                {"_id": chain_name, "$or": [{"owner": owner}, {"owner": None}, {"expires_at": {"$lt": time_now}}]},
+                {"$set": {"owner": owner, "expires_at": time_now + timedelta(seconds=lease_time), "acquired_at": time_now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # the filter did not match an existing lease, so the upsert collided with the live holder's document
+            return False
+        return True
+
+    def renew(self, owner, chain_names, lease_time):
+        # Extends the given leases still held by owner in one write, returns the names of the chains still held.
+        # A lapsed lease nobody else took is still ours to renew.
+        if len(chain_names) == 0:
+            return set()
+        time_now = datetime.utcnow()
+        self.collection.update_many(
+            {"_id": {"$in": list(chain_names)}, "owner": owner},
+            {"$set": {"expires_at": time_now + timedelta(seconds=lease_time)}}
+        )
+        return {doc["_id"] for doc in self.collection.find({"_id": {"$in": list(chain_names)}, "owner": owner}, projection={"_id": 1})}
+
+    def release(self, owner, chain_names):
+        if len(chain_names) == 0:
+            return
+        self.collection.update_many(
+            {"_id": {"$in": list(chain_names)}, "owner": owner},
+            {"$set": {"owner": None, "expires_at": datetime.utcnow()}}
+        )
@@ -0,0 +1,66 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+
+class NotificationObject:
+    def __init__(self, collection, doc):
+        self.collection = collection
+        self.doc = doc
+        self._id = doc["_id"]
+        self.channel_id = doc["channel_id"]
+        self.proposal_id = doc["proposal_id"]
+        self.notified_at = doc["notified_at"]
+        if "ts" in doc:
+            self.ts = doc["ts"]
+        else:
+            self.ts = None
+
+class Notification:
+
+    """Notifications sent to Slack channels, one document per channel and proposal"""
+
+    def __init__(self, mongo_db):
+        self.collection = mongo_db.notifications
+
+    def ensure_indexes(self):
+        self.collection.create_index([("channel_id", ASCENDING), ("proposal_id", ASCENDING)], unique=True)
+
+    def get_notification(self, channel_id, proposal_id):
+        obj = self.collection.find_one({"channel_id": channel_id, "proposal_id": proposal_id})
+
+        if obj is None:
+            return None
+        else:
+            return NotificationObject(self.collection, obj)
+
+    def is_proposal_notified(self, channel_id, proposal_id):
+        return self.collection.find_one({"channel_id": channel_id, "proposal_id": proposal_id}, projection={"_id": 1}) is not None
+
+    def set_proposal_notified(self, channel_id, proposal_id, ts=None):
+        # Atomic insert-if-absent, returns True if this call recorded the notification
+        notification = {"notified_at": datetime.utcnow()}
+        if ts is not None:
+            notification["ts"] = ts
+        result = self.collection.update_one(
+            {"channel_id": channel_id, "proposal_id": proposal_id},
+            {"$setOnInsert": notification},
+            upsert=True
+        )
+        return result.upserted_id is not None
+
+    def migrate_proposals_notified(self, channel_id, proposals_notified, notified_at):
+        # One-time move of a channel's embedded proposals_notified map into the notifications collection
+        operations = []
+        for proposal_id in proposals_notified.keys():
+            if ObjectId.is_valid(proposal_id):
+                proposal_id = ObjectId(proposal_id)
+            operations.append(UpdateOne(
+                {"channel_id": channel_id, "proposal_id": proposal_id},
+                {"$setOnInsert": {"notified_at": notified_at}},
+                upsert=True
+            ))
+
+        if len(operations) > 0:
+            self.collection.bulk_write(operations, ordered=False)
+
+        return len(operations)
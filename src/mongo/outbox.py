@@ -0,0 +1,141 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+OUTBOX_PENDING = "pending"
+OUTBOX_POSTING = "posting"
+OUTBOX_POSTED = "posted"
+OUTBOX_REPLIED = "replied"
+OUTBOX_DONE = "done"
+OUTBOX_FAILED = "failed"
+
+# Rows in these states still need work from a delivery worker
+OUTBOX_OPEN_STATES = [OUTBOX_PENDING, OUTBOX_POSTING, OUTBOX_POSTED, OUTBOX_REPLIED]
+# Rows that are counted for the queue depth metrics, done rows pile up until their TTL and are left out
+OUTBOX_QUEUED_STATES = OUTBOX_OPEN_STATES + [OUTBOX_FAILED]
+
+# Delivery attempts before a row is given up on and marked failed
+MAX_DELIVERY_ATTEMPTS = 10
+# Finished rows are kept this long before Mongo removes them
+DONE_ROW_TTL_SECONDS = 30 * 24 * 60 * 60
+
+def get_lease_owner():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+class Outbox:
+
+    """Durable queue of Slack notifications waiting to be delivered, one row per channel and proposal
+
+    Rows move pending -> posting -> posted -> replied -> done. A worker claims rows with a lease, so rows held by a crashed worker
+    are picked up again once the lease expires, and every transition is only applied by the current lease owner.
+    """
+
+    def __init__(self, mongo_db):
+        self.collection = mongo_db.outbox
+
+    def ensure_indexes(self):
+        self.collection.create_index([("channel_id", ASCENDING), ("proposal_id", ASCENDING)], unique=True)
+        self.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        self.collection.create_index([("done_at", ASCENDING)], expireAfterSeconds=DONE_ROW_TTL_SECONDS)
+
+    def enqueue(self, notifications):
+        # Inserts rows for notifications not already in the outbox in one round trip, returns the number inserted
+        time_now = datetime.utcnow()
+        operations = []
+        for notification in notifications:
+            operations.append(UpdateOne(
+                {"channel_id": notification["channel_id"], "proposal_id": notification["proposal_object"]._id},
+                {"$setOnInsert": {
+                    "status": OUTBOX_PENDING,
+                    "chain_name": notification["chain_name"],
+                    "chain_proposal_id": notification["proposal_id"],
+                    "text": notification["text"],
+                    "blocks": notification["blocks"],
+                    "first_reply_text": notification["first_reply_text"],
+                    "first_reply_blocks": notification["first_reply_blocks"],
+                    "ts": None,
+                    "attempts": 0,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "next_attempt_at": time_now,
+                    "created_at": time_now,
+                    "updated_at": time_now,
+                }},
+                upsert=True
+            ))
+
+        if len(operations) == 0:
+            return 0
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    def claim(self, owner, batch_size, lease_time):
+        # Claims up to batch_size open rows that are due and not leased by a live worker
+        rows = []
+        for _ in range(batch_size):
+            time_now = datetime.utcnow()
+            row = self.collection.find_one_and_update(
+                {
+                    "status": {"$in": OUTBOX_OPEN_STATES},
+                    "next_attempt_at": {"$lte": time_now},
+                    "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": time_now}}],
+                },
+                {"$set": {"lease_owner": owner, "lease_expires_at": time_now + timedelta(seconds=lease_time)}},
+                sort=[("next_attempt_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+            if row is None:
+                break
+            rows.append(row)
+        return rows
+
+    def extend_leases(self, owner, row_ids, lease_time):
+        if len(row_ids) == 0:
+            return
+        self.collection.update_many(
+            {"_id": {"$in": list(row_ids)}, "lease_owner": owner},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_time)}}
+        )
+
+    def _transition(self, row, owner, update):
+        # Returns False if the row's lease was lost to another worker
+        update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+        result = self.collection.update_one({"_id": row["_id"], "lease_owner": owner}, update)
+        return result.modified_count == 1
+
+    def mark_posting(self, row, owner):
+        return self._transition(row, owner, {"$set": {"status": OUTBOX_POSTING, "posting_at": datetime.utcnow()}})
+
+    def mark_posted(self, row, owner, ts):
+        return self._transition(row, owner, {"$set": {"status": OUTBOX_POSTED, "ts": ts}})
+
+    def mark_replied(self, row, owner):
+        return self._transition(row, owner, {"$set": {"status": OUTBOX_REPLIED}})
+
+    def mark_done(self, row, owner):
+        time_now = datetime.utcnow()
+        return self._transition(row, owner, {"$set": {"status": OUTBOX_DONE, "done_at": time_now, "lease_owner": None, "lease_expires_at": None}})
+
+    def release(self, row, owner, status, error, retry_delay):
+        # Gives a row back after a failed attempt, it is retried after retry_delay unless it has run out of attempts
+        attempts = row.get("attempts", 0) + 1
+        if attempts >= MAX_DELIVERY_ATTEMPTS:
+            status = OUTBOX_FAILED
+        return self._transition(row, owner, {"$set": {
+            "status": status,
+            "attempts": attempts,
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "next_attempt_at": datetime.utcnow() + timedelta(seconds=retry_delay),
+        }})
+
+    def get_status_counts(self, statuses=None):
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        if statuses is not None:
+            # matched on the status index instead of scanning every row
+            pipeline.insert(0, {"$match": {"status": {"$in": statuses}}})
+        return {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
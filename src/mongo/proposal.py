@@ -1,4 +1,6 @@
 from datetime import datetime
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 
 class ProposalObject:
     def __init__(self, collection, doc):
@@ -51,4 +53,77 @@ class Proposal:
             return self.get_proposal_by_chain_and_id(chain_id, proposal_id)
         else:
             return proposal
-        
\ No newline at end of file
+
+    def ensure_indexes(self):
+        self.collection.create_index([("chain_id", ASCENDING), ("proposal_id", ASCENDING)], unique=True)
+
+    def find_proposals_by_chain_and_ids(self, keys):
+        # keys is a list of (chain_id, proposal_id) tuples, resolved with one $in query per chain in a single $or
+        proposal_ids_by_chain = {}
+        for chain_id, proposal_id in keys:
+            proposal_ids_by_chain.setdefault(chain_id, []).append(proposal_id)
+
+        query = {"$or": [
+            {"chain_id": chain_id, "proposal_id": {"$in": proposal_ids}}
+            for chain_id, proposal_ids in proposal_ids_by_chain.items()
+        ]}
+
+        return {
+            (doc["chain_id"], doc["proposal_id"]): ProposalObject(self.collection, doc)
+            for doc in self.collection.find(query)
+        }
+
+    def bulk_find_or_create_proposals(self, proposals):
+        """Resolves (chain_id, proposal_id, submit_time) tuples from one poll with a single find and a single bulk_write
+
+        Missing proposals are upserted and proposals without a submit time get it set, returns ProposalObjects keyed by (chain_id, proposal_id)
+        """
+
+        if len(proposals) == 0:
+            return {}
+
+        submit_times = {(chain_id, proposal_id): submit_time for chain_id, proposal_id, submit_time in proposals}
+
+        found = self.find_proposals_by_chain_and_ids(list(submit_times.keys()))
+
+        time_now = datetime.utcnow()
+        operations = []
+        new_docs = []
+        for key, submit_time in submit_times.items():
+            proposal = found.get(key)
+            if proposal is None:
+                doc = {"chain_id": key[0], "proposal_id": key[1], "created_at": time_now, "updated_at": time_now, "submit_time": submit_time}
+                operations.append(UpdateOne(
+                    {"chain_id": key[0], "proposal_id": key[1]},
+                    {"$setOnInsert": {"created_at": time_now, "updated_at": time_now, "submit_time": submit_time}},
+                    upsert=True
+                ))
+                new_docs.append(doc)
+            elif proposal.submit_time is None:
+                operations.append(UpdateOne(
+                    {"_id": proposal._id, "submit_time": {"$exists": False}},
+                    {"$set": {"updated_at": time_now, "submit_time": submit_time}}
+                ))
+                new_docs.append(None)
+                proposal.submit_time = submit_time
+
+        if len(operations) == 0:
+            return found
+
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError:
+            # another writer created some of the proposals first, read them all back
+            return self.find_proposals_by_chain_and_ids(list(submit_times.keys()))
+
+        for index, _id in result.upserted_ids.items():
+            doc = new_docs[index]
+            doc["_id"] = _id
+            found[(doc["chain_id"], doc["proposal_id"])] = ProposalObject(self.collection, doc)
+
+        # an upsert that matched a document created since the find does not return an id, read those back
+        missing = [key for key in submit_times.keys() if key not in found]
+        if len(missing) > 0:
+            found.update(self.find_proposals_by_chain_and_ids(missing))
+
+        return found
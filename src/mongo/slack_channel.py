@@ -1,7 +1,8 @@
 from datetime import datetime
+from .notification import Notification
 
 class SlackChannelObject:
-    def __init__(self, collection, doc):
+    def __init__(self, collection, doc, notification):
         self.collection = collection
         self.doc = doc
         self._id = doc["_id"]
@@ -9,34 +10,43 @@ class SlackChannelObject:
         self.created_at = doc["created_at"]
         self.updated_at = doc["updated_at"]
 
-        if "proposals_notified" in doc:
-            self.proposals_notified = doc["proposals_notified"]
-        else:
-            self.proposals_notified = {}
+        # Notification state lives in its own collection, see mongo.notification, optionally behind a mongo.dedup_cache.DedupCache
+        self.notification = notification
 
     def is_proposal_notified(self, proposal_id):
-        return str(proposal_id) in self.proposals_notified
+        return self.notification.is_proposal_notified(self.channel_id, proposal_id)
 
-    def set_proposal_notified(self, proposal_id):
-        self.proposals_notified[str(proposal_id)] = True
-        time_now = datetime.utcnow()
-        self.collection.update_one({"_id": self._id}, {"$set": {"updated_at": time_now, "proposals_notified": self.proposals_notified}})
+    def set_proposal_notified(self, proposal_id, ts=None):
+        return self.notification.set_proposal_notified(self.channel_id, proposal_id, ts=ts)
 
 class SlackChannel:
 
     """Represents a Slack channel in the database"""
 
-    def __init__(self, mongo_db):
+    def __init__(self, mongo_db, dedup_cache=None):
         self.collection = mongo_db.channels
+        self.notification = Notification(mongo_db)
+        # notified checks go through the dedup cache when one is given, it has the same interface as Notification
+        self.notification_store = dedup_cache if dedup_cache is not None else self.notification
 
     def get_channel_by_id(self, channel_id):
         obj = self.collection.find_one({"channel_id": channel_id})
 
         if obj is None:
             return None
-        else:
-            return SlackChannelObject(self.collection, obj)
-    
+
+        if "proposals_notified" in obj:
+            self.migrate_proposals_notified(obj)
+
+        return SlackChannelObject(self.collection, obj, self.notification_store)
+
+    def migrate_proposals_notified(self, doc):
+        # Channels created before the notifications collection kept every notified proposal in an embedded map,
+        # move it over once and drop the map so the channel document stops growing
+        self.notification.migrate_proposals_notified(doc["channel_id"], doc["proposals_notified"], doc["updated_at"])
+        self.collection.update_one({"_id": doc["_id"]}, {"$unset": {"proposals_notified": ""}})
+        del doc["proposals_notified"]
+
     def create_channel_by_id(self, channel_id):
         time_now = datetime.utcnow()
         self.collection.insert_one({"channel_id": channel_id, "created_at": time_now, "updated_at": time_now})
@@ -48,4 +58,3 @@ class SlackChannel:
             return self.get_channel_by_id(channel_id)
         else:
             return channel
-        
\ No newline at end of file
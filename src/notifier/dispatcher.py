@@ -0,0 +1,282 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import timedelta, timezone
+from slack_sdk.errors import SlackApiError
+from tracing import span, traced
+from metrics.metrics import SLACK_REQUEST_SECONDS, SLACK_RATE_LIMITED, RESULT_SUCCESS, RESULT_FAILURE
+from mongo.outbox import get_lease_owner, MAX_DELIVERY_ATTEMPTS, OUTBOX_PENDING, OUTBOX_POSTING, OUTBOX_POSTED, OUTBOX_REPLIED
+
+# Slack allows about one message per second per channel for chat.postMessage
+DEFAULT_CHANNEL_POST_INTERVAL = 1.0
+# Wait used when a 429 response does not carry a usable Retry-After header
+DEFAULT_RETRY_AFTER = 30.0
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_LEASE_TIME = 300.0
+DEFAULT_CLAIM_INTERVAL = 5.0
+# Backoff after a failed post, doubled per attempt up to the maximum
+RETRY_BASE_DELAY = 60.0
+RETRY_MAX_DELAY = 3600.0
+
+# Metadata attached to every post, lets a restarted worker find a message it posted but never recorded
+NOTIFICATION_EVENT_TYPE = "proposal_notification"
+# How far before a row's posting time the channel history is searched for the message
+RECOVERY_WINDOW_SECONDS = 60
+
+JOB_POST = "post"
+JOB_FIRST_REPLY = "first_reply"
+
+class SlackDispatcher:
+
+    """Delivers proposal notifications from the outbox to Slack, separate from the polling loop
+
+    A feeder thread claims due outbox rows in batches and keeps their leases alive while they are worked on. Worker threads post them,
+    spacing posts per channel and pausing a channel for the Retry-After of a 429. A first reply is queued as soon as its parent post
+    returns, so other parent posts can go out while it waits for the channel. on_done is called with the row once it was delivered.
+    """
+
+    def __init__(self, slack_client, outbox, on_done, logger, do_slack=True, workers=2, channel_post_interval=DEFAULT_CHANNEL_POST_INTERVAL,
+                 batch_size=DEFAULT_BATCH_SIZE, lease_time=DEFAULT_LEASE_TIME, claim_interval=DEFAULT_CLAIM_INTERVAL):
+        self.slack_client = slack_client
+        self.outbox = outbox
+        self.on_done = on_done
+        self.logger = logger
+        self.do_slack = do_slack
+        self.workers = workers
+        self.channel_post_interval = channel_post_interval
+        self.batch_size = batch_size
+        self.lease_time = lease_time
+        self.claim_interval = claim_interval
+        self.owner = get_lease_owner()
+
+        # heap of (ready_at, sequence, job), the sequence keeps jobs that are ready at the same time in queue order
+        self.jobs = []
+        self.sequence = itertools.count()
+        self.channel_next_post_at = {}
+        # rows claimed by this dispatcher and not yet finished, keyed by row id
+        self.claimed = {}
+
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._threads = []
+        self._stopped = False
+
+    def start(self):
+        threads = [threading.Thread(target=self._feed, name="slack-dispatcher-feeder", daemon=True)]
+        for i in range(self.workers):
+            threads.append(threading.Thread(target=self._run, name=f"slack-dispatcher-{i}", daemon=True))
+        for thread in threads:
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._wake.set()
+
+    def wake(self):
+        # Claim new rows now instead of waiting for the next claim interval
+        self._wake.set()
+
+    def get_claimed_count(self):
+        with self._condition:
+            return len(self.claimed)
+
+    def _feed(self):
+        while not self._stopped:
+            self._wake.clear()
+            try:
+                self._claim()
+            except Exception as err:
+                self.logger.error(f"Unable to claim notifications from the outbox: {err}")
+            self._wake.wait(self.claim_interval)
+
+    def _claim(self):
+        with self._condition:
+            claimed_ids = list(self.claimed.keys())
+        self.outbox.extend_leases(self.owner, claimed_ids, self.lease_time)
+
+        available = self.batch_size - len(claimed_ids)
+        if available <= 0:
+            return
+
+        rows = self.outbox.claim(self.owner, available, self.lease_time)
+        if len(rows) > 0:
+            self.logger.info(f"Claimed {len(rows)} notifications from the outbox")
+
+        for row in rows:
+            with self._condition:
+                self.claimed[row["_id"]] = row
+
+            if row["status"] in (OUTBOX_PENDING, OUTBOX_POSTING):
+                self._push(time.time(), {"type": JOB_POST, "row": row})
+            elif row["status"] == OUTBOX_POSTED and self.do_slack and row["ts"] is not None and len(row["first_reply_blocks"]) != 0:
+                self._push(time.time(), {"type": JOB_FIRST_REPLY, "row": row})
+            else:
+                self._run_job(self._complete, row)
+
+    def _push(self, ready_at, job):
+        with self._condition:
+            heapq.heappush(self.jobs, (ready_at, next(self.sequence), job))
+            self._condition.notify()
+
+    def _next_job(self):
+        # Blocks until a job is ready and its channel may be posted to, then reserves the channel's next post slot
+        with self._condition:
+            while not self._stopped:
+                if len(self.jobs) == 0:
+                    self._condition.wait()
+                    continue
+
+                ready_at, sequence, job = self.jobs[0]
+                now = time.time()
+                ready_at = max(ready_at, self.channel_next_post_at.get(job["row"]["channel_id"], 0))
+                if ready_at > now:
+                    self._condition.wait(ready_at - now)
+                    continue
+
+                heapq.heappop(self.jobs)
+                self.channel_next_post_at[job["row"]["channel_id"]] = now + self.channel_post_interval
+                return job
+            return None
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if job["type"] == JOB_POST:
+                self._run_job(self._post, job["row"])
+            else:
+                self._run_job(self._first_reply, job["row"])
+
+    def _run_job(self, fn, row):
+        try:
+            fn(row)
+        except Exception as err:
+            # the row keeps its lease until it expires, then it is retried from its last recorded state
+            self.logger.error(f"Unexpected error delivering notification for proposal {row['chain_proposal_id']} on chain {row['chain_name']}: {err}")
+            self._forget(row)
+
+    def _post(self, row):
+        self.logger.info(f"Sending notification for proposal {row['chain_proposal_id']} on chain {row['chain_name']}")
+
+        ts = None
+        if self.do_slack:
+            # a row left in posting by a crashed worker may already be in the channel
+            if row["status"] == OUTBOX_POSTING:
+                ts = self._find_posted_message(row)
+                if ts is not None:
+                    self.logger.info(f"Recovered posted notification for proposal {row['chain_proposal_id']} on chain {row['chain_name']}")
+                else:
+                    row = {**row, "status": OUTBOX_PENDING}
+
+            if ts is None:
+                if not self.outbox.mark_posting(row, self.owner):
+                    return self._forget(row)
+                try:
+                    resp = self._post_message(
+                        channel=row["channel_id"],
+                        text=row["text"],
+                        blocks=row["blocks"],
+                        unfurl_links=False,
+                        metadata={"event_type": NOTIFICATION_EVENT_TYPE, "event_payload": {"outbox_id": str(row["_id"])}}
+                    )
+                except SlackApiError as e:
+                    if e.response.status_code == 429:
+                        return self._retry_after({"type": JOB_POST, "row": row}, e.response)
+                    self.logger.error(f"Error sending Slack notification: {e.response['error']}")
+                    self.outbox.release(row, self.owner, OUTBOX_PENDING, e.response["error"], self._get_retry_delay(row))
+                    return self._forget(row)
+                ts = resp["ts"]
+
+        if not self.outbox.mark_posted(row, self.owner, ts):
+            return self._forget(row)
+        row = {**row, "status": OUTBOX_POSTED, "ts": ts}
+
+        if ts is not None and len(row["first_reply_blocks"]) != 0:
+            self._push(time.time(), {"type": JOB_FIRST_REPLY, "row": row})
+        else:
+            self._complete(row)
+
+    def _first_reply(self, row):
+        try:
+            self._post_message(
+                channel=row["channel_id"],
+                text=row["first_reply_text"],
+                blocks=row["first_reply_blocks"],
+                unfurl_links=False,
+                thread_ts=row["ts"]
+            )
+        except SlackApiError as e:
+            if e.response.status_code == 429:
+                return self._retry_after({"type": JOB_FIRST_REPLY, "row": row}, e.response)
+            self.logger.error(f"Error sending Slack first reply notification: {e.response['error']}")
+            # the parent message is out, a reply that keeps failing is given up on rather than holding back the notification
+            if row.get("attempts", 0) + 1 < MAX_DELIVERY_ATTEMPTS:
+                self.outbox.release(row, self.owner, OUTBOX_POSTED, e.response["error"], self._get_retry_delay(row))
+                return self._forget(row)
+
+        if not self.outbox.mark_replied(row, self.owner):
+            return self._forget(row)
+        self._complete({**row, "status": OUTBOX_REPLIED})
+
+    def _complete(self, row):
+        # the row is done before on_done runs, so a failing callback can not leave it to be leased and posted again
+        self.outbox.mark_done(row, self.owner)
+        try:
+            self.on_done(row)
+        except Exception as err:
+            self.logger.error(f"Error recording delivered notification for proposal {row['chain_proposal_id']}: {err}")
+        self.logger.info(f"Proposal {row['chain_proposal_id']} notified")
+        self._forget(row)
+
+    def _post_message(self, **kwargs):
+        start_time = time.time()
+        try:
+            with span("slack.chat_postMessage", channel=kwargs["channel"], reply="thread_ts" in kwargs):
+                resp = self.slack_client.chat_postMessage(**kwargs)
+        except SlackApiError as e:
+            SLACK_REQUEST_SECONDS.labels("chat.postMessage", RESULT_FAILURE).observe(time.time() - start_time)
+            if e.response.status_code == 429:
+                SLACK_RATE_LIMITED.labels("chat.postMessage", kwargs["channel"]).inc()
+            raise
+        SLACK_REQUEST_SECONDS.labels("chat.postMessage", RESULT_SUCCESS).observe(time.time() - start_time)
+        return resp
+
+    @traced("slack.find_posted_message", lambda self, row: {"channel": row["channel_id"]})
+    def _find_posted_message(self, row):
+        # stored times are naive UTC
+        oldest = (row["posting_at"] - timedelta(seconds=RECOVERY_WINDOW_SECONDS)).replace(tzinfo=timezone.utc)
+        try:
+            for page in self.slack_client.conversations_history(channel=row["channel_id"], oldest=str(oldest.timestamp()), include_all_metadata=True, limit=200):
+                for message in page["messages"]:
+                    metadata = message.get("metadata", {})
+                    if metadata.get("event_type") == NOTIFICATION_EVENT_TYPE and metadata.get("event_payload", {}).get("outbox_id") == str(row["_id"]):
+                        return message["ts"]
+        except SlackApiError as e:
+            self.logger.error(f"Unable to search Slack channel history for an earlier post: {e.response['error']}")
+        return None
+
+    def _get_retry_delay(self, row):
+        return min(RETRY_BASE_DELAY * 2 ** row.get("attempts", 0), RETRY_MAX_DELAY)
+
+    def _retry_after(self, job, response):
+        retry_after = DEFAULT_RETRY_AFTER
+        try:
+            retry_after = float(response.headers.get("Retry-After", response.headers.get("retry-after", DEFAULT_RETRY_AFTER)))
+        except (TypeError, ValueError):
+            pass
+
+        self.logger.warning(f"Slack rate limited channel {job['row']['channel_id']}, retrying in {retry_after} seconds")
+        with self._condition:
+            # pause every job for the channel, not just this one
+            self.channel_next_post_at[job["row"]["channel_id"]] = time.time() + retry_after
+        self._push(time.time(), job)
+
+    def _forget(self, row):
+        with self._condition:
+            self.claimed.pop(row["_id"], None)
@@ -1,3 +1,8 @@
 
-from .requests import get_active_proposals
-from .normalization import normalize_proposal_response
\ No newline at end of file
+from .requests import get_active_proposals, get_active_proposals_async, get_proposals, get_proposals_async
+from .normalization import normalize_proposal_response
+from .proposal import NormalizedProposal, parse_submit_time
+from .poller import ProposalPoller
+from .scheduler import PollScheduler
+from .sharding import ChainSharder
+from .subscriptions import ProposalSubscriptions
@@ -1,4 +1,16 @@
 
 V1_REQUEST_METHOD = "v1_proposals"
 V1BETA1_REQUEST_METHOD = "v1beta1_proposals"
-CUSTOM_REQUEST_METHOD = "custom"
\ No newline at end of file
+# The gov queries sent as protobuf through the RPC servers' abci_query, normalized like their REST counterparts
+V1_RPC_REQUEST_METHOD = "v1_rpc_proposals"
+V1BETA1_RPC_REQUEST_METHOD = "v1beta1_rpc_proposals"
+CUSTOM_REQUEST_METHOD = "custom"
+# Proposals of the DAO DAO proposal module contracts configured for a chain
+DAODAO_REQUEST_METHOD = "daodao_proposals"
+
+ACTIVE_PROPOSAL_STATUS = "PROPOSAL_STATUS_VOTING_PERIOD"
+DEPOSIT_PROPOSAL_STATUS = "PROPOSAL_STATUS_DEPOSIT_PERIOD"
+
+# Incremental polls only fetch proposals above the chain's incremental start, a full poll is still done this often to
+# correct the sync state. Default of the poll_scheduling full_resync_interval option.
+FULL_RESYNC_INTERVAL_SECONDS = 900.0
@@ -0,0 +1,3 @@
+from .requests import get_dao_active_proposals, get_dao_active_proposals_async, get_dao_proposals
+from .normalization import normalize_dao_proposal
+from .events import get_dao_event_queries
@@ -0,0 +1,13 @@
+COSMWASM_CONTRACT_ENDPOINT = "/cosmwasm/wasm/v1/contract/{address}/smart/{query_data}"
+
+PAGE_LIMIT = 30
+ACTIVE_PROPOSAL_STATUS = "open"
+
+# Subscription query for new proposals on a proposal module, with the event attribute holding the proposal ID
+PROPOSAL_EVENT_QUERY = "tm.event='Tx' AND wasm._contract_address='{address}' AND wasm.action='propose'"
+PROPOSAL_EVENT_ATTRIBUTE = "wasm.proposal_id"
+CONTRACT_ADDRESS_EVENT_ATTRIBUTE = "wasm._contract_address"
+
+# CometBFT allows 5 subscriptions per client by default, chains with more modules share one query for every propose action
+MAX_PROPOSAL_EVENT_QUERIES = 5
+ALL_PROPOSALS_EVENT_QUERY = "tm.event='Tx' AND wasm.action='propose'"
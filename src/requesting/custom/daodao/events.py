@@ -0,0 +1,11 @@
+from .constants import PROPOSAL_EVENT_QUERY, PROPOSAL_EVENT_ATTRIBUTE, MAX_PROPOSAL_EVENT_QUERIES, ALL_PROPOSALS_EVENT_QUERY
+
+# Subscription queries for new proposals on the given modules, as (query, proposal ID attribute, {contract address: prefix})
+def get_dao_event_queries(modules):
+    prefixes = {module["address"]: module["prefix"] for module in modules}
+    if len(modules) > MAX_PROPOSAL_EVENT_QUERIES:
+        return [(ALL_PROPOSALS_EVENT_QUERY, PROPOSAL_EVENT_ATTRIBUTE, prefixes)]
+    return [
+        (PROPOSAL_EVENT_QUERY.format(address=module["address"]), PROPOSAL_EVENT_ATTRIBUTE, {module["address"]: module["prefix"]})
+        for module in modules
+    ]
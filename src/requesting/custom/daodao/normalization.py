@@ -0,0 +1,18 @@
+from datetime import datetime
+from requesting.proposal import NormalizedProposal, parse_submit_time
+
+def normalize_dao_proposal(proposal):
+    # The submit time is estimated when the proposal is requested, proposals without an estimate are taken as just submitted
+    # so the submit time filter in app.py does not skip them
+    submit_time = datetime.utcnow()
+    if proposal.get("submit_time") is not None:
+        submit_time = parse_submit_time(proposal["submit_time"])
+
+    return NormalizedProposal(
+        proposal["id"],
+        proposal["proposal"].get("title", ""),
+        proposal["proposal"].get("description", ""),
+        submit_time,
+        proposal["module"],
+        "PROPOSAL_STATUS_VOTING_PERIOD"
+    )
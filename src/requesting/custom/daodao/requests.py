@@ -0,0 +1,242 @@
+from .constants import COSMWASM_CONTRACT_ENDPOINT, PAGE_LIMIT, ACTIVE_PROPOSAL_STATUS
+from chain_registry import Chain
+from mongo import Chain as MongoChain
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import base64
+import time
+from requesting.constants import DAODAO_REQUEST_METHOD, FULL_RESYNC_INTERVAL_SECONDS
+from tracing import traced
+from metrics.metrics import GOV_REQUESTS, RESULT_SUCCESS, RESULT_FAILURE
+from requesting.proposal import SUBMIT_TIME_FORMAT
+from requesting.sync import update_module_sync_state
+import json
+
+# Seconds a module's proposals vote for by contract address, read from the module's config the first time it has open proposals.
+# None for modules that vote for a number of blocks.
+MODULE_VOTING_PERIODS = {}
+
+# Polls every proposal module of the chain at once, each on the chain's ranked REST servers in turn until one answers.
+# Modules that fail are left out of the response instead of failing the chain, which only errors when every module failed.
+# The chain's sync state keeps the newest proposal ID of every module, see requesting.sync.
+@traced("requesting.get_dao_active_proposals", lambda chain_name, *args, **kwargs: {"chain": chain_name})
+def get_dao_active_proposals(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, logger, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
+):
+    modules = chain_registry_object.dao_proposal_modules
+    results = request_modules(chain_registry_object, [(module, request_module_open_proposals, ()) for module in modules])
+
+    proposals = []
+    module_proposal_ids = {}
+    error = None
+    for module, module_proposals, module_error in results:
+        if module_error is not None:
+            logger.error(f"{chain_name}: Failed to retrieve active proposals from DAO proposal module {module['address']}. Error: {module_error}")
+            error = module_error
+            continue
+        proposals.extend(format_proposal(module, proposal) for proposal in module_proposals)
+        module_proposal_ids[module["prefix"]] = max([proposal["id"] for proposal in module_proposals] + [0])
+
+    if error is not None and len(module_proposal_ids) == 0:
+        GOV_REQUESTS.labels(chain_name, DAODAO_REQUEST_METHOD, RESULT_FAILURE).inc()
+        return {
+            "error": error,
+            "active_proposals": None,
+            "chain_name": chain_name,
+            "chain_object": chain_object,
+            "chain_registry_entry": chain_registry_object,
+        }
+
+    GOV_REQUESTS.labels(chain_name, DAODAO_REQUEST_METHOD, RESULT_SUCCESS).inc()
+    active_proposals = filter_active_proposals(proposals)
+    # every poll that gets all modules sees all their open proposals, the sync state is rewritten as a full sync when one is due
+    full_sync = error is None and chain_object.is_full_sync_due(full_resync_interval)
+    update_module_sync_state(chain_object, module_proposal_ids, [proposal["id"] for proposal in active_proposals], full_sync)
+    return {
+        "error": None,
+        "active_proposals": {"proposals": active_proposals},
+        "chain_name": chain_name,
+        "chain_object": chain_object,
+        "chain_registry_entry": chain_registry_object,
+        "request_method": DAODAO_REQUEST_METHOD,
+        # the proposals of failed modules were not seen, they are kept until the next poll that gets every module
+        "full_sync": error is None,
+    }
+
+# Targeted fetch of the given proposals, used for proposals reported by a subscription. The IDs are matched to the
+# modules by their prefix, proposals that can not be fetched are left out unless none could be.
+@traced("requesting.get_dao_proposals", lambda chain_name, *args, **kwargs: {"chain": chain_name})
+def get_dao_proposals(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, proposal_ids, logger
+):
+    requests = []
+    for proposal_id in proposal_ids:
+        module, number = parse_proposal_id(chain_registry_object.dao_proposal_modules, proposal_id)
+        if module is None:
+            logger.warning(f"{chain_name}: Proposal {proposal_id} does not belong to any DAO proposal module, skipping")
+            continue
+        requests.append((module, request_module_proposal, (number,)))
+
+    proposals = []
+    error = None
+    for module, proposal, module_error in request_modules(chain_registry_object, requests):
+        if module_error is not None:
+            logger.warning(f"{chain_name}: Failed to retrieve proposal from DAO proposal module {module['address']}. Error: {module_error}")
+            error = module_error
+            continue
+        proposals.append(format_proposal(module, proposal))
+
+    if error is not None and len(proposals) == 0:
+        logger.error(f"{chain_name}: Failed to retrieve proposals {proposal_ids} from DAO proposal modules. Error: {error}")
+        GOV_REQUESTS.labels(chain_name, DAODAO_REQUEST_METHOD, RESULT_FAILURE).inc()
+        return {
+            "error": error,
+            "active_proposals": None,
+            "chain_name": chain_name,
+            "chain_object": chain_object,
+            "chain_registry_entry": chain_registry_object,
+        }
+
+    GOV_REQUESTS.labels(chain_name, DAODAO_REQUEST_METHOD, RESULT_SUCCESS).inc()
+    return {
+        "error": None,
+        "active_proposals": {"proposals": filter_active_proposals(proposals)},
+        "chain_name": chain_name,
+        "chain_object": chain_object,
+        "chain_registry_entry": chain_registry_object,
+        "request_method": DAODAO_REQUEST_METHOD,
+        "full_sync": False,
+    }
+
+# Async version of get_dao_active_proposals, the blocking requests are run in the given executor (or the loop default)
+async def get_dao_active_proposals_async(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, logger, executor=None, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
+):
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, get_dao_active_proposals, chain_name, chain_registry_object, chain_object, logger, full_resync_interval
+    )
+
+# Runs the (module, request_fn, args) requests concurrently and returns (module, result, error) for each in order
+def request_modules(chain_registry_object, requests):
+    if len(requests) == 0:
+        return []
+
+    def run(request):
+        module, request_fn, args = request
+        try:
+            return module, request_with_failover(chain_registry_object, request_fn, module, *args), None
+        except Exception as e:
+            return module, None, e
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        return list(executor.map(run, requests))
+
+def request_with_failover(chain_registry_object, request_fn, module, *args):
+    error = Exception("No REST servers to request proposals from")
+    for rest_server in chain_registry_object.get_ranked_rest_servers():
+        try:
+            return request_fn(chain_registry_object, rest_server, module, *args)
+        except Exception as e:
+            error = e
+    raise error
+
+# Proposal modules are queried newest first with:
+# {
+#   "reverse_proposals": {
+#     "limit": <int>, //num to return in response
+#     "start_before": <int> //pagination start
+#   }
+# }
+# Paging stops at the first page holding an expired proposal, a module's proposals all vote for the same period so the older ones
+# are closed as well. Open proposals are usually all on the first page, which makes a poll a single request per module.
+def request_module_open_proposals(chain_registry_object, server, module):
+    proposals = []
+    start_before = None
+    while True:
+        json_data = {"reverse_proposals": {"limit": PAGE_LIMIT}}
+        if start_before is not None:
+            json_data["reverse_proposals"]["start_before"] = start_before
+
+        proposal_page = query_contract(chain_registry_object, server, module["address"], json_data)["proposals"]
+        proposals.extend(proposal_page)
+
+        if len(proposal_page) < PAGE_LIMIT or has_expired_proposal(proposals):
+            return add_submit_times(chain_registry_object, server, module, proposals)
+        start_before = proposal_page[-1]["id"]
+
+# A single proposal is queried with {"proposal": {"proposal_id": <int>}} and returned in the same shape as the listed proposals
+def request_module_proposal(chain_registry_object, server, module, proposal_id):
+    proposal = query_contract(chain_registry_object, server, module["address"], {"proposal": {"proposal_id": proposal_id}})
+    return add_submit_times(chain_registry_object, server, module, [proposal])[0]
+
+# DAO DAO proposals do not record when they were submitted, it is estimated for open proposals as their expiration time less the
+# module's voting period. Proposals it can not be estimated for are left without a submit_time.
+def add_submit_times(chain_registry_object, server, module, proposals):
+    if not any(proposal["proposal"]["status"] == ACTIVE_PROPOSAL_STATUS for proposal in proposals):
+        return proposals
+
+    voting_period = get_module_voting_period(chain_registry_object, server, module)
+    for proposal in proposals:
+        expiration = proposal["proposal"].get("expiration", {})
+        if voting_period is not None and "at_time" in expiration:
+            submit_time = datetime.utcfromtimestamp(int(expiration["at_time"]) / 10 ** 9 - voting_period)
+            proposal["submit_time"] = submit_time.strftime(SUBMIT_TIME_FORMAT)
+    return proposals
+
+def get_module_voting_period(chain_registry_object, server, module):
+    if module["address"] not in MODULE_VOTING_PERIODS:
+        try:
+            config = query_contract(chain_registry_object, server, module["address"], {"config": {}})
+        except Exception:
+            # read again with the module's next proposals
+            return None
+        MODULE_VOTING_PERIODS[module["address"]] = (config.get("max_voting_period") or {}).get("time")
+    return MODULE_VOTING_PERIODS[module["address"]]
+
+def query_contract(chain_registry_object, server, address, json_data):
+    base64_json_data = base64.b64encode(json.dumps(json_data).encode("utf-8"))
+
+    # the server only counts as healthy once the answer was read
+    return chain_registry_object.request_rest(
+        server,
+        COSMWASM_CONTRACT_ENDPOINT.format(
+            address=address,
+            query_data=base64_json_data.decode("utf-8"),
+        ),
+        lambda response: response.json()["data"],
+        timeout=10
+    )
+
+def has_expired_proposal(proposals):
+    # The newest proposal started at or before the current block, which bounds the height of expirations set by block height
+    current_height = max(proposal["proposal"].get("start_height", 0) for proposal in proposals)
+    now = time.time_ns()
+    for proposal in proposals:
+        expiration = proposal["proposal"].get("expiration", {})
+        if "at_time" in expiration and int(expiration["at_time"]) < now:
+            return True
+        if "at_height" in expiration and int(expiration["at_height"]) < current_height:
+            return True
+    return False
+
+# Proposals of the module without a prefix keep their plain integer ID, the others are shown with the module's prefix (A1, B1)
+def format_proposal(module, proposal):
+    proposal_id = proposal["id"] if module["prefix"] == "" else f"{module['prefix']}{proposal['id']}"
+    return {**proposal, "id": proposal_id, "module": module["name"]}
+
+def parse_proposal_id(modules, proposal_id):
+    # Returns the module the proposal ID belongs to and the proposal's number on it, or None when no module matches
+    proposal_id = str(proposal_id)
+    for module in sorted(modules, key=lambda module: len(module["prefix"]), reverse=True):
+        number = proposal_id[len(module["prefix"]):]
+        if proposal_id.startswith(module["prefix"]) and number.isdigit():
+            return module, int(number)
+    return None, None
+
+def filter_active_proposals(proposals):
+    return [
+        proposal
+        for proposal in proposals
+        if proposal["proposal"]["status"] == ACTIVE_PROPOSAL_STATUS
+    ]
@@ -1,2 +0,0 @@
-from .requests import get_neutron_active_proposals
-from .normalization import normalize_neutron_active_proposal
\ No newline at end of file
@@ -1,8 +0,0 @@
-
-COSMWASM_CONTRACT_ENDPOINT = "/cosmwasm/wasm/v1/contract/{address}/smart/{query_data}"
-NEUTRON_SINGLE_PROPOSAL_CONTRACT_ADDRESS = (
-    "neutron1436kxs0w2es6xlqpp9rd35e3d0cjnw4sv8j3a7483sgks29jqwgshlt6zh"
-)
-
-BASE_LIMIT = 30
-SINGLE_PROPOSAL_ACTIVE_STATUS = "open"
\ No newline at end of file
@@ -1,5 +1,6 @@
-from .constants import V1_REQUEST_METHOD, V1BETA1_REQUEST_METHOD, CUSTOM_REQUEST_METHOD
-from .custom.neutron import normalize_neutron_active_proposal
+from .constants import V1_REQUEST_METHOD, V1BETA1_REQUEST_METHOD, V1_RPC_REQUEST_METHOD, V1BETA1_RPC_REQUEST_METHOD, DAODAO_REQUEST_METHOD, CUSTOM_REQUEST_METHOD
+from .custom.daodao import normalize_dao_proposal
+from .proposal import NormalizedProposal
 
 def normalize_proposal_response(chain_registry_entry, proposal, request_method):
 
@@ -24,32 +25,35 @@ def normalize_v1_proposal(proposal):
             title = first_message.get("content", {}).get("title", "")
         if description == "":
             description = first_message.get("content", {}).get("description", "")
-    return {
-        "proposal_id": proposal["id"],
-        "title": title,
-        "description": description,
-        "submit_time": proposal["submit_time"],
-        "type": first_message.get("@type", ""),
-        "status": proposal.get("status", ""),
-    }
+    return NormalizedProposal.from_timestamp(
+        proposal["id"],
+        title,
+        description,
+        proposal["submit_time"],
+        first_message.get("@type", ""),
+        proposal.get("status", ""),
+    )
 
 
 def normalize_v1beta1_proposal(proposal):
-    return {
-        "proposal_id": proposal["proposal_id"],
-        "title": proposal["content"].get("title", ""),
-        "description": proposal["content"].get("description", ""),
-        "submit_time": proposal["submit_time"],
-        "type": proposal["content"].get("@type", ""),
-        "status": proposal.get("status", ""),
-    }
+    return NormalizedProposal.from_timestamp(
+        proposal["proposal_id"],
+        proposal["content"].get("title", ""),
+        proposal["content"].get("description", ""),
+        proposal["submit_time"],
+        proposal["content"].get("@type", ""),
+        proposal.get("status", ""),
+    )
 
 
 REQUEST_METHOD_TO_NORMALIZE_MAP = {
     V1_REQUEST_METHOD: normalize_v1_proposal,
     V1BETA1_REQUEST_METHOD: normalize_v1beta1_proposal,
+    # the protobuf decoders return proposals in the REST shape
+    V1_RPC_REQUEST_METHOD: normalize_v1_proposal,
+    V1BETA1_RPC_REQUEST_METHOD: normalize_v1beta1_proposal,
+    DAODAO_REQUEST_METHOD: normalize_dao_proposal,
 }
 
-CHAINS_TO_NORMALIZE_MAP = {
-    "neutron-1": normalize_neutron_active_proposal
-}
\ No newline at end of file
+# Normalization functions of chains with their own request function, which return proposals with the custom request method
+CHAINS_TO_NORMALIZE_MAP = {}
\ No newline at end of file
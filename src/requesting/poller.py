@@ -0,0 +1,68 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics.metrics import CHAIN_POLL_SECONDS, PROPOSAL_FETCH_SECONDS, RESULT_SUCCESS, RESULT_FAILURE
+from .constants import FULL_RESYNC_INTERVAL_SECONDS
+from .requests import get_active_proposals_async, get_proposals_async
+
+
+class ProposalPoller:
+
+    """Polls all configured chains concurrently and yields each chain's response as soon as it arrives"""
+
+    def __init__(self, max_concurrency, logger):
+        self.max_concurrency = max_concurrency
+        self.logger = logger
+
+        # The chain requests are blocking, so they are run in a long-lived pool sized to the global concurrency limit
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="proposal-poller")
+
+    # Chains with an entry in proposal_ids only have those proposals fetched instead of a full poll, their responses are marked targeted.
+    # full_resync_intervals overrides the seconds between a chain's full polls
+    async def poll(self, chains, proposal_ids={}, full_resync_intervals={}):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def poll_chain(chain_name, chain):
+            async with semaphore:
+                targeted = chain_name in proposal_ids
+                error = Exception(f"No response returned for chain {chain_name}")
+                start_time = time.time()
+                try:
+                    if targeted:
+                        self.logger.debug(f"Requesting proposals {proposal_ids[chain_name]} for chain {chain_name}")
+                        response = await get_proposals_async(
+                            chain_name, chain["chain_registry_entry"], chain["chain_object"], proposal_ids[chain_name], self.logger, executor=self.executor
+                        )
+                    else:
+                        self.logger.debug(f"Requesting active proposals for chain {chain_name}")
+                        response = await get_active_proposals_async(
+                            chain_name, chain["chain_registry_entry"], chain["chain_object"], self.logger, executor=self.executor,
+                            full_resync_interval=full_resync_intervals.get(chain_name, FULL_RESYNC_INTERVAL_SECONDS)
+                        )
+                except Exception as err:
+                    response = None
+                    error = err
+
+                if response is None:
+                    # Fetchers return error responses rather than raising, keep the same shape for unexpected failures
+                    response = {
+                        "error": error,
+                        "active_proposals": None,
+                        "chain_name": chain_name,
+                        "chain_object": chain["chain_object"],
+                        "chain_registry_entry": chain["chain_registry_entry"],
+                    }
+
+                response["poll_time"] = time.time() - start_time
+                response["targeted"] = targeted
+                histogram = PROPOSAL_FETCH_SECONDS if targeted else CHAIN_POLL_SECONDS
+                histogram.labels(chain_name, RESULT_SUCCESS if response["error"] is None else RESULT_FAILURE).observe(response["poll_time"])
+                return response
+
+        tasks = [asyncio.create_task(poll_chain(chain_name, chain)) for chain_name, chain in chains.items()]
+
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
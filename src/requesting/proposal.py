@@ -0,0 +1,36 @@
+from datetime import datetime
+
+SUBMIT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def parse_submit_time(timestamp):
+    # Cosmos timestamps do not have a standard number of fractional second digits, which makes them hard to parse in Python,
+    # so only the seconds precision part is parsed and the fraction and trailing Z are dropped
+    return datetime.strptime(timestamp[:19], SUBMIT_TIME_FORMAT)
+
+class NormalizedProposal:
+
+    """A proposal from any gov API version or custom chain source, reduced to the fields used for notifications
+
+    submit_time is a naive UTC datetime, or None if the source timestamp could not be parsed.
+    """
+
+    __slots__ = ("proposal_id", "title", "description", "submit_time", "type", "status")
+
+    def __init__(self, proposal_id, title, description, submit_time, type, status):
+        self.proposal_id = proposal_id
+        self.title = title
+        self.description = description
+        self.submit_time = submit_time
+        self.type = type
+        self.status = status
+
+    @classmethod
+    def from_timestamp(cls, proposal_id, title, description, timestamp, type, status):
+        try:
+            submit_time = parse_submit_time(timestamp)
+        except (TypeError, ValueError):
+            submit_time = None
+        return cls(proposal_id, title, description, submit_time, type, status)
+
+    def __repr__(self):
+        return f"NormalizedProposal(proposal_id={self.proposal_id!r}, status={self.status!r}, submit_time={self.submit_time!r})"
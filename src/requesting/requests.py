@@ -1,72 +1,241 @@
+import asyncio
 from chain_registry import Chain
 from mongo import Chain as MongoChain
-from .constants import V1_REQUEST_METHOD, V1BETA1_REQUEST_METHOD
-from .custom.neutron import get_neutron_active_proposals
+from tracing import traced
+from metrics.metrics import GOV_REQUESTS, RESULT_SUCCESS, RESULT_FAILURE
+from .constants import (
+    V1_REQUEST_METHOD, V1BETA1_REQUEST_METHOD, V1_RPC_REQUEST_METHOD, V1BETA1_RPC_REQUEST_METHOD, ACTIVE_PROPOSAL_STATUS, DEPOSIT_PROPOSAL_STATUS,
+    FULL_RESYNC_INTERVAL_SECONDS
+)
+from .custom.daodao import get_dao_active_proposals, get_dao_active_proposals_async, get_dao_proposals
+from .sync import get_incremental_start, update_sync_state
 
 
 def get_active_proposals(
-    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, logger
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, logger, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
 ):
+    return CHAINS_TO_REQUEST_MAP[get_request_map_key(chain_registry_object)](
+        chain_name, chain_registry_object, chain_object, logger, full_resync_interval=full_resync_interval
+    )
+
+
+async def get_active_proposals_async(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, logger, executor=None, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
+):
+    return await CHAINS_TO_ASYNC_REQUEST_MAP[get_request_map_key(chain_registry_object)](
+        chain_name, chain_registry_object, chain_object, logger, executor=executor, full_resync_interval=full_resync_interval
+    )
+
+
+# Targeted fetch of the given proposal IDs, used for proposals reported by a subscription. Returns the same response as a poll.
+def get_proposals(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, proposal_ids, logger
+):
+    request_fn = CHAINS_TO_PROPOSAL_REQUEST_MAP[get_request_map_key(chain_registry_object)]
+    return request_fn(chain_name, chain_registry_object, chain_object, proposal_ids, logger)
+
+
+# Async version of get_proposals, the blocking requests are run in the given executor (or the loop default)
+async def get_proposals_async(
+    chain_name: str, chain_registry_object: Chain, chain_object: MongoChain, proposal_ids, logger, executor=None
+):
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, get_proposals, chain_name, chain_registry_object, chain_object, proposal_ids, logger
+    )
+
+
+# Chains with their own request function are looked up by chain ID, chains with DAO proposal modules configured are requested
+# from those, and every other chain from its gov module
+def get_request_map_key(chain_registry_object: Chain):
     if chain_registry_object.chain_id in CHAINS_TO_REQUEST_MAP:
-        return CHAINS_TO_REQUEST_MAP[chain_registry_object.chain_id](
-            chain_name, chain_registry_object, chain_object, logger
-        )
-    else:
-        return CHAINS_TO_REQUEST_MAP["default_fn"](
-            chain_name, chain_registry_object, chain_object, logger
-        )
+        return chain_registry_object.chain_id
+    elif len(chain_registry_object.dao_proposal_modules) > 0:
+        return "dao_fn"
+    return "default_fn"
 
 
 # This is the default proposal request function. It will be used for all chains that do not have a custom request function.
 # It does the following:
-# 1. Attempt to get the active proposals from the chain entry using the Gov v1 endpoint
-# 2. If that fails, attempt to get the active proposals from the chain entry using the Gov v1beta1 endpoint
+# 1. Attempt to get the active proposals from the chain entry using the request method that last worked for the chain
+# 2. If that fails, attempt to get the active proposals using the other request methods
 # 3. If that fails, return an error
+# Chains with no remembered method, or one that is due for a re-probe, try the Gov v1 REST endpoint first, fall back to Gov v1beta1,
+# and then to the same queries over the chain's RPC servers
+# Between periodic full polls, only proposals above the chain's incremental start are requested, see requesting.sync
+@traced("requesting.get_chain_active_proposals", lambda chain_name, *args, **kwargs: {"chain": chain_name})
 def get_chain_active_proposals(
-    chain_name: str, chain_registry_entry: Chain, chain_object: MongoChain, logger
+    chain_name: str, chain_registry_entry: Chain, chain_object: MongoChain, logger, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
 ):
-    try:
-        ret = {
+    min_proposal_id = get_incremental_start(chain_object, full_resync_interval)
+    full_sync = min_proposal_id is None
+
+    error = None
+    for request_method in get_gov_request_method_order(chain_registry_entry, chain_object):
+        try:
+            active_proposals = GOV_REQUEST_METHOD_MAP[request_method](chain_registry_entry, min_proposal_id=min_proposal_id)
+        except Exception as endpoint_error:
+            logger.debug(
+                f"{chain_name}: Failed to retrieve active proposals from chain using {request_method} endpoint. Error: {endpoint_error}."
+            )
+            GOV_REQUESTS.labels(chain_name, request_method, RESULT_FAILURE).inc()
+            error = endpoint_error
+            continue
+
+        GOV_REQUESTS.labels(chain_name, request_method, RESULT_SUCCESS).inc()
+
+        logger.debug(f"{chain_name}: Successfully retrieved active proposals from chain using {request_method} endpoint")
+        remember_gov_request_method(chain_name, chain_registry_entry, chain_object, request_method, logger)
+
+        # the requests also return proposals of other statuses, only the deposit period ones matter for the sync state
+        id_key = GOV_REQUEST_METHOD_ID_KEYS[request_method]
+        proposals = active_proposals["proposals"]
+        voting_proposals = [proposal for proposal in proposals if proposal.get("status") == ACTIVE_PROPOSAL_STATUS]
+        update_sync_state(
+            chain_object,
+            [proposal[id_key] for proposal in proposals],
+            [proposal[id_key] for proposal in voting_proposals],
+            full_sync,
+            [proposal[id_key] for proposal in proposals if proposal.get("status") == DEPOSIT_PROPOSAL_STATUS],
+        )
+
+        return {
             "error": None,
-            "active_proposals": chain_registry_entry.get_active_proposals_v1(),
+            "active_proposals": {"proposals": voting_proposals},
             "chain_name": chain_name,
             "chain_object": chain_object,
             "chain_registry_entry": chain_registry_entry,
-            "request_method": V1_REQUEST_METHOD,
+            "request_method": request_method,
+            "full_sync": full_sync,
         }
-        logger.debug(f"{chain_name}: Successfully retrieved active proposals from chain using v1 endpoint")
-        return ret
-    except Exception as v1_endpoint_error:
-        logger.debug(
-            f"{chain_name}: Failed to retrieve active proposals from chain using v1 endpoint. Falling back to v1beta1 endpoint. V1 Endpoint error: {v1_endpoint_error}."
-        )
+
+    logger.error(
+        f"{chain_name}: Failed to retrieve active proposals from chain using v1 and v1beta1 REST and RPC endpoints. Last error: {error}"
+    )
+    return {
+        "error": error,
+        "active_proposals": None,
+        "chain_name": chain_name,
+        "chain_object": chain_object,
+        "chain_registry_entry": chain_registry_entry,
+    }
+
+
+def get_gov_request_method_order(chain_registry_entry: Chain, chain_object: MongoChain):
+    remembered_method = chain_object.get_gov_api_version()
+    if remembered_method not in GOV_REQUEST_METHOD_MAP or chain_object.is_gov_api_version_stale(chain_registry_entry.get_gov_version_reprobe_time()):
+        return DEFAULT_GOV_REQUEST_METHOD_ORDER
+    return [remembered_method] + [method for method in DEFAULT_GOV_REQUEST_METHOD_ORDER if method != remembered_method]
+
+
+# Persists the working gov API version on the chain document so it survives restarts.
+# Only writes when something changed or the re-probe interval passed, so steady state polls do not touch the database.
+def remember_gov_request_method(
+    chain_name: str, chain_registry_entry: Chain, chain_object: MongoChain, request_method, logger
+):
+    endpoint_versions = chain_registry_entry.get_endpoint_gov_versions()
+
+    remembered_endpoint_versions = {version["endpoint"]: version["gov_version"] for version in chain_object.get_gov_api_endpoint_versions()}
+    current_endpoint_versions = {version["endpoint"]: version["gov_version"] for version in endpoint_versions}
+
+    if (
+        request_method != chain_object.get_gov_api_version()
+        or remembered_endpoint_versions != current_endpoint_versions
+        or chain_object.is_gov_api_version_stale(chain_registry_entry.get_gov_version_reprobe_time())
+    ):
+        logger.debug(f"{chain_name}: Remembering gov API request method {request_method}")
+        chain_object.set_gov_api_version(request_method, endpoint_versions)
+
+
+# Fetches the given proposals with the chain's request methods in the same order as a poll.
+# Fetched proposals still in their deposit period are added to the chain's deposit set, so polls keep looking for them
+# until they enter voting, and fetched proposals that left the deposit period are removed from it.
+@traced("requesting.get_chain_proposals", lambda chain_name, *args, **kwargs: {"chain": chain_name})
+def get_chain_proposals(
+    chain_name: str, chain_registry_entry: Chain, chain_object: MongoChain, proposal_ids, logger
+):
+    error = None
+    for request_method in get_gov_request_method_order(chain_registry_entry, chain_object):
         try:
-            ret = {
-                "error": None,
-                "active_proposals": chain_registry_entry.get_active_proposals_v1beta1(),
-                "chain_name": chain_name,
-                "chain_object": chain_object,
-                "chain_registry_entry": chain_registry_entry,
-                "request_method": V1BETA1_REQUEST_METHOD,
-            }
-            logger.debug(
-                f"{chain_name}: Successfully retrieved active proposals from chain using v1beta1 endpoint"
-            )
-            return ret
-        except Exception as v1beta1_endpoint_error:
-            logger.error(
-                f"{chain_name}: Failed to retrieve active proposals from chain using v1 and v1beta1 endpoints. V1beta1 Endpoint error: {v1beta1_endpoint_error}"
-            )
-            return {
-                "error": v1beta1_endpoint_error,
-                "active_proposals": None,
-                "chain_name": chain_name,
-                "chain_object": chain_object,
-                "chain_registry_entry": chain_registry_entry,
-            }
+            proposals = GOV_PROPOSAL_REQUEST_METHOD_MAP[request_method](chain_registry_entry, proposal_ids)
+        except Exception as endpoint_error:
+            logger.debug(f"{chain_name}: Failed to retrieve proposals {proposal_ids} from chain using {request_method} endpoint. Error: {endpoint_error}.")
+            GOV_REQUESTS.labels(chain_name, request_method, RESULT_FAILURE).inc()
+            error = endpoint_error
+            continue
+
+        GOV_REQUESTS.labels(chain_name, request_method, RESULT_SUCCESS).inc()
+
+        id_key = GOV_REQUEST_METHOD_ID_KEYS[request_method]
+        fetched_proposal_ids = [int(proposal[id_key]) for proposal in proposals["proposals"]]
+        active_proposal_ids = [proposal[id_key] for proposal in proposals["proposals"] if proposal.get("status") == ACTIVE_PROPOSAL_STATUS]
+        deposit_proposal_ids = [
+            proposal_id for proposal_id in chain_object.get_deposit_proposal_ids() if proposal_id not in fetched_proposal_ids
+        ] + [int(proposal[id_key]) for proposal in proposals["proposals"] if proposal.get("status") == DEPOSIT_PROPOSAL_STATUS]
+        update_sync_state(chain_object, fetched_proposal_ids, active_proposal_ids, False, deposit_proposal_ids)
+
+        return {
+            "error": None,
+            "active_proposals": proposals,
+            "chain_name": chain_name,
+            "chain_object": chain_object,
+            "chain_registry_entry": chain_registry_entry,
+            "request_method": request_method,
+            "full_sync": False,
+        }
 
+    logger.error(f"{chain_name}: Failed to retrieve proposals {proposal_ids} from chain. Last error: {error}")
+    return {
+        "error": error,
+        "active_proposals": None,
+        "chain_name": chain_name,
+        "chain_object": chain_object,
+        "chain_registry_entry": chain_registry_entry,
+    }
+
+
+# Async version of get_chain_active_proposals, the blocking requests are run in the given executor (or the loop default)
+async def get_chain_active_proposals_async(
+    chain_name: str, chain_registry_entry: Chain, chain_object: MongoChain, logger, executor=None, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS
+):
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, get_chain_active_proposals, chain_name, chain_registry_entry, chain_object, logger, full_resync_interval
+    )
+
+
+GOV_REQUEST_METHOD_MAP = {
+    V1_REQUEST_METHOD: Chain.get_active_proposals_v1,
+    V1BETA1_REQUEST_METHOD: Chain.get_active_proposals_v1beta1,
+    V1_RPC_REQUEST_METHOD: Chain.get_active_proposals_v1_rpc,
+    V1BETA1_RPC_REQUEST_METHOD: Chain.get_active_proposals_v1beta1_rpc,
+}
+
+GOV_PROPOSAL_REQUEST_METHOD_MAP = {
+    V1_REQUEST_METHOD: Chain.get_proposals_v1,
+    V1BETA1_REQUEST_METHOD: Chain.get_proposals_v1beta1,
+    V1_RPC_REQUEST_METHOD: Chain.get_proposals_v1_rpc,
+    V1BETA1_RPC_REQUEST_METHOD: Chain.get_proposals_v1beta1_rpc,
+}
+
+GOV_REQUEST_METHOD_ID_KEYS = {
+    V1_REQUEST_METHOD: "id",
+    V1BETA1_REQUEST_METHOD: "proposal_id",
+    V1_RPC_REQUEST_METHOD: "id",
+    V1BETA1_RPC_REQUEST_METHOD: "proposal_id",
+}
+
+DEFAULT_GOV_REQUEST_METHOD_ORDER = [V1_REQUEST_METHOD, V1BETA1_REQUEST_METHOD, V1_RPC_REQUEST_METHOD, V1BETA1_RPC_REQUEST_METHOD]
 
 CHAINS_TO_REQUEST_MAP = {
     "default_fn": get_chain_active_proposals,
-    "neutron-1": get_neutron_active_proposals,
+    "dao_fn": get_dao_active_proposals,
+}
+
+CHAINS_TO_ASYNC_REQUEST_MAP = {
+    "default_fn": get_chain_active_proposals_async,
+    "dao_fn": get_dao_active_proposals_async,
+}
+
+CHAINS_TO_PROPOSAL_REQUEST_MAP = {
+    "default_fn": get_chain_proposals,
+    "dao_fn": get_dao_proposals,
 }
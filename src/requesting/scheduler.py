@@ -0,0 +1,181 @@
+import heapq
+import time
+from .constants import FULL_RESYNC_INTERVAL_SECONDS
+
+DEFAULT_SCHEDULER_OPTIONS = {
+    # seconds between polls of a chain before anything is known about it
+    "initial_interval": 60.0,
+    # bounds on a chain's interval, can be overridden per chain. Quiet chains are only polled less often than the old fixed
+    # 60 second cadence where a longer max_interval is configured
+    "min_interval": 30.0,
+    "max_interval": 60.0,
+    # longest wait before retrying a chain whose polls keep failing, can be overridden per chain
+    "error_backoff_max": 1800.0,
+    # seconds between full polls of a chain, the polls in between are incremental. Can be overridden per chain
+    "full_resync_interval": FULL_RESYNC_INTERVAL_SECONDS,
+}
+
+# A chain is polled this many times per expected gap between its proposals, a chain with a new proposal every day is polled
+# every 30 seconds and one with a new proposal every month every 15 minutes, before the intervals are clamped
+POLLS_PER_PROPOSAL_GAP = 2880
+# Governance comes in bursts, the interval of a chain is shortened by this factor while it has proposals in their deposit or
+# voting period
+OPEN_PROPOSALS_INTERVAL_FACTOR = 0.5
+# Weight of the newest gap in the moving average of time between new proposals
+PROPOSAL_GAP_EWMA_ALPHA = 0.3
+# A chain is never polled more often than this many times its own poll duration, so slow chains do not hog the poller
+POLL_TIME_INTERVAL_FACTOR = 10
+
+class ChainSchedule:
+
+    """Polling state of a single chain"""
+
+    def __init__(self, chain_name, interval):
+        self.chain_name = chain_name
+        self.interval = interval
+        self.next_poll_at = 0.0
+        self.last_proposal_id = None
+        self.first_polled_at = None
+        self.last_new_proposal_at = None
+        self.proposal_gap_ewma = None
+        self.poll_time = None
+        self.consecutive_errors = 0
+        self.last_polled_at = None
+        # set while the chain's new proposals are pushed by an event subscription
+        self.reconciliation_interval = None
+
+    def to_dict(self):
+        return {
+            "chain_name": self.chain_name,
+            "interval": self.interval,
+            "next_poll_at": self.next_poll_at,
+            "proposal_gap_ewma": self.proposal_gap_ewma,
+            "poll_time": self.poll_time,
+            "consecutive_errors": self.consecutive_errors,
+            "reconciliation_interval": self.reconciliation_interval,
+        }
+
+class PollScheduler:
+
+    """Gives every chain its own poll interval and hands out the chains that are due, earliest first
+
+    A chain's interval follows the average time between its new proposals, so chains with frequent governance are polled more often
+    than quiet ones. It is stretched for chains with slow polls and backs off exponentially while polls fail.
+    """
+
+    def __init__(self, chain_names, options={}, chain_options={}):
+        self.options = {**DEFAULT_SCHEDULER_OPTIONS, **options}
+        self.chain_options = chain_options
+        self.schedules = {}
+        # heap of (next_poll_at, chain_name), entries whose time no longer matches the chain's schedule are skipped
+        self.queue = []
+
+        for chain_name in chain_names:
+            self.add_chain(chain_name)
+
+    def get_chain_option(self, chain_name, option):
+        return self.chain_options.get(chain_name, {}).get(option, self.options[option])
+
+    def clamp_interval(self, chain_name, interval):
+        return min(max(interval, self.get_chain_option(chain_name, "min_interval")), self.get_chain_option(chain_name, "max_interval"))
+
+    def add_chain(self, chain_name):
+        schedule = ChainSchedule(chain_name, self.clamp_interval(chain_name, self.options["initial_interval"]))
+        self.schedules[chain_name] = schedule
+        heapq.heappush(self.queue, (schedule.next_poll_at, chain_name))
+
+    def remove_chain(self, chain_name):
+        # the chain's queued entries no longer match a schedule and are skipped
+        self.schedules.pop(chain_name, None)
+
+    def set_reconciliation_interval(self, chain_name, interval, now=None):
+        # While a subscription reports a chain's new proposals it is only polled every interval to pick up missed events,
+        # None polls it on its own interval again
+        if now is None:
+            now = time.time()
+        schedule = self.schedules.get(chain_name)
+        if schedule is None:
+            return
+        schedule.reconciliation_interval = interval
+
+        # a dropped subscription brings the chain's next poll forward to its normal schedule straight away
+        if interval is None and schedule.last_polled_at is not None:
+            next_poll_at = max(schedule.last_polled_at + schedule.interval, now)
+            if next_poll_at < schedule.next_poll_at:
+                self._schedule(schedule, next_poll_at, 0.0)
+
+    def get_due_chains(self, now=None):
+        if now is None:
+            now = time.time()
+
+        due = []
+        while len(self.queue) > 0 and self.queue[0][0] <= now:
+            next_poll_at, chain_name = heapq.heappop(self.queue)
+            schedule = self.schedules.get(chain_name)
+            if schedule is None or schedule.next_poll_at != next_poll_at or chain_name in due:
+                continue
+            due.append(chain_name)
+        return due
+
+    def get_sleep_time(self, now=None):
+        # Seconds until the next chain is due
+        if now is None:
+            now = time.time()
+        if len(self.queue) == 0:
+            return self.options["initial_interval"]
+        return max(self.queue[0][0] - now, 0.0)
+
+    def record_poll(self, chain_name, error, last_proposal_id, poll_time=None, now=None, open_proposals=0):
+        # Schedules the chain's next poll from the result of the one that just finished, open_proposals is the number of the
+        # chain's proposals in their deposit or voting period
+        if now is None:
+            now = time.time()
+        schedule = self.schedules[chain_name]
+        schedule.last_polled_at = now
+
+        if error is not None:
+            schedule.consecutive_errors += 1
+            interval = min(schedule.interval * 2 ** schedule.consecutive_errors, self.get_chain_option(chain_name, "error_backoff_max"))
+            self._schedule(schedule, now, max(interval, self.get_chain_option(chain_name, "min_interval")))
+            return
+
+        schedule.consecutive_errors = 0
+        if schedule.first_polled_at is None:
+            schedule.first_polled_at = now
+        if poll_time is not None:
+            schedule.poll_time = poll_time
+
+        if last_proposal_id is not None and schedule.last_proposal_id is not None and last_proposal_id > schedule.last_proposal_id:
+            # the first new proposal is measured from the first poll, the gap before it was at most that long
+            gap = now - (schedule.last_new_proposal_at if schedule.last_new_proposal_at is not None else schedule.first_polled_at)
+            if gap > 0:
+                if schedule.proposal_gap_ewma is None:
+                    schedule.proposal_gap_ewma = gap
+                else:
+                    schedule.proposal_gap_ewma = (1 - PROPOSAL_GAP_EWMA_ALPHA) * schedule.proposal_gap_ewma + PROPOSAL_GAP_EWMA_ALPHA * gap
+            schedule.last_new_proposal_at = now
+        if last_proposal_id is not None:
+            schedule.last_proposal_id = last_proposal_id
+
+        # the quiet spell since the last new proposal counts as a gap too, so chains slow down once their proposals stop
+        quiet_since = schedule.last_new_proposal_at if schedule.last_new_proposal_at is not None else schedule.first_polled_at
+        quiet_spell = now - quiet_since
+        if schedule.proposal_gap_ewma is None:
+            # nothing is known about the chain's proposal rate until it has a new proposal
+            interval = max(self.options["initial_interval"], quiet_spell / POLLS_PER_PROPOSAL_GAP)
+        else:
+            interval = max(schedule.proposal_gap_ewma, quiet_spell) / POLLS_PER_PROPOSAL_GAP
+            if open_proposals > 0:
+                interval *= OPEN_PROPOSALS_INTERVAL_FACTOR
+        if schedule.poll_time is not None:
+            interval = max(interval, schedule.poll_time * POLL_TIME_INTERVAL_FACTOR)
+
+        schedule.interval = self.clamp_interval(chain_name, interval)
+        self._schedule(schedule, now, max(schedule.interval, schedule.reconciliation_interval or 0.0))
+
+    def _schedule(self, schedule, now, interval):
+        schedule.next_poll_at = now + interval
+        heapq.heappush(self.queue, (schedule.next_poll_at, schedule.chain_name))
+
+    def get_stats(self):
+        return [schedule.to_dict() for schedule in self.schedules.values()]
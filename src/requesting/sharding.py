@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from logging import INFO
+from log import get_configured_logger
+from mongo.outbox import get_lease_owner
+
+DEFAULT_SHARDING_OPTIONS = {
+    # seconds a chain lease and a replica heartbeat stay valid without renewal, a dead replica's chains move after about this long
+    "lease_time": 60.0,
+    "heartbeat_interval": 15.0,
+}
+
+def get_preferred_owner(chain_name, replicas):
+    # Rendezvous hashing, every replica computes the same owner from the same replica list and only a leaving or joining
+    # replica's share of chains moves
+    return max(replicas, key=lambda replica: hashlib.blake2b(f"{chain_name}:{replica}".encode("utf-8"), digest_size=8).digest())
+
+class ChainSharder(threading.Thread):
+
+    """Daemon thread that splits the chains between poller replicas through Mongo leases
+
+    Every heartbeat it renews this replica's heartbeat and chain leases and acquires the chains hashed to it. Chains hashed to another
+    live replica are handed off by get_changes, which the main loop calls between polling cycles so a chain is never released mid-poll.
+    """
+
+    def __init__(self, chain_lease, chain_names, options={}, log_level=INFO):
+        super().__init__(daemon=True)
+        self.chain_lease = chain_lease
+        self.chain_names = list(chain_names)
+        self.options = {**DEFAULT_SHARDING_OPTIONS, **options}
+        self.owner = get_lease_owner()
+        self.logger = get_configured_logger(__name__, log_level, "")
+
+        # chains held by this replica, mapped to the time their lease runs out if it is not renewed
+        self.owned = {}
+        self.preferred = set()
+        # chains reported to the main loop by the last get_changes
+        self.reported = set()
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                self.heartbeat()
+            except Exception as err:
+                self.logger.error(f"Unable to renew chain leases: {err}")
+            if self._stop_event.wait(self.options["heartbeat_interval"]):
+                return
+
+    def heartbeat(self):
+        lease_time = self.options["lease_time"]
+        with self._lock:
+            start_time = time.time()
+            self.chain_lease.heartbeat(self.owner, lease_time)
+
+            replicas = set(self.chain_lease.get_live_replicas()) | {self.owner}
+            self.preferred = {chain_name for chain_name in self.chain_names if get_preferred_owner(chain_name, sorted(replicas)) == self.owner}
+
+            held = self.chain_lease.renew(self.owner, self.owned.keys(), lease_time)
+            lost = self.owned.keys() - held
+            if len(lost) > 0:
+                self.logger.warning(f"Lost leases on chains {', '.join(sorted(lost))}")
+
+            # chains still held by a peer are picked up on a later heartbeat, once the peer hands them off or its lease expires
+            for chain_name in sorted(self.preferred - held):
+                if self.chain_lease.acquire(self.owner, chain_name, lease_time):
+                    held.add(chain_name)
+
+            # expiry is counted from before the writes, so this replica always gives up a chain before its peers may take it
+            self.owned = {chain_name: start_time + lease_time for chain_name in held}
+            self.logger.debug(f"Holding {len(self.owned)} of {len(self.chain_names)} chain leases across {len(replicas)} replicas")
+
+    def get_owned_chains(self):
+        now = time.time()
+        with self._lock:
+            return {chain_name for chain_name, expires_at in self.owned.items() if expires_at > now}
+
+    def get_changes(self):
+        # Hands off chains that now belong to another replica and returns the chains gained and lost since the last call
+        with self._lock:
+            handoff = self.owned.keys() - self.preferred
+            if len(handoff) > 0:
+                try:
+                    self.chain_lease.release(self.owner, handoff)
+                    for chain_name in handoff:
+                        del self.owned[chain_name]
+                    self.logger.info(f"Handed off chains {', '.join(sorted(handoff))}")
+                except Exception as err:
+                    self.logger.error(f"Unable to hand off chain leases: {err}")
+
+        owned = self.get_owned_chains()
+        gained = owned - self.reported
+        lost = self.reported - owned
+        self.reported = owned
+        return gained, lost
+
+    def stop(self):
+        # Leaves the chains to the other replicas straight away instead of after the lease expires
+        self._stop_event.set()
+        with self._lock:
+            try:
+                self.chain_lease.release(self.owner, self.owned.keys())
+                self.chain_lease.remove_replica(self.owner)
+            except Exception as err:
+                self.logger.error(f"Unable to release chain leases: {err}")
+            self.owned = {}
@@ -0,0 +1,254 @@
+import base64
+import json
+import random
+import threading
+import time
+import websocket
+from logging import INFO
+from log import get_configured_logger
+from metrics.metrics import SUBSCRIPTION_CONNECTED, SUBSCRIPTION_RECONNECTS, SUBSCRIPTION_EVENTS
+from .custom.daodao import get_dao_event_queries
+from .custom.daodao.constants import CONTRACT_ADDRESS_EVENT_ATTRIBUTE
+
+DEFAULT_SUBSCRIPTION_OPTIONS = {
+    # seconds between polls of a chain while its subscription is connected, the polls only pick up events missed while reconnecting
+    "reconciliation_interval": 3600.0,
+    "connect_timeout": 10.0,
+    # a connection that receives nothing for this long, not even the server's pings, is considered dead
+    "idle_timeout": 90.0,
+    # seconds before the first reconnect, doubled for every failed attempt in a row up to max_reconnect_delay
+    "reconnect_delay": 1.0,
+    "max_reconnect_delay": 300.0,
+}
+
+# Subscription queries with the event attribute holding the proposal ID. Proposals submitted with enough deposit start voting
+# straight away, the others are reported again by the deposit that starts their voting period.
+# Queries of DAO proposal modules also map the contract addresses they match to the modules' proposal ID prefixes.
+GOV_PROPOSAL_EVENT_QUERIES = [
+    ("tm.event='Tx' AND submit_proposal.proposal_id EXISTS", "submit_proposal.proposal_id", None),
+    ("tm.event='Tx' AND proposal_deposit.voting_period_start EXISTS", "proposal_deposit.voting_period_start", None),
+]
+
+CHAINS_TO_EVENT_QUERIES_MAP = {
+    "default": GOV_PROPOSAL_EVENT_QUERIES,
+}
+
+def get_event_queries(chain_registry_entry):
+    if chain_registry_entry.chain_id in CHAINS_TO_EVENT_QUERIES_MAP:
+        return CHAINS_TO_EVENT_QUERIES_MAP[chain_registry_entry.chain_id]
+    elif len(chain_registry_entry.dao_proposal_modules) > 0:
+        return get_dao_event_queries(chain_registry_entry.dao_proposal_modules)
+    return CHAINS_TO_EVENT_QUERIES_MAP["default"]
+
+def get_websocket_url(rpc_server):
+    url = rpc_server.rstrip("/")
+    if url.startswith("https://"):
+        url = "wss://" + url[len("https://"):]
+    elif url.startswith("http://"):
+        url = "ws://" + url[len("http://"):]
+    return url + "/websocket"
+
+# Returns the (type, {key: value}) of every event of the transaction a Tx event message reports, empty for other messages.
+# CometBFT before 0.37 base64 encodes the attribute keys and values, they are decoded when the plain keys do not match the
+# flattened events of the message.
+def get_tx_events(result):
+    tx_result = ((result.get("data") or {}).get("value") or {}).get("TxResult") or {}
+    tx_events = (tx_result.get("result") or {}).get("events") or []
+    flattened = result.get("events") or {}
+
+    encoded = not any(
+        f"{event.get('type')}.{attribute.get('key')}" in flattened for event in tx_events for attribute in event.get("attributes") or []
+    )
+    decode = decode_attribute if encoded else lambda value: value or ""
+    return [
+        (event.get("type"), {decode(attribute.get("key")): decode(attribute.get("value")) for attribute in event.get("attributes") or []})
+        for event in tx_events
+    ]
+
+def decode_attribute(value):
+    try:
+        return base64.b64decode(value or "", validate=True).decode("utf-8")
+    except ValueError:
+        return value or ""
+
+class ChainSubscription(threading.Thread):
+
+    """Daemon thread holding a websocket subscription to a chain's new proposal events on one of its RPC servers
+
+    The proposal IDs of every event are passed to on_event(chain_name, proposal_ids). A dropped connection moves to the next ranked
+    RPC server, backing off exponentially with jitter while no server keeps the subscription up.
+    """
+
+    def __init__(self, chain_name, chain_registry_entry, on_event, options={}, log_level=INFO):
+        super().__init__(name=f"subscription-{chain_name}", daemon=True)
+        self.chain_name = chain_name
+        self.chain_registry_entry = chain_registry_entry
+        self.queries = get_event_queries(chain_registry_entry)
+        self.on_event = on_event
+        self.options = {**DEFAULT_SUBSCRIPTION_OPTIONS, **options}
+        self.logger = get_configured_logger(__name__ + f" ({chain_name})", log_level, "")
+
+        # set once every query of the current connection is subscribed
+        self.connected = False
+        self._connection = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        failures = 0
+        while not self._stop_event.is_set():
+            # read on every attempt, the registry refresher may have swapped in an entry with other RPC servers
+            endpoints = self.chain_registry_entry.get_ranked_rpc_servers()
+            start_time = time.time()
+            if len(endpoints) == 0:
+                self.logger.warning(f"No RPC servers to subscribe to proposal events on chain {self.chain_name}")
+            else:
+                endpoint = endpoints[failures % len(endpoints)]
+                try:
+                    self._listen(endpoint)
+                except Exception as err:
+                    if not self._stop_event.is_set():
+                        self.logger.warning(f"Proposal event subscription for chain {self.chain_name} at {endpoint} ended: {err}")
+                finally:
+                    self._set_connected(False)
+            if self._stop_event.is_set():
+                return
+
+            # a connection that held up for a while starts the backoff over
+            if time.time() - start_time >= self.options["idle_timeout"]:
+                failures = 0
+            else:
+                failures += 1
+            SUBSCRIPTION_RECONNECTS.labels(self.chain_name).inc()
+
+            delay = min(self.options["reconnect_delay"] * 2 ** min(failures, 16), self.options["max_reconnect_delay"])
+            if self._stop_event.wait(delay * random.uniform(0.5, 1.0)):
+                return
+
+    def _listen(self, endpoint):
+        connection = websocket.create_connection(get_websocket_url(endpoint), timeout=self.options["connect_timeout"])
+        self._connection = connection
+        try:
+            for request_id, (query, _, _) in enumerate(self.queries):
+                connection.send(json.dumps({"jsonrpc": "2.0", "method": "subscribe", "id": request_id, "params": {"query": query}}))
+
+            unacknowledged = set(range(len(self.queries)))
+            connection.settimeout(self.options["idle_timeout"])
+            while not self._stop_event.is_set():
+                message = json.loads(connection.recv())
+                if message.get("error"):
+                    raise Exception(f"subscription error: {message['error']}")
+
+                result = message.get("result") or {}
+                # subscriptions are acknowledged with an empty result, events carry the query they matched
+                if "events" not in result:
+                    unacknowledged.discard(message.get("id"))
+                    if len(unacknowledged) == 0 and not self.connected:
+                        self.logger.info(f"Subscribed to proposal events for chain {self.chain_name} at {endpoint}")
+                        self._set_connected(True)
+                    continue
+
+                self._handle_events(result["events"], get_tx_events(result))
+        finally:
+            self._connection = None
+            connection.close()
+
+    def _handle_events(self, events, tx_events):
+        proposal_ids = set()
+        for _, attribute, prefixes in self.queries:
+            if prefixes is None:
+                proposal_ids.update(int(value) for value in events.get(attribute, []) if str(value).isdigit())
+                continue
+            # DAO proposal IDs are reported with the prefix of the module that emitted the event, as the targeted fetch expects them.
+            # The flattened events lose which contract an attribute came from, so each proposal ID is paired with the contract
+            # address of its own event
+            event_type, key = attribute.split(".", 1)
+            address_key = CONTRACT_ADDRESS_EVENT_ATTRIBUTE.split(".", 1)[1]
+            for tx_event_type, attributes in tx_events:
+                value = attributes.get(key, "")
+                address = attributes.get(address_key)
+                if tx_event_type == event_type and address in prefixes and value.isdigit():
+                    proposal_ids.add(f"{prefixes[address]}{value}")
+
+        if len(proposal_ids) > 0:
+            self.logger.info(f"Proposal events for chain {self.chain_name} reported proposals {sorted(proposal_ids)}")
+            SUBSCRIPTION_EVENTS.labels(self.chain_name).inc(len(proposal_ids))
+            self.on_event(self.chain_name, sorted(proposal_ids))
+
+    def _set_connected(self, connected):
+        self.connected = connected
+        SUBSCRIPTION_CONNECTED.labels(self.chain_name).set(1 if connected else 0)
+
+    def stop(self):
+        self._stop_event.set()
+        connection = self._connection
+        if connection is not None:
+            # wakes the thread up from recv
+            connection.abort()
+
+class ProposalSubscriptions:
+
+    """Keeps a ChainSubscription per subscribed chain and collects the proposals they report for the main loop
+
+    The main loop waits on wait() instead of sleeping, so reported proposals are fetched within a block of being submitted.
+    get_changes reports chains whose subscription connected or dropped, which the main loop polls slowly or normally again.
+    """
+
+    def __init__(self, options={}, log_level=INFO):
+        self.options = {**DEFAULT_SUBSCRIPTION_OPTIONS, **options}
+        self.log_level = log_level
+        self.subscriptions = {}
+
+        # proposal IDs reported since the last get_events, by chain
+        self.events = {}
+        # chains reported as connected by the last get_changes
+        self.reported = set()
+
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+
+    def add_chain(self, chain_name, chain_registry_entry):
+        if chain_name in self.subscriptions:
+            return
+        subscription = ChainSubscription(chain_name, chain_registry_entry, self.on_event, self.options, self.log_level)
+        self.subscriptions[chain_name] = subscription
+        subscription.start()
+
+    def update_chain(self, chain_name, chain_registry_entry):
+        # the new entry's RPC servers are used from the next reconnect
+        if chain_name in self.subscriptions:
+            self.subscriptions[chain_name].chain_registry_entry = chain_registry_entry
+
+    def remove_chain(self, chain_name):
+        subscription = self.subscriptions.pop(chain_name, None)
+        if subscription is not None:
+            subscription.stop()
+        with self._lock:
+            self.events.pop(chain_name, None)
+
+    def on_event(self, chain_name, proposal_ids):
+        with self._lock:
+            self.events.setdefault(chain_name, set()).update(proposal_ids)
+        self._wake_event.set()
+
+    def wait(self, timeout):
+        # Returns early when a subscription reports proposals
+        return self._wake_event.wait(timeout)
+
+    def get_events(self):
+        with self._lock:
+            events = self.events
+            self.events = {}
+            self._wake_event.clear()
+        return {chain_name: sorted(proposal_ids) for chain_name, proposal_ids in events.items()}
+
+    def get_changes(self):
+        # Returns the chains whose subscription connected and disconnected since the last call
+        connected = {chain_name for chain_name, subscription in self.subscriptions.items() if subscription.connected}
+        gained = connected - self.reported
+        lost = self.reported - connected
+        self.reported = connected
+        return gained, lost
+
+    def stop(self):
+        for chain_name in list(self.subscriptions.keys()):
+            self.remove_chain(chain_name)
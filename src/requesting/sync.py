@@ -0,0 +1,59 @@
+from mongo import Chain as MongoChain
+from .constants import FULL_RESYNC_INTERVAL_SECONDS
+
+
+# Returns the proposal ID an incremental poll should start after, or None when a full poll is due.
+# Proposals still in their deposit period can enter voting after newer proposals did, so the start stays below the lowest
+# of them until they leave the deposit period.
+def get_incremental_start(chain_object: MongoChain, full_resync_interval=FULL_RESYNC_INTERVAL_SECONDS):
+    if chain_object.is_full_sync_due(full_resync_interval) or chain_object.get_last_proposal_id() is None:
+        return None
+    deposit_proposal_ids = chain_object.get_deposit_proposal_ids()
+    if len(deposit_proposal_ids) > 0:
+        return min(deposit_proposal_ids) - 1
+    return chain_object.get_last_proposal_id()
+
+
+# Moves the chain's high-water mark and last seen active set forward after a successful poll.
+# proposal_ids are all proposal IDs the poll returned, active_proposal_ids the ones still active.
+# Incremental polls only return new proposals, so their active IDs are added to the previous active set.
+# deposit_proposal_ids are the returned proposals still in their deposit period. Polls return every proposal above the
+# incremental start, which is below the known deposit period proposals, so they replace the stored set. None keeps it.
+def update_sync_state(chain_object: MongoChain, proposal_ids, active_proposal_ids, full_sync, deposit_proposal_ids=None):
+    last_proposal_id = chain_object.get_last_proposal_id()
+    new_last_proposal_id = max([int(proposal_id) for proposal_id in proposal_ids] + [last_proposal_id or 0])
+
+    active_proposal_ids = sorted(set(int(proposal_id) for proposal_id in active_proposal_ids))
+    if not full_sync:
+        active_proposal_ids = sorted(set(chain_object.get_active_proposal_ids()) | set(active_proposal_ids))
+
+    if deposit_proposal_ids is None:
+        deposit_proposal_ids = chain_object.get_deposit_proposal_ids()
+    else:
+        deposit_proposal_ids = sorted(set(int(proposal_id) for proposal_id in deposit_proposal_ids))
+
+    # steady state incremental polls find nothing new and do not touch the database
+    if (
+        full_sync
+        or new_last_proposal_id != last_proposal_id
+        or active_proposal_ids != chain_object.get_active_proposal_ids()
+        or deposit_proposal_ids != chain_object.get_deposit_proposal_ids()
+    ):
+        chain_object.set_sync_state(new_last_proposal_id, active_proposal_ids, full_sync, deposit_proposal_ids)
+
+
+# The sync state of chains polled through DAO proposal modules. module_proposal_ids are the newest proposal IDs of the modules
+# that answered by prefix, a module's mark only moves forward and modules missing from a partial poll keep theirs.
+# active_proposal_ids are the prefixed IDs of the open proposals, replacing the stored set on a full sync and added to it otherwise.
+def update_module_sync_state(chain_object: MongoChain, module_proposal_ids, active_proposal_ids, full_sync):
+    stored_module_proposal_ids = chain_object.get_module_proposal_ids()
+    new_module_proposal_ids = {} if full_sync else dict(stored_module_proposal_ids)
+    for prefix, proposal_id in module_proposal_ids.items():
+        new_module_proposal_ids[prefix] = max(int(proposal_id), stored_module_proposal_ids.get(prefix, 0))
+
+    active_proposal_ids = sorted(set(str(proposal_id) for proposal_id in active_proposal_ids))
+    if not full_sync:
+        active_proposal_ids = sorted(set(str(proposal_id) for proposal_id in chain_object.get_active_proposal_ids()) | set(active_proposal_ids))
+
+    if full_sync or new_module_proposal_ids != stored_module_proposal_ids or active_proposal_ids != chain_object.get_active_proposal_ids():
+        chain_object.set_module_sync_state(new_module_proposal_ids, active_proposal_ids, full_sync)
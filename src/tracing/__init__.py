@@ -0,0 +1,3 @@
+from .tracer import span, traced, TracingCommandListener
+from .recorder import TraceRecorder
+from .profiler import SamplingProfiler
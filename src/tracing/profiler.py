@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+class SamplingProfiler:
+
+    """Profiles whole main loop cycles by sampling the stacks of every thread
+
+    cProfile only sees the thread it was enabled on, and the polls run on the poller's worker threads, so the stacks of all threads are
+    sampled from a background thread instead. A capture covers the requested number of cycles and is written as collapsed stacks
+    (profile-<timestamp>.collapsed, one "thread;outer;...;inner count" line per stack), which flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, directory, logger, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.logger = logger
+
+        self.requested_cycles = 0
+        self.remaining_cycles = 0
+        self.samples = Counter()
+        self.start_time = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def request(self, cycles):
+        # only sets a counter, safe to call from a signal handler
+        self.requested_cycles = cycles
+
+    def start_cycle(self):
+        if self._thread is not None or self.requested_cycles <= 0:
+            return
+        self.remaining_cycles = self.requested_cycles
+        self.requested_cycles = 0
+        self.samples = Counter()
+        self.start_time = time.time()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Profiling the next {self.remaining_cycles} cycles")
+
+    def finish_cycle(self):
+        if self._thread is None:
+            return
+        self.remaining_cycles -= 1
+        if self.remaining_cycles > 0:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            location = os.path.join(self.directory, f"profile-{time.strftime('%Y%m%dT%H%M%S')}.collapsed")
+            with open(location, "w") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except Exception as err:
+            self.logger.error(f"Unable to write profile: {err}")
+            return
+
+        self.logger.info(f"Wrote profile of {sum(self.samples.values())} samples over {round(time.time() - self.start_time, 2)} seconds to {location}")
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
@@ -0,0 +1,59 @@
+import os
+import time
+from .tracer import TRACER, write_trace
+
+DEFAULT_MAX_TRACE_FILES = 50
+
+class TraceRecorder:
+
+    """Records main loop cycles into one Chrome trace file each, cycle-<number>-<timestamp>.json in the trace directory
+
+    Every cycle is recorded when always is set, otherwise only the cycles requested with request(), e.g. from a signal handler.
+    Only the newest max_files traces are kept.
+    """
+
+    def __init__(self, directory, logger, always=False, max_files=DEFAULT_MAX_TRACE_FILES):
+        self.directory = directory
+        self.always = always
+        self.max_files = max_files
+        self.logger = logger
+
+        self.requested_cycles = 0
+        self.cycle = None
+
+    def request(self, cycles):
+        # only sets a counter, safe to call from a signal handler
+        self.requested_cycles = cycles
+
+    def start_cycle(self, cycle):
+        if not self.always and self.requested_cycles <= 0:
+            return
+        self.requested_cycles -= 1
+        self.cycle = cycle
+        TRACER.start()
+
+    def finish_cycle(self):
+        if self.cycle is None:
+            return
+        events = TRACER.stop()
+        cycle = self.cycle
+        self.cycle = None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            location = os.path.join(self.directory, f"cycle-{cycle}-{time.strftime('%Y%m%dT%H%M%S')}.json")
+            write_trace(location, events)
+            self._remove_old_traces()
+        except Exception as err:
+            self.logger.error(f"Unable to write trace for cycle {cycle}: {err}")
+            return
+
+        self.logger.info(f"Wrote trace of cycle {cycle} with {len(events)} events to {location}")
+
+    def _remove_old_traces(self):
+        traces = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.startswith("cycle-") and name.endswith(".json")),
+            key=os.path.getmtime
+        )
+        for location in traces[:max(len(traces) - self.max_files, 0)]:
+            os.remove(location)
@@ -0,0 +1,149 @@
+import functools
+import json
+import os
+import threading
+import time
+from pymongo import monitoring
+
+class Tracer:
+
+    """Collects spans from every thread while recording, as Chrome trace complete events
+
+    Spans are only kept between start and stop, outside of that span() costs a flag check.
+    """
+
+    def __init__(self):
+        self.recording = False
+        self.events = []
+        self.thread_names = {}
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.events = []
+            self.thread_names = {}
+            self.recording = True
+
+    def stop(self):
+        # Returns the Chrome trace events recorded since start, with thread name metadata
+        with self._lock:
+            self.recording = False
+            events = self.events
+            thread_names = self.thread_names
+            self.events = []
+            self.thread_names = {}
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        return metadata + events
+
+    def add_span(self, name, start_time, duration, args=None):
+        if not self.recording:
+            return
+        tid = threading.get_ident()
+        event = {"name": name, "ph": "X", "ts": start_time * 1e6, "dur": duration * 1e6, "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            if self.recording:
+                self.events.append(event)
+                if tid not in self.thread_names:
+                    self.thread_names[tid] = threading.current_thread().name
+
+class Span:
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_time = None
+
+    def __enter__(self):
+        self.start_time = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        self.tracer.add_span(self.name, self.start_time, time.time() - self.start_time, self.args)
+        return False
+
+    def set(self, key, value):
+        self.args[key] = value
+
+class NoOpSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, key, value):
+        pass
+
+NO_OP_SPAN = NoOpSpan()
+
+TRACER = Tracer()
+
+def span(name, **args):
+    # with span("name", key=value) as s: ... records the block as a span while a trace is being recorded
+    if not TRACER.recording:
+        return NO_OP_SPAN
+    return Span(TRACER, name, args)
+
+def traced(name, get_args=None):
+    # Decorator recording every call of the function as a span, get_args is called with the function's arguments and returns the span's args
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.recording:
+                return fn(*args, **kwargs)
+            with Span(TRACER, name, get_args(*args, **kwargs) if get_args is not None else {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def write_trace(location, events):
+    with open(location, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+class TracingCommandListener(monitoring.CommandListener):
+
+    """Records every Mongo command as a span, register with MongoClient(event_listeners=[...])
+
+    pymongo calls listeners on the thread that ran the command, so the spans nest under the caller's spans.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if not TRACER.recording:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        with self._lock:
+            self.collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        self._add_span(event, None)
+
+    def failed(self, event):
+        self._add_span(event, str(event.failure))
+
+    def _add_span(self, event, error):
+        with self._lock:
+            collection = self.collections.pop((event.connection_id, event.request_id), None)
+        if collection is None or not TRACER.recording:
+            return
+        duration = event.duration_micros / 1e6
+        args = {"collection": collection}
+        if error is not None:
+            args["error"] = error
+        TRACER.add_span(f"mongo.{event.command_name}", time.time() - duration, duration, args)
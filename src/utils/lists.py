@@ -1,3 +0,0 @@
-def chunks(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
\ No newline at end of file
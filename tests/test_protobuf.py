@@ -0,0 +1,148 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chain_registry.protobuf import (
+    ProtobufDecodeError, PROPOSAL_STATUS_UNSPECIFIED, PROPOSAL_STATUS_VOTING_PERIOD,
+    encode_proposals_request, decode_proposals_response, encode_proposal_request, decode_proposal_response, decode_v1_proposal, decode_v1beta1_proposal,
+)
+
+# Messages serialized with the Python classes generated from the cosmos-sdk gov, upgrade, params and query protobuf definitions.
+#
+# V1_PROPOSALS_RESPONSE: cosmos.gov.v1.QueryProposalsResponse with next_key 914 (8 byte big endian) and
+#   proposal 912, voting period, messages MsgSoftwareUpgrade and MsgSend, every Proposal field set
+#   proposal 913, deposit period, a MsgExecLegacyContent wrapping a TextProposal
+# V1_PROPOSAL_RESPONSE: cosmos.gov.v1.QueryProposalResponse holding proposal 913
+# V1_LAST_PAGE: cosmos.gov.v1.QueryProposalsResponse holding proposal 913, pagination without next_key
+# V1BETA1_PROPOSALS_RESPONSE: cosmos.gov.v1beta1.QueryProposalsResponse with next_key 90 and
+#   proposal 88, voting period, ParameterChangeProposal content
+#   proposal 89, deposit period, TextProposal content
+V1_PROPOSALS_RESPONSE = bytes.fromhex(
+    "0aa302089007126d0a2a2f636f736d6f732e757067726164652e763162657461312e4d7367536f66747761726555706772616465123f0a2d636f736d"
+    "6f73313064303779323635676d6d757674347a30773961773838306a6e73723730306a367a6e396b6e120e0a037631351880d1ca0822027b7d12250a"
+    "1c2f636f736d6f732e62616e6b2e763162657461312e4d736753656e6412050a036162631802220d0a0231301201301a01312201302a060880e2cfaa"
+    "0632060880cc99ab063a100a057561746f6d12073130303030303042060880e2cfaa064a060880cc99ab06520b697066733a2f2f6d6574615a0e5570"
+    "677261646520746f207631356217536f667477617265207570677261646520746f207631356a0f636f736d6f733170726f706f7365720af201089107"
+    "12a6010a232f636f736d6f732e676f762e76312e4d7367457865634c6567616379436f6e74656e74127f0a4e0a202f636f736d6f732e676f762e7631"
+    "62657461312e5465787450726f706f73616c122a0a0f5369676e616c2070726f706f73616c121753686f756c6420776520646f20746865207468696e"
+    "673f122d636f736d6f73313064303779323635676d6d757674347a30773961773838306a6e73723730306a367a6e396b6e18012a06088085d5aa063a"
+    "100a057561746f6d1207313030303030305a0f5369676e616c2070726f706f73616c621753686f756c6420776520646f20746865207468696e673f12"
+    "0c0a0800000000000003921028"
+)
+V1_PROPOSAL_RESPONSE = bytes.fromhex(
+    "0af20108910712a6010a232f636f736d6f732e676f762e76312e4d7367457865634c6567616379436f6e74656e74127f0a4e0a202f636f736d6f732e"
+    "676f762e763162657461312e5465787450726f706f73616c122a0a0f5369676e616c2070726f706f73616c121753686f756c6420776520646f207468"
+    "65207468696e673f122d636f736d6f73313064303779323635676d6d757674347a30773961773838306a6e73723730306a367a6e396b6e18012a0608"
+    "8085d5aa063a100a057561746f6d1207313030303030305a0f5369676e616c2070726f706f73616c621753686f756c6420776520646f207468652074"
+    "68696e673f"
+)
+V1_LAST_PAGE = bytes.fromhex(
+    "0af20108910712a6010a232f636f736d6f732e676f762e76312e4d7367457865634c6567616379436f6e74656e74127f0a4e0a202f636f736d6f732e"
+    "676f762e763162657461312e5465787450726f706f73616c122a0a0f5369676e616c2070726f706f73616c121753686f756c6420776520646f207468"
+    "65207468696e673f122d636f736d6f73313064303779323635676d6d757674347a30773961773838306a6e73723730306a367a6e396b6e18012a0608"
+    "8085d5aa063a100a057561746f6d1207313030303030305a0f5369676e616c2070726f706f73616c621753686f756c6420776520646f207468652074"
+    "68696e673f12021028"
+)
+V1BETA1_PROPOSALS_RESPONSE = bytes.fromhex(
+    "0abc01085812750a2e2f636f736d6f732e706172616d732e763162657461312e506172616d657465724368616e676550726f706f73616c12430a1452"
+    "61697365206d61782076616c696461746f7273120c526169736520746f203138301a1d0a077374616b696e67120d4d617856616c696461746f72731a"
+    "033138301802220d0a0231301201301a01302201302a06088081e4920632060880ebad93063a100a057561746f6d1207313030303030304206088081"
+    "e492064a060880ebad93060a5c0859124e0a202f636f736d6f732e676f762e763162657461312e5465787450726f706f73616c122a0a0f5369676e61"
+    "6c2070726f706f73616c121753686f756c6420776520646f20746865207468696e673f18012a060880a4e99206120c0a08000000000000005a105a"
+)
+
+# QueryProposalsRequest{proposal_status: VOTING_PERIOD, pagination: {key: 914, limit: 100, reverse: true}}
+PROPOSALS_REQUEST = bytes.fromhex("0802220e0a08000000000000039218642801")
+# QueryProposalsRequest{pagination: {limit: 10, reverse: true}}
+ALL_PROPOSALS_REQUEST = bytes.fromhex("2204180a2801")
+# QueryProposalRequest{proposal_id: 913}
+PROPOSAL_REQUEST = bytes.fromhex("089107")
+
+
+class ProtobufTest(unittest.TestCase):
+
+    def test_encode_proposals_request(self):
+        self.assertEqual(encode_proposals_request(PROPOSAL_STATUS_VOTING_PERIOD, key=(914).to_bytes(8, "big"), limit="100", reverse=True), PROPOSALS_REQUEST)
+        self.assertEqual(encode_proposals_request(PROPOSAL_STATUS_UNSPECIFIED, limit=10, reverse=True), ALL_PROPOSALS_REQUEST)
+
+    def test_encode_proposal_request(self):
+        self.assertEqual(encode_proposal_request("913"), PROPOSAL_REQUEST)
+
+    def test_decode_v1_proposals_response(self):
+        response = decode_proposals_response(V1_PROPOSALS_RESPONSE, decode_v1_proposal)
+
+        self.assertEqual(response["pagination"]["next_key"], (914).to_bytes(8, "big"))
+        self.assertEqual(response["proposals"], [
+            {
+                "id": "912",
+                # only the first message is kept
+                "messages": [{"@type": "/cosmos.upgrade.v1beta1.MsgSoftwareUpgrade"}],
+                "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+                "submit_time": "2023-11-14T22:13:20Z",
+                "title": "Upgrade to v15",
+                "summary": "Software upgrade to v15",
+            },
+            {
+                "id": "913",
+                "messages": [{
+                    "@type": "/cosmos.gov.v1.MsgExecLegacyContent",
+                    "content": {
+                        "@type": "/cosmos.gov.v1beta1.TextProposal",
+                        "title": "Signal proposal",
+                        "description": "Should we do the thing?",
+                    },
+                }],
+                "status": "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+                "submit_time": "2023-11-15T22:13:20Z",
+                "title": "Signal proposal",
+                "summary": "Should we do the thing?",
+            },
+        ])
+
+    def test_decode_last_page(self):
+        response = decode_proposals_response(V1_LAST_PAGE, decode_v1_proposal)
+
+        self.assertIsNone(response["pagination"]["next_key"])
+        self.assertEqual([proposal["id"] for proposal in response["proposals"]], ["913"])
+
+    def test_decode_v1_proposal_response(self):
+        response = decode_proposal_response(V1_PROPOSAL_RESPONSE, decode_v1_proposal)
+
+        self.assertEqual(response, {"proposals": decode_proposals_response(V1_LAST_PAGE, decode_v1_proposal)["proposals"]})
+
+    def test_decode_v1beta1_proposals_response(self):
+        response = decode_proposals_response(V1BETA1_PROPOSALS_RESPONSE, decode_v1beta1_proposal)
+
+        self.assertEqual(response["pagination"]["next_key"], (90).to_bytes(8, "big"))
+        self.assertEqual(response["proposals"], [
+            {
+                "proposal_id": "88",
+                "content": {
+                    "@type": "/cosmos.params.v1beta1.ParameterChangeProposal",
+                    "title": "Raise max validators",
+                    "description": "Raise to 180",
+                },
+                "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+                "submit_time": "2022-04-15T05:20:00Z",
+            },
+            {
+                "proposal_id": "89",
+                "content": {
+                    "@type": "/cosmos.gov.v1beta1.TextProposal",
+                    "title": "Signal proposal",
+                    "description": "Should we do the thing?",
+                },
+                "status": "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+                "submit_time": "2022-04-16T05:20:00Z",
+            },
+        ])
+
+    def test_decode_truncated_response(self):
+        with self.assertRaises(ProtobufDecodeError):
+            decode_proposals_response(V1_PROPOSALS_RESPONSE[:-20], decode_v1_proposal)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from requesting.scheduler import PollScheduler
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+class PollSchedulerTest(unittest.TestCase):
+
+    def run_chains(self, scheduler, proposal_gaps, duration, open_proposals={}):
+        # Polls every chain when it is due for the given duration, chains get a new proposal every proposal_gaps seconds (None for never)
+        now = 0.0
+        while now < duration:
+            for chain_name in scheduler.get_due_chains(now):
+                gap = proposal_gaps[chain_name]
+                last_proposal_id = 1 if gap is None else 1 + int(now // gap)
+                scheduler.record_poll(chain_name, None, last_proposal_id, poll_time=0.5, now=now, open_proposals=open_proposals.get(chain_name, 0))
+            now = scheduler.queue[0][0]
+
+    def test_busy_chain_polled_more_often_than_quiet_chain(self):
+        scheduler = PollScheduler(["busy", "quiet"])
+        self.run_chains(scheduler, {"busy": 4 * HOUR, "quiet": None}, 3 * DAY)
+
+        busy = scheduler.schedules["busy"].interval
+        quiet = scheduler.schedules["quiet"].interval
+        self.assertLess(busy, 60.0)
+        self.assertEqual(busy, scheduler.options["min_interval"])
+        self.assertEqual(quiet, scheduler.options["max_interval"])
+
+    def test_intervals_span_configured_bounds(self):
+        scheduler = PollScheduler(["daily", "weekly", "quiet"], {"max_interval": 900.0})
+        self.run_chains(scheduler, {"daily": DAY, "weekly": 7 * DAY, "quiet": None}, 40 * DAY)
+
+        daily = scheduler.schedules["daily"].interval
+        weekly = scheduler.schedules["weekly"].interval
+        quiet = scheduler.schedules["quiet"].interval
+        self.assertLess(daily, weekly)
+        self.assertLess(weekly, quiet)
+        self.assertLessEqual(daily, 60.0)
+        self.assertEqual(quiet, 900.0)
+
+    def test_open_proposals_shorten_interval(self):
+        scheduler = PollScheduler(["open", "closed"], {"max_interval": 900.0})
+        self.run_chains(scheduler, {"open": 7 * DAY, "closed": 7 * DAY}, 30 * DAY, open_proposals={"open": 1})
+
+        self.assertLess(scheduler.schedules["open"].interval, scheduler.schedules["closed"].interval)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chain_registry.chain import GOV_PROPOSAL_FIELDS, GOV_V1, GOV_V1BETA1
+from chain_registry.streaming import parse_proposals_stream, MissingProposalsError
+
+# Responses in the shape the gov REST routes return them, with the fields the parser has to skip over
+V1_PROPOSALS_RESPONSE = b"""{
+  "proposals": [
+    {
+      "id": "912",
+      "messages": [
+        {
+          "@type": "/cosmwasm.wasm.v1.MsgStoreCode",
+          "sender": "osmo10d07y265gmmuvt4z0w9aw880jnsr700jjeq4qp",
+          "wasm_byte_code": "AGFzbQEAAAABmAEWYAJ/fwF/YAN/f38Bf2ACf38AYAN/f38AYAF/AGAEf39/fwBgBX9/f39/AGABfwF/",
+          "instantiate_permission": {"permission": "Everybody", "addresses": []}
+        },
+        {
+          "@type": "/cosmos.bank.v1beta1.MsgSend",
+          "from_address": "osmo10d07y265gmmuvt4z0w9aw880jnsr700jjeq4qp",
+          "to_address": "osmo1proposer",
+          "amount": [{"denom": "uosmo", "amount": "1"}]
+        }
+      ],
+      "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+      "final_tally_result": {"yes_count": "0", "abstain_count": "0", "no_count": "0", "no_with_veto_count": "0"},
+      "submit_time": "2023-11-14T22:13:20.123456789Z",
+      "deposit_end_time": "2023-11-28T22:13:20.123456789Z",
+      "total_deposit": [{"denom": "uosmo", "amount": "1600000000"}],
+      "voting_start_time": "2023-11-14T22:13:20.123456789Z",
+      "voting_end_time": "2023-11-19T22:13:20.123456789Z",
+      "metadata": "ipfs://meta",
+      "title": "Upload contract code",
+      "summary": "Uploads the contract code",
+      "proposer": "osmo1proposer",
+      "expedited": false,
+      "failed_reason": ""
+    },
+    {
+      "id": "913",
+      "messages": [
+        {
+          "@type": "/cosmos.gov.v1.MsgExecLegacyContent",
+          "content": {
+            "@type": "/cosmos.gov.v1beta1.TextProposal",
+            "title": "Signal proposal",
+            "description": "Should we do the thing?"
+          },
+          "authority": "osmo10d07y265gmmuvt4z0w9aw880jnsr700jjeq4qp"
+        }
+      ],
+      "status": "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+      "final_tally_result": {"yes_count": "0", "abstain_count": "0", "no_count": "0", "no_with_veto_count": "0"},
+      "submit_time": "2023-11-15T22:13:20Z",
+      "deposit_end_time": "2023-11-29T22:13:20Z",
+      "total_deposit": [],
+      "voting_start_time": null,
+      "voting_end_time": null,
+      "metadata": "",
+      "title": "",
+      "summary": "",
+      "proposer": "osmo1proposer",
+      "expedited": false,
+      "failed_reason": ""
+    }
+  ],
+  "pagination": {"next_key": "AAAAAAAAA5I=", "total": "0"}
+}"""
+
+V1BETA1_PROPOSALS_RESPONSE = b"""{
+  "proposals": [
+    {
+      "proposal_id": "88",
+      "content": {
+        "@type": "/cosmos.params.v1beta1.ParameterChangeProposal",
+        "title": "Raise max validators",
+        "description": "Raise to 180",
+        "changes": [{"subspace": "staking", "key": "MaxValidators", "value": "180"}]
+      },
+      "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+      "final_tally_result": {"yes": "10", "abstain": "0", "no": "0", "no_with_veto": "0"},
+      "submit_time": "2022-04-15T05:20:00Z",
+      "deposit_end_time": "2022-04-29T05:20:00Z",
+      "total_deposit": [{"denom": "uatom", "amount": "1000000"}],
+      "voting_start_time": "2022-04-15T05:20:00Z",
+      "voting_end_time": "2022-04-29T05:20:00Z"
+    }
+  ],
+  "pagination": {"next_key": null, "total": "1"}
+}"""
+
+V1_PROPOSAL_RESPONSE = b"""{
+  "proposal": {
+    "id": "913",
+    "messages": [],
+    "status": "PROPOSAL_STATUS_PASSED",
+    "submit_time": "2023-11-15T22:13:20Z",
+    "title": "Signal proposal",
+    "summary": "Should we do the thing?"
+  }
+}"""
+
+# Some chains answer 200 with an error body
+ERROR_RESPONSE = b'{"code": 12, "message": "Not Implemented", "details": []}'
+
+
+class ParseProposalsStreamTest(unittest.TestCase):
+
+    def test_v1_proposals(self):
+        data = parse_proposals_stream(io.BytesIO(V1_PROPOSALS_RESPONSE), GOV_PROPOSAL_FIELDS[GOV_V1])
+
+        self.assertEqual(data["pagination"], {"next_key": "AAAAAAAAA5I="})
+        self.assertEqual(data["proposals"], [
+            {
+                "id": "912",
+                # only the first message is kept
+                "messages": [{"@type": "/cosmwasm.wasm.v1.MsgStoreCode"}],
+                "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+                "submit_time": "2023-11-14T22:13:20.123456789Z",
+                "title": "Upload contract code",
+                "summary": "Uploads the contract code",
+            },
+            {
+                "id": "913",
+                "messages": [{
+                    "@type": "/cosmos.gov.v1.MsgExecLegacyContent",
+                    "content": {"title": "Signal proposal", "description": "Should we do the thing?"},
+                }],
+                "status": "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+                "submit_time": "2023-11-15T22:13:20Z",
+                "title": "",
+                "summary": "",
+            },
+        ])
+
+    def test_v1beta1_proposals(self):
+        data = parse_proposals_stream(io.BytesIO(V1BETA1_PROPOSALS_RESPONSE), GOV_PROPOSAL_FIELDS[GOV_V1BETA1])
+
+        self.assertEqual(data["pagination"], {"next_key": None})
+        self.assertEqual(data["proposals"], [
+            {
+                "proposal_id": "88",
+                "content": {
+                    "@type": "/cosmos.params.v1beta1.ParameterChangeProposal",
+                    "title": "Raise max validators",
+                    "description": "Raise to 180",
+                },
+                "status": "PROPOSAL_STATUS_VOTING_PERIOD",
+                "submit_time": "2022-04-15T05:20:00Z",
+            },
+        ])
+
+    def test_single_proposal(self):
+        data = parse_proposals_stream(io.BytesIO(V1_PROPOSAL_RESPONSE), GOV_PROPOSAL_FIELDS[GOV_V1], single=True)
+
+        self.assertEqual(data["proposals"], [{
+            "id": "913",
+            "messages": [],
+            "status": "PROPOSAL_STATUS_PASSED",
+            "submit_time": "2023-11-15T22:13:20Z",
+            "title": "Signal proposal",
+            "summary": "Should we do the thing?",
+        }])
+
+    def test_missing_proposals(self):
+        with self.assertRaises(MissingProposalsError):
+            parse_proposals_stream(io.BytesIO(ERROR_RESPONSE), GOV_PROPOSAL_FIELDS[GOV_V1])
+
+    def test_invalid_json(self):
+        with self.assertRaises(Exception):
+            parse_proposals_stream(io.BytesIO(V1_PROPOSALS_RESPONSE[:200]), GOV_PROPOSAL_FIELDS[GOV_V1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import base64
+import logging
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from chain_registry import Chain
+from mongo.chain import ChainObject
+from requesting.requests import get_chain_active_proposals
+
+PROPOSAL_STATUS_PARAMS = {1: "PROPOSAL_STATUS_DEPOSIT_PERIOD", 2: "PROPOSAL_STATUS_VOTING_PERIOD"}
+
+
+class FakeCollection:
+    def update_one(self, query, update):
+        pass
+
+
+class FakeGovChain(Chain):
+
+    """Chain answering gov v1 proposal list requests from an in-memory proposal list"""
+
+    def __init__(self, proposals):
+        super().__init__({"chain_id": "test-1", "apis": {"rpc": [], "rest": [{"address": "http://rest"}]}, "explorers": []})
+        self.proposals = proposals
+
+    def get_ranked_rest_servers(self):
+        return ["http://rest"]
+
+    def _request_proposals_page(self, endpoint, gov_version, params):
+        proposals = sorted(self.proposals.items())
+        if "proposal_status" in params:
+            proposals = [(proposal_id, status) for proposal_id, status in proposals if status == PROPOSAL_STATUS_PARAMS[params["proposal_status"]]]
+        if params.get("pagination.reverse") == "true":
+            proposals = list(reversed(proposals))
+
+        offset = int(base64.b64decode(params["pagination.key"])) if "pagination.key" in params else 0
+        limit = int(params.get("pagination.limit", 100))
+        next_key = base64.b64encode(str(offset + limit).encode()).decode() if offset + limit < len(proposals) else None
+        return {
+            "proposals": [
+                {"id": str(proposal_id), "status": status, "messages": [], "submit_time": "2024-01-01T00:00:00Z"}
+                for proposal_id, status in proposals[offset:offset + limit]
+            ],
+            "pagination": {"next_key": next_key},
+        }
+
+
+class IncrementalSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        time_now = datetime.utcnow()
+        self.chain_object = ChainObject(FakeCollection(), {"_id": 1, "chain_name": "test", "created_at": time_now, "updated_at": time_now})
+        self.logger = logging.getLogger(__name__)
+
+    def poll(self, chain):
+        response = get_chain_active_proposals("test", chain, self.chain_object, self.logger)
+        self.assertIsNone(response["error"])
+        return response, [proposal["id"] for proposal in response["active_proposals"]["proposals"]]
+
+    def test_deposit_period_proposal_entering_voting_after_newer_one(self):
+        chain = FakeGovChain({
+            1: "PROPOSAL_STATUS_PASSED",
+            2: "PROPOSAL_STATUS_VOTING_PERIOD",
+            3: "PROPOSAL_STATUS_DEPOSIT_PERIOD",
+            4: "PROPOSAL_STATUS_VOTING_PERIOD",
+        })
+
+        response, active_ids = self.poll(chain)
+        self.assertTrue(response["full_sync"])
+        self.assertEqual(active_ids, ["2", "4"])
+        self.assertEqual(self.chain_object.get_deposit_proposal_ids(), [3])
+
+        chain.proposals[3] = "PROPOSAL_STATUS_VOTING_PERIOD"
+        chain.proposals[5] = "PROPOSAL_STATUS_DEPOSIT_PERIOD"
+
+        response, active_ids = self.poll(chain)
+        # the incremental poll starts below proposal 3, which the previous poll saw in its deposit period
+        self.assertFalse(response["full_sync"])
+        self.assertEqual(sorted(active_ids), ["3", "4"])
+        self.assertEqual(self.chain_object.get_deposit_proposal_ids(), [5])
+        self.assertEqual(self.chain_object.get_last_proposal_id(), 5)
+
+        chain.proposals[5] = "PROPOSAL_STATUS_VOTING_PERIOD"
+
+        response, active_ids = self.poll(chain)
+        self.assertFalse(response["full_sync"])
+        self.assertEqual(active_ids, ["5"])
+        self.assertEqual(self.chain_object.get_deposit_proposal_ids(), [])
+
+
+    def test_full_sync_follows_next_key(self):
+        chain = FakeGovChain({proposal_id: "PROPOSAL_STATUS_VOTING_PERIOD" for proposal_id in range(1, 151)})
+        chain.proposals[151] = "PROPOSAL_STATUS_DEPOSIT_PERIOD"
+
+        response, active_ids = self.poll(chain)
+        self.assertTrue(response["full_sync"])
+        self.assertEqual(sorted(int(proposal_id) for proposal_id in active_ids), list(range(1, 151)))
+        self.assertEqual(self.chain_object.get_deposit_proposal_ids(), [151])
+
+
+if __name__ == "__main__":
+    unittest.main()